@@ -0,0 +1,82 @@
+"""
+Générateur de charge pour le mode serveur (`pithon --serve --socket`).
+
+    pithon --serve --socket /tmp/pithon.sock &
+    python benchmarks/load.py /tmp/pithon.sock --clients 8 --requests 2000
+
+Chaque client ouvre sa connexion et envoie ses requêtes une à une ; le
+programme envoyé est celui donné par --program, sinon un court programme
+représentatif des scripts du quotidien. Affiche le débit en requêtes par
+seconde et les latences médiane, p99 et maximale vues par les clients.
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import threading
+from time import perf_counter
+
+DEFAULT_SOURCE = (
+    "def carre(x):\n"
+    "    return x * x\n"
+    "total = 0\n"
+    "for i in range(100):\n"
+    "    total = total + carre(i)\n"
+    "print(total)\n"
+)
+
+
+def client(path: str, source: str, requests: int, engine: str | None,
+           latencies: list[float], errors: list[dict]) -> None:
+    """Envoie `requests` requêtes sur une connexion et note la latence de chacune."""
+    request = {"source": source}
+    if engine:
+        request["engine"] = engine
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        stream = sock.makefile("rwb")
+        for i in range(requests):
+            start = perf_counter()
+            stream.write(json.dumps({**request, "id": i}).encode("utf-8") + b"\n")
+            stream.flush()
+            response = json.loads(stream.readline())
+            latencies.append(perf_counter() - start)
+            if response["status"] != "ok":
+                errors.append(response)
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure le débit et la latence de pithon --serve")
+    parser.add_argument("socket", help="socket Unix du serveur")
+    parser.add_argument("--clients", type=int, default=4, help="connexions simultanées (défaut : 4)")
+    parser.add_argument("--requests", type=int, default=500, help="requêtes par client (défaut : 500)")
+    parser.add_argument("--program", help="programme Pithon à envoyer")
+    parser.add_argument("--engine", help="moteur demandé dans chaque requête")
+    args = parser.parse_args()
+
+    source = DEFAULT_SOURCE
+    if args.program:
+        with open(args.program, "r", encoding="utf-8") as f:
+            source = f.read()
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(args.socket, source, args.requests, args.engine,
+                                                     latencies, errors))
+               for _ in range(args.clients)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = perf_counter() - start
+    print(f"{len(latencies)} requêtes en {duration:.2f} s : {len(latencies) / duration:.1f} requêtes/s, "
+          f"{len(errors)} erreurs")
+    print(f"latence médiane {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, max {max(latencies) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Mesure l'empreinte mémoire des valeurs et de l'AST Pithon avec tracemalloc.
+
+    python benchmarks/memory.py
+
+Affiche les octets retenus par une VList d'un million de nombres (les éléments
+d'un 'range'), par le même million de nombres compacté en VNumberArray et par
+l'AST d'un programme généré de 10 000 lignes.
+
+Les programmes de `benchmarks/programs/` mesurent les temps d'exécution :
+
+    pithon --bench
+"""
+
+import gc
+import tracemalloc
+from pithon.evaluator.envvalue import VList, VNumber, make_list
+from pithon.evaluator.primitive import primitive_range
+from pithon.parser.simpleparser import SimpleParser
+
+LIST_SIZE = 1_000_000
+PROGRAM_LINES = 10_000
+
+
+def retained_bytes(build):
+    """Octets encore alloués après `build()`, tant que son résultat est conservé."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+def generated_program(lines: int) -> str:
+    """Programme représentatif : fonctions, boucles, conditions et arithmétique."""
+    chunks = []
+    for i in range(lines // 10):
+        chunks.append(
+            f"def f{i}(a, b):\n"
+            f"    total = 0\n"
+            f"    for x in range(a):\n"
+            f"        if x % 2 == 0:\n"
+            f"            total = total + x * {i}\n"
+            f"        else:\n"
+            f"            total = total - b\n"
+            f"    return total\n"
+            f"y{i} = f{i}({i}, 3)\n"
+            f"print(y{i} + 1.5)\n"
+        )
+    return "".join(chunks)
+
+def main():
+    numbers = retained_bytes(lambda: VList(list(primitive_range([VNumber(LIST_SIZE)]))))
+    print(f"VList de {LIST_SIZE} nombres : {numbers} octets ({numbers / LIST_SIZE:.1f} par élément)")
+    packed = retained_bytes(lambda: make_list(list(primitive_range([VNumber(LIST_SIZE)]))))
+    print(f"VNumberArray de {LIST_SIZE} nombres : {packed} octets ({packed / LIST_SIZE:.1f} par élément)")
+    source = generated_program(PROGRAM_LINES)
+    parser = SimpleParser()
+    tree = retained_bytes(lambda: parser.parse(source))
+    print(f"AST de {PROGRAM_LINES} lignes : {tree} octets ({tree / PROGRAM_LINES:.1f} par ligne)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# ops: 5000
+# Lectures et écritures d'attributs, appels de méthodes et sites polymorphes.
+class Particle:
+    def __init__(self, x, v):
+        self.x = x
+        self.v = v
+
+    def step(self):
+        self.x = self.x + self.v
+        return self.x
+
+class Heavy:
+    def __init__(self, x, v):
+        self.mass = 2
+        self.x = x
+        self.v = v
+
+    def step(self):
+        self.x = self.x + self.v * self.mass
+        return self.x
+
+particles = []
+for i in range(50):
+    if i % 2 == 0:
+        particles = particles + [Particle(i, 1)]
+    else:
+        particles = particles + [Heavy(i, 2)]
+
+total = 0
+for t in range(100):
+    for p in particles:
+        total = total + p.step() + p.v
+print(total)
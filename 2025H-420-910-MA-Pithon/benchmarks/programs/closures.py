@@ -0,0 +1,12 @@
+# ops: 10000
+# Création de fermetures et appels qui lisent une variable capturée.
+def make_adder(n):
+    def add(x):
+        return x + n
+    return add
+
+total = 0
+for i in range(10000):
+    adder = make_adder(i)
+    total = total + adder(1)
+print(total)
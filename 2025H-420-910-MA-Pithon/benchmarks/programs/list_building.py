@@ -0,0 +1,9 @@
+# ops: 2000
+# Construction d'une liste élément par élément, puis parcours.
+xs = []
+for i in range(2000):
+    xs = xs + [i * 2]
+total = 0
+for x in xs:
+    total = total + x
+print(total)
@@ -0,0 +1,13 @@
+# ops: 10000
+# Table de correspondance : 10000 tests d'appartenance à un ensemble et lectures d'un dictionnaire.
+paires = []
+for i in range(1000):
+    paires = paires + [(i, i * i)]
+carres = dict(paires)
+petits = set(range(500))
+total = 0
+for k in range(10):
+    for i in range(1000):
+        if i in petits:
+            total = total + carres[i]
+print(total)
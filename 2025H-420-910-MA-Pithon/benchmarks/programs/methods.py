@@ -0,0 +1,23 @@
+# ops: 25000
+# Appels de méthodes : 5000 itérations de 5 appels, chaînés ou imbriqués.
+class Account:
+    def __init__(self, balance):
+        self.balance = balance
+
+    def get(self):
+        return self.balance
+
+    def deposit(self, amount):
+        self.balance = self.balance + amount
+        return self
+
+    def transfer(self, other, amount):
+        self.deposit(0 - amount)
+        other.deposit(amount)
+
+a = Account(0)
+b = Account(0)
+for i in range(5000):
+    a.deposit(i).deposit(1)
+    a.transfer(b, 1)
+print(a.get() + b.get())
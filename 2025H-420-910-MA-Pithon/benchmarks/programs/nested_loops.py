@@ -0,0 +1,7 @@
+# ops: 40000
+# Boucles imbriquées : 200 x 200 itérations d'arithmétique.
+total = 0
+for i in range(200):
+    for j in range(200):
+        total = total + i * j % 7
+print(total)
@@ -0,0 +1,8 @@
+# ops: 8361
+# Appels récursifs : fib(18) effectue 8361 appels.
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+print(fib(18))
@@ -0,0 +1,6 @@
+# ops: 5000
+# Concaténation de chaînes et conversion des nombres en chaînes.
+s = ""
+for i in range(5000):
+    s = s + str(i % 10)
+print(s[4999])
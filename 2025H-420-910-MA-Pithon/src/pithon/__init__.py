@@ -0,0 +1 @@
+from pithon.scheduler import StepBudgetExceeded, run_async
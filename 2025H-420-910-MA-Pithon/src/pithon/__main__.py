@@ -0,0 +1,3 @@
+from pithon.cli import main
+
+main()
@@ -0,0 +1,153 @@
+"""
+Suite de performances de l'interpréteur (`pithon --bench`).
+
+Chaque programme de `benchmarks/programs/` commence par un commentaire
+`# ops: N`, le nombre d'opérations représentatives (appels, itérations) qu'il
+exécute, d'où le débit en opérations par seconde. Un programme est analysé et
+optimisé une fois, puis évalué `warmup` fois sans mesure et `repeat` fois
+chronométrées, chaque fois dans un environnement neuf et sans afficher sa
+sortie. Une dernière exécution sous tracemalloc mesure le pic mémoire. Le
+débit retenu est celui de la meilleure répétition, la moins perturbée par le
+reste du système.
+
+Les résultats s'écrivent en JSON ; un fichier produit de la même façon sert de
+référence, et une baisse de débit de plus de `threshold` pour cent par rapport
+à lui est signalée comme une régression.
+"""
+
+import contextlib
+import io
+import json
+import platform
+import re
+import statistics
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+from pithon.evaluator.envframe import EnvFrame
+from pithon.evaluator.envvalue import EnvValue
+from pithon.evaluator.evaluator import initial_env
+from pithon.optimizer import DEFAULT_OPT_LEVEL, optimize
+from pithon.parser.simpleparser import SimpleParser
+from pithon.syntax import PiProgram
+
+DEFAULT_DIRECTORY = Path("benchmarks/programs")
+DEFAULT_WARMUP = 1
+DEFAULT_REPEAT = 5
+# Baisse de débit tolérée par rapport à la référence, en pour cent.
+DEFAULT_THRESHOLD = 10.0
+
+_OPS_HEADER = re.compile(r"#\s*ops:\s*(\d+)")
+
+Evaluate = Callable[[PiProgram, EnvFrame], EnvValue]
+
+
+def collect_benchmarks(paths: list[Path]) -> list[Path]:
+    """Programmes à mesurer : les fichiers donnés et les .py des répertoires donnés."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.py")) if path.is_dir() else [path])
+    if not files:
+        raise ValueError("Aucun programme de performance trouvé.")
+    return files
+
+def declared_ops(source: str, path: Path) -> int:
+    """Nombre d'opérations déclaré par le commentaire '# ops: N' de la première ligne."""
+    match = _OPS_HEADER.match(source)
+    if match is None:
+        raise ValueError(f"{path} : commentaire '# ops: N' manquant en première ligne.")
+    return int(match.group(1))
+
+def run_benchmark(path: Path, evaluate: Evaluate, opt_level: int = DEFAULT_OPT_LEVEL,
+                  warmup: int = DEFAULT_WARMUP, repeat: int = DEFAULT_REPEAT) -> dict:
+    """Mesure un programme ; les durées sont en secondes et le pic mémoire en octets."""
+    if repeat < 1:
+        raise ValueError("Le nombre de répétitions doit être au moins 1.")
+    source = path.read_text(encoding="utf-8")
+    ops = declared_ops(source, path)
+    program = optimize(SimpleParser().parse(source), opt_level)
+
+    def once():
+        with contextlib.redirect_stdout(io.StringIO()):
+            evaluate(program, initial_env())
+
+    for _ in range(warmup):
+        once()
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        once()
+        times.append(perf_counter() - start)
+    tracemalloc.start()
+    try:
+        once()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    best = min(times)
+    return {
+        "ops": ops,
+        "repeat": repeat,
+        "best_s": best,
+        "median_s": statistics.median(times),
+        "ops_per_sec": ops / best if best > 0 else float("inf"),
+        "peak_bytes": peak,
+    }
+
+def run_benchmarks(paths: list[Path], evaluate: Evaluate, engine: str = "tree",
+                   opt_level: int = DEFAULT_OPT_LEVEL, warmup: int = DEFAULT_WARMUP,
+                   repeat: int = DEFAULT_REPEAT) -> dict:
+    """Mesure chaque programme ; le résultat est sérialisable en JSON."""
+    return {
+        "python": platform.python_version(),
+        "engine": engine,
+        "opt_level": opt_level,
+        "warmup": warmup,
+        "benchmarks": {
+            path.stem: run_benchmark(path, evaluate, opt_level, warmup, repeat)
+            for path in collect_benchmarks(paths)
+        },
+    }
+
+def load_results(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_results(results: dict, path: Path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare(results: dict, baseline: dict) -> dict[str, float]:
+    """Variation du débit, en pour cent, de chaque programme présent dans la référence."""
+    changes = {}
+    reference = baseline.get("benchmarks", {})
+    for name, result in results["benchmarks"].items():
+        if name in reference and reference[name]["ops_per_sec"] > 0:
+            changes[name] = (result["ops_per_sec"] / reference[name]["ops_per_sec"] - 1) * 100
+    return changes
+
+def regressions(changes: dict[str, float], threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """Programmes dont le débit a baissé de plus de `threshold` pour cent."""
+    return [name for name, change in changes.items() if change < -threshold]
+
+def format_results(results: dict, changes: dict[str, float] | None = None,
+                   threshold: float = DEFAULT_THRESHOLD) -> str:
+    """Tableau des résultats, avec la variation par rapport à la référence si elle est donnée."""
+    lines = [f"Moteur {results['engine']}, niveau d'optimisation {results['opt_level']}, "
+             f"Python {results['python']}",
+             f"{'programme':<16} {'ops/s':>12} {'meilleur (ms)':>14} {'médiane (ms)':>13} "
+             f"{'pic (Kio)':>10}" + ("  référence" if changes is not None else "")]
+    for name, result in results["benchmarks"].items():
+        line = (f"{name:<16} {result['ops_per_sec']:>12.1f} {result['best_s'] * 1000:>14.2f} "
+                f"{result['median_s'] * 1000:>13.2f} {result['peak_bytes'] / 1024:>10.1f}")
+        if changes is not None:
+            if name not in changes:
+                line += "  absent"
+            else:
+                line += f"  {changes[name]:+.1f} %"
+                if changes[name] < -threshold:
+                    line += " RÉGRESSION"
+        lines.append(line)
+    return "\n".join(lines)
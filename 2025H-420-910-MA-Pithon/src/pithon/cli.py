@@ -1,13 +1,47 @@
-from pathlib import Path
+import argparse
+import functools
 import sys
-import os
-from pithon.evaluator.evaluator import initial_env, evaluate
+from time import perf_counter
+from pithon import bench, runner, server
+from pithon.evaluator.evaluator import initial_env, evaluate_program
+from pithon.evaluator.closurecompiler import evaluate_compiled
+from pithon.evaluator.limits import Limits, ResourceLimitExceeded, limit_env, limit_program
+from pithon.evaluator.output import DEFAULT_BUFFER_SIZE, CaptureSink, StreamSink
+from pithon.evaluator.memo import DEFAULT_MEMO_SIZE, Memoizer, memoize_program
+from pithon.evaluator.profiler import Profiler, instrument, instrument_env
+from pithon.evaluator.transpiler import evaluate_transpiled, transpile
+from pithon.optimizer import DEFAULT_OPT_LEVEL, OPT_LEVELS, optimize
+from pithon.vm.compiler import compile_program
+from pithon.vm.disassembler import disassemble
+from pithon.vm.machine import evaluate_bytecode
+from pithon.parser.cache import parse_cached
 from pithon.parser.simpleparser import SimpleParser
 from pithon.syntax import PiAssignment
 
-def run_cli(ast_only=False):
+# Moteurs d'exécution disponibles : chacun évalue un programme dans un environnement.
+ENGINES = {
+    "tree": evaluate_program,
+    "closure": evaluate_compiled,
+    "vm": evaluate_bytecode,
+    "transpile": evaluate_transpiled,
+}
+
+def select_engine(engine="tree", max_depth=None, bind_operators=True):
+    """Retourne la fonction d'évaluation du moteur, avec ses options."""
+    options = {}
+    if max_depth is not None:
+        if engine != "vm":
+            raise ValueError("--max-depth n'est pris en charge que par le moteur vm.")
+        options["max_depth"] = max_depth
+    if not bind_operators:
+        options["bind_operators"] = False
+    return functools.partial(ENGINES[engine], **options) if options else ENGINES[engine]
+
+def run_cli(ast_only=False, engine="tree", max_depth=None, opt_level=DEFAULT_OPT_LEVEL,
+            bind_operators=True):
     parser = SimpleParser()
     env = initial_env()
+    evaluate = select_engine(engine, max_depth, bind_operators)
     
     mode = " (mode AST)" if ast_only else ""
     print(f"🐍 Pithon CLI!{mode}")
@@ -24,47 +58,229 @@ def run_cli(ast_only=False):
             if ast_only:
                 print(tree)
                 continue
+            tree = optimize(tree, opt_level)
             result = evaluate(tree, env)
             if not isinstance(tree, PiAssignment):
                 print(result)
         except Exception as e:
             print(f"Erreur: {e}")
 
-def run_file(filename, ast_only=False):
+def run_file(filename, ast_only=False, engine="tree", dis_only=False, max_depth=None,
+             opt_level=DEFAULT_OPT_LEVEL, dump_optimized=False, bind_operators=True, use_cache=True,
+             memoize=False, memo_size=DEFAULT_MEMO_SIZE, profile=False, profile_output=None, fuel=None,
+             memory_limit=None, output=None, capture=False, buffer_size=None):
+    """
+    Exécute un programme. Ses affichages vont dans `output` (un OutputSink),
+    sinon sur la sortie standard, par blocs de `buffer_size` caractères ;
+    avec `capture`, ils sont conservés et retournés.
+    """
+    if memoize and profile:
+        raise ValueError("La mémoïsation et le profilage ne peuvent pas être combinés.")
     parser = SimpleParser()
-    env = initial_env()
+    sink = CaptureSink() if capture else output or StreamSink(buffer_size=buffer_size)
+    env = initial_env(sink)
     with open(filename, "r", encoding="utf-8") as f:
         source = f.read()
-    tree = parser.parse(source)
+    tree = parse_cached(source, parser) if use_cache else parser.parse(source)
     if ast_only:
         print(tree)
         return
-    evaluate(tree, env)
-
-def run_tests():
-    test_dir = Path("tests/fixtures/programs")
-    files = [f for f in os.listdir(test_dir) if f.endswith(".py")]
-    if not files:
-        print("Aucun fichier de test trouvé.")
+    tree = optimize(tree, opt_level)
+    if dump_optimized:
+        print(tree)
         return
-    for fname in sorted(files):
-        path = os.path.join(test_dir, fname)
-        print(f"--- Test : {fname} ---")
+    if dis_only:
+        if engine == "transpile":
+            print(transpile(tree, bind_operators).source)
+        else:
+            print(disassemble(compile_program(tree, bind_operators)))
+        return
+    if fuel is not None or memory_limit is not None:
+        limits = Limits(fuel, memory_limit)
+        tree = limit_program(tree, limits)
+        limit_env(env, limits)
+    evaluate = select_engine(engine, max_depth, bind_operators)
+    if memoize:
+        memoizer = Memoizer(memo_size)
         try:
-            run_file(path)
-        except Exception as e:
-            print(f"Erreur dans {fname}: {e}")
+            evaluate(memoize_program(tree, memoizer), env)
+        finally:
+            sink.flush()
+            print(memoizer.report(), file=sys.stderr)
+    elif profile:
+        profiler = Profiler(source)
+        instrument_env(env, profiler)
+        try:
+            profiler.run(evaluate, instrument(tree, profiler), env)
+        finally:
+            sink.flush()
+            print(profiler.report(), file=sys.stderr)
+            if profile_output:
+                with open(profile_output, "w", encoding="utf-8") as f:
+                    f.write(profiler.collapsed_stacks())
+    else:
+        try:
+            evaluate(tree, env)
+        finally:
+            sink.flush()
+    if capture:
+        return sink.getvalue()
 
-def main():
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--test":
-            run_tests()
-        elif sys.argv[1] == "--ast":
-            if len(sys.argv) > 2:
-                run_file(sys.argv[2], ast_only=True)
-            else:
-                run_cli(ast_only=True)
+# Libellés affichés pour les statuts de `pithon.runner`.
+STATUS_LABELS = {
+    runner.PASSED: "OK",
+    runner.FAILED: "ÉCHEC",
+    runner.ERROR: "ERREUR",
+    runner.TIMEOUT: "DÉLAI",
+}
+
+def run_tests(paths=None, engine="tree", max_depth=None, opt_level=DEFAULT_OPT_LEVEL, bind_operators=True,
+              use_cache=True, memoize=False, memo_size=DEFAULT_MEMO_SIZE, fuel=None, memory_limit=None,
+              jobs=None, timeout=runner.DEFAULT_TIMEOUT, json_output=None, junit_output=None):
+    """
+    Exécute les programmes (par défaut ceux de tests/fixtures/programs) en
+    parallèle, chacun dans son processus, et compare leurs sorties aux fichiers
+    .out. Retourne 1 si un programme échoue.
+    """
+    options = dict(engine=engine, max_depth=max_depth, opt_level=opt_level, bind_operators=bind_operators,
+                   use_cache=use_cache, memoize=memoize, memo_size=memo_size, fuel=fuel,
+                   memory_limit=memory_limit)
+    start = perf_counter()
+    results = runner.run_programs(
+        paths or [runner.DEFAULT_DIRECTORY], options, jobs, timeout,
+        on_result=lambda r: print(f"{STATUS_LABELS[r.status]:<7} {r.name} ({r.duration_s:.2f} s)"))
+    duration = perf_counter() - start
+    if not results:
+        print("Aucun fichier de test trouvé.")
+        return 0
+    for result in results:
+        if result.status != runner.PASSED:
+            print(f"\n--- {result.name} : {STATUS_LABELS[result.status]} ---")
+            print((result.diff if result.status == runner.FAILED else result.stderr).rstrip())
+    counts = runner.summary(results)
+    print(f"\n{len(results)} programmes en {duration:.2f} s : {counts[runner.PASSED]} réussis, "
+          f"{counts[runner.FAILED]} échecs, {counts[runner.ERROR]} erreurs, "
+          f"{counts[runner.TIMEOUT]} délais dépassés")
+    if json_output:
+        runner.write_json(results, json_output, duration)
+    if junit_output:
+        runner.write_junit(results, junit_output, duration)
+    return 0 if counts[runner.PASSED] == len(results) else 1
+
+def run_bench(paths=None, engine="tree", max_depth=None, opt_level=DEFAULT_OPT_LEVEL, bind_operators=True,
+              warmup=bench.DEFAULT_WARMUP, repeat=bench.DEFAULT_REPEAT, output=None, baseline=None,
+              threshold=bench.DEFAULT_THRESHOLD):
+    """Mesure la suite de performances ; retourne 1 en cas de régression par rapport à la référence."""
+    evaluate = select_engine(engine, max_depth, bind_operators)
+    results = bench.run_benchmarks(paths or [bench.DEFAULT_DIRECTORY], evaluate, engine=engine,
+                                   opt_level=opt_level, warmup=warmup, repeat=repeat)
+    changes = bench.compare(results, bench.load_results(baseline)) if baseline else None
+    print(bench.format_results(results, changes, threshold))
+    if output:
+        bench.save_results(results, output)
+    regressed = bench.regressions(changes, threshold) if changes else []
+    if regressed:
+        print(f"Régression de plus de {threshold:g} % : {', '.join(regressed)}")
+        return 1
+    return 0
+
+def run_server(socket_path=None, engine="tree", max_depth=None, opt_level=DEFAULT_OPT_LEVEL, bind_operators=True,
+               use_cache=True, fuel=None, memory_limit=None, jobs=None, timeout=server.DEFAULT_TIMEOUT,
+               max_jobs=server.DEFAULT_MAX_JOBS):
+    """Exécute les programmes reçus en lignes JSON sur l'entrée standard ou sur un socket Unix."""
+    options = dict(engine=engine, max_depth=max_depth, opt_level=opt_level, bind_operators=bind_operators,
+                   use_cache=use_cache, fuel=fuel, memory_limit=memory_limit)
+    pool = server.WorkerPool(jobs, options, timeout, max_jobs)
+    try:
+        if socket_path:
+            print(f"En écoute sur {socket_path} ({pool.size} processus).", file=sys.stderr)
+            server.serve_socket(pool, socket_path)
         else:
-            run_file(sys.argv[1], ast_only=False)
+            server.serve_stdio(pool)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(prog="pithon", description="Un interpréteur simple pour Python")
+    parser.add_argument("file", nargs="?", help="programme Pithon à exécuter (REPL si absent)")
+    parser.add_argument("--test", action="store_true", help=f"exécute en parallèle les programmes de {runner.DEFAULT_DIRECTORY} (ou le fichier ou répertoire donné) et compare leurs sorties aux fichiers .out")
+    parser.add_argument("--serve", action="store_true", help="exécute les programmes reçus en lignes JSON (entrée standard ou --socket) sur des processus prêts à l'emploi")
+    parser.add_argument("--socket", metavar="CHEMIN", help="socket Unix sur lequel --serve reçoit les requêtes")
+    parser.add_argument("--worker-jobs", type=int, default=server.DEFAULT_MAX_JOBS, help=f"programmes exécutés par un processus de --serve avant son remplacement (défaut : {server.DEFAULT_MAX_JOBS})")
+    parser.add_argument("--jobs", type=int, help="programmes exécutés simultanément par --test et --serve (défaut : nombre de cœurs)")
+    parser.add_argument("--timeout", type=float, default=runner.DEFAULT_TIMEOUT, help=f"durée maximale d'un programme de --test ou d'une requête de --serve, en secondes (défaut : {runner.DEFAULT_TIMEOUT:g})")
+    parser.add_argument("--test-output", metavar="FICHIER", help="écrit les résultats de --test en JSON dans FICHIER")
+    parser.add_argument("--junit", metavar="FICHIER", help="écrit les résultats de --test au format JUnit XML dans FICHIER")
+    parser.add_argument("--bench", action="store_true", help=f"mesure les programmes de {bench.DEFAULT_DIRECTORY} (ou le fichier ou répertoire donné)")
+    parser.add_argument("--warmup", type=int, default=bench.DEFAULT_WARMUP, help=f"exécutions de chauffe non mesurées par programme (--bench, défaut : {bench.DEFAULT_WARMUP})")
+    parser.add_argument("--repeat", type=int, default=bench.DEFAULT_REPEAT, help=f"exécutions mesurées par programme (--bench, défaut : {bench.DEFAULT_REPEAT})")
+    parser.add_argument("--bench-output", metavar="FICHIER", help="écrit les résultats de --bench en JSON dans FICHIER")
+    parser.add_argument("--baseline", metavar="FICHIER", help="compare les résultats de --bench à ceux d'un fichier JSON de référence")
+    parser.add_argument("--threshold", type=float, default=bench.DEFAULT_THRESHOLD, help=f"baisse de débit tolérée par rapport à la référence, en %% (défaut : {bench.DEFAULT_THRESHOLD:g})")
+    parser.add_argument("--ast", action="store_true", help="affiche l'AST au lieu d'évaluer")
+    parser.add_argument("--dis", action="store_true", help="affiche le bytecode de la machine virtuelle (le source Python généré avec --engine=transpile)")
+    parser.add_argument("--engine", choices=ENGINES, default="tree", help="moteur d'exécution (défaut : tree)")
+    parser.add_argument("--max-depth", type=int, help="profondeur maximale des appels imbriqués (moteur vm, défaut : 10000)")
+    parser.add_argument("--opt-level", type=int, choices=OPT_LEVELS, default=DEFAULT_OPT_LEVEL, help=f"niveau d'optimisation de l'AST (défaut : {DEFAULT_OPT_LEVEL})")
+    parser.add_argument("--dump-optimized", action="store_true", help="affiche l'AST optimisé au lieu d'évaluer")
+    parser.add_argument("--dynamic-operators", action="store_true", help="résout les opérateurs par leur nom dans l'environnement à chaque opération")
+    parser.add_argument("--no-cache", action="store_true", help="n'utilise pas le cache des programmes analysés")
+    parser.add_argument("--memoize", action="store_true", help="mémoïse les appels des fonctions pures (statistiques sur la sortie d'erreur)")
+    parser.add_argument("--memo-size", type=int, default=DEFAULT_MEMO_SIZE, help=f"nombre maximal de résultats conservés par fonction mémoïsée (défaut : {DEFAULT_MEMO_SIZE})")
+    parser.add_argument("--profile", action="store_true", help="profile l'exécution : appels, temps par fonction et passages par ligne (rapport sur la sortie d'erreur)")
+    parser.add_argument("--output-buffer", type=int, metavar="CARACTÈRES", help=f"caractères affichés en attente avant une écriture sur la sortie standard ; 0 écrit chaque ligne (défaut : {DEFAULT_BUFFER_SIZE}, 0 sur un terminal)")
+    parser.add_argument("--fuel", type=int, help="nombre maximal de pas (itérations de boucle et appels de fonction) ; au-delà, l'exécution est interrompue")
+    parser.add_argument("--memory-limit", type=int, metavar="OCTETS", help="nombre maximal d'octets alloués pour les listes, tuples et chaînes ; au-delà, l'exécution est interrompue")
+    parser.add_argument("--profile-output", metavar="FICHIER", help="écrit les piles d'appels repliées (format flamegraph) dans FICHIER ; implique --profile")
+    args = parser.parse_args()
+    if args.max_depth is not None and args.engine != "vm":
+        parser.error("--max-depth n'est pris en charge que par --engine=vm")
+    if args.memo_size < 1:
+        parser.error("--memo-size doit être au moins 1")
+    if args.profile_output:
+        args.profile = True
+    if args.memoize and args.profile:
+        parser.error("--memoize et --profile ne peuvent pas être combinés")
+
+    if args.warmup < 0 or args.repeat < 1:
+        parser.error("--warmup doit être positif ou nul et --repeat au moins 1")
+    if (args.jobs is not None and args.jobs < 1) or args.timeout <= 0:
+        parser.error("--jobs doit être au moins 1 et --timeout strictement positif")
+    if args.worker_jobs < 1:
+        parser.error("--worker-jobs doit être au moins 1")
+    if args.output_buffer is not None and args.output_buffer < 0:
+        parser.error("--output-buffer doit être positif ou nul")
+    if (args.fuel is not None and args.fuel < 0) or (args.memory_limit is not None and args.memory_limit < 0):
+        parser.error("--fuel et --memory-limit doivent être positifs ou nuls")
+
+    if args.bench:
+        sys.exit(run_bench([args.file] if args.file else None, engine=args.engine, max_depth=args.max_depth,
+                           opt_level=args.opt_level, bind_operators=not args.dynamic_operators,
+                           warmup=args.warmup, repeat=args.repeat, output=args.bench_output,
+                           baseline=args.baseline, threshold=args.threshold))
+    elif args.serve:
+        run_server(args.socket, engine=args.engine, max_depth=args.max_depth, opt_level=args.opt_level,
+                   bind_operators=not args.dynamic_operators, use_cache=not args.no_cache, fuel=args.fuel,
+                   memory_limit=args.memory_limit, jobs=args.jobs, timeout=args.timeout,
+                   max_jobs=args.worker_jobs)
+    elif args.test:
+        sys.exit(run_tests([args.file] if args.file else None, engine=args.engine, max_depth=args.max_depth,
+                           opt_level=args.opt_level, bind_operators=not args.dynamic_operators,
+                           use_cache=not args.no_cache, memoize=args.memoize, memo_size=args.memo_size,
+                           fuel=args.fuel, memory_limit=args.memory_limit, jobs=args.jobs, timeout=args.timeout, json_output=args.test_output,
+                           junit_output=args.junit))
+    elif args.file:
+        try:
+            run_file(args.file, ast_only=args.ast, engine=args.engine, dis_only=args.dis,
+                     max_depth=args.max_depth, opt_level=args.opt_level, dump_optimized=args.dump_optimized,
+                     bind_operators=not args.dynamic_operators, use_cache=not args.no_cache,
+                     memoize=args.memoize, memo_size=args.memo_size, profile=args.profile,
+                     profile_output=args.profile_output, fuel=args.fuel, memory_limit=args.memory_limit,
+                     buffer_size=args.output_buffer)
+        except ResourceLimitExceeded as e:
+            sys.exit(f"Erreur : {e}")
     else:
-        run_cli()
\ No newline at end of file
+        run_cli(ast_only=args.ast, engine=args.engine, max_depth=args.max_depth, opt_level=args.opt_level,
+                bind_operators=not args.dynamic_operators)
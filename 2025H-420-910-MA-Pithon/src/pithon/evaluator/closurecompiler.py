@@ -0,0 +1,460 @@
+"""
+Moteur d'exécution par fermetures pour Pithon.
+
+Le programme est parcouru une seule fois pour construire un arbre de fermetures
+Python (une par nœud). Le choix du traitement de chaque nœud est donc fait à la
+compilation, et non plus à chaque évaluation comme dans `evaluate_stmt`.
+La sémantique (ordre d'évaluation, messages d'erreur, valeur de retour des
+blocs) est identique à celle de l'évaluateur arborescent.
+"""
+
+from typing import Callable
+from pithon.evaluator.envframe import UNBOUND, EnvFrame
+from pithon.evaluator.evaluator import (
+    BREAK, CONTINUE, RETURN, Completion, _check_valid_piandor_type, call_function, iterate_value,
+    make_call_frame, subscript_value, contains_value,
+)
+from pithon.evaluator.objects import call_object
+from pithon.evaluator.resolver import resolve
+from pithon.evaluator.primitive import check_type
+from pithon.evaluator.envvalue import (
+    EnvValue, VClassDef, VFunctionClosure, VList, VObject, VTuple, VBool, VString, V_FALSE, V_NONE, V_TRUE,
+    make_bool, make_dict, make_list, make_number, make_set
+)
+from pithon.syntax import (
+    PiAssignment, PiBinaryOperation, PiNumber, PiBool, PiProgram, PiStatement, PiSubscript,
+    PiVariable, PiIfThenElse, PiNot, PiAnd, PiOr, PiWhile, PiNone, PiList, PiTuple, PiDict, PiSet, PiString,
+    PiFunctionDef, PiFunctionCall, PiFor, PiBreak, PiContinue, PiIn, PiReturn, PiClassDef, PiAttribute,
+    PiAttributeAssignment
+)
+
+Code = Callable[[EnvFrame], EnvValue]
+
+
+def compile_program(program: PiProgram, bind_operators: bool = True) -> Code:
+    """Compile un programme en une fermeture à exécuter dans un environnement."""
+    return _compile_block(resolve(program, bind_operators))
+
+def evaluate_compiled(program: PiProgram, env: EnvFrame, bind_operators: bool = True) -> EnvValue:
+    """Compile puis exécute un programme dans l'environnement donné."""
+    result = compile_program(program, bind_operators)(env)
+    if isinstance(result, Completion):
+        raise result.to_exception()
+    return result
+
+def compile_stmt(node: PiStatement) -> Code:
+    """Compile une instruction ou expression Pithon en fermeture."""
+    compiler = _COMPILERS.get(type(node))
+    if compiler is None:
+        return _compile_unsupported(node)
+    return compiler(node)
+
+def _compile_block(stmts: list[PiStatement]) -> Code:
+    """Compile une suite d'instructions ; la valeur est celle de la dernière."""
+    codes = [compile_stmt(stmt) for stmt in stmts]
+    if not codes:
+        return lambda env: V_NONE
+    if len(codes) == 1:
+        return codes[0]
+    if not _may_complete(stmts):
+        def block(env):
+            last_value = None
+            for code in codes:
+                last_value = code(env)
+            return last_value
+        return block
+    def block_with_completion(env):
+        last_value = None
+        for code in codes:
+            last_value = code(env)
+            if isinstance(last_value, Completion):
+                return last_value
+        return last_value
+    return block_with_completion
+
+def _compile_counted_block(stmts: list[PiStatement], fuel: Callable[[], None] | None) -> Code:
+    """Bloc d'un corps de boucle ou de fonction, précédé du décompte du carburant s'il y en a un."""
+    block = _compile_block(stmts)
+    if fuel is None:
+        return block
+    def counted(env):
+        fuel()
+        return block(env)
+    return counted
+
+def _may_complete(stmts: list[PiStatement]) -> bool:
+    """Indique si un bloc peut s'interrompre par 'return', 'break' ou 'continue'."""
+    for stmt in stmts:
+        if isinstance(stmt, (PiReturn, PiBreak, PiContinue)):
+            return True
+        if isinstance(stmt, PiIfThenElse) and (_may_complete(stmt.then_branch) or _may_complete(stmt.else_branch)):
+            return True
+        if isinstance(stmt, (PiWhile, PiFor)) and _may_complete(stmt.body):
+            return True
+    return False
+
+def _compile_unsupported(node) -> Code:
+    # L'erreur est levée à l'exécution, comme dans l'évaluateur arborescent.
+    def unsupported(env):
+        raise TypeError(f"Type de nœud non supporté : {type(node)}")
+    return unsupported
+
+def _compile_number(node: PiNumber) -> Code:
+    value = make_number(node.value)
+    return lambda env: value
+
+def _compile_bool(node: PiBool) -> Code:
+    value = make_bool(node.value)
+    return lambda env: value
+
+def _compile_none(node: PiNone) -> Code:
+    value = V_NONE
+    return lambda env: value
+
+def _compile_string(node: PiString) -> Code:
+    value = VString(node.value)
+    return lambda env: value
+
+def _compile_list(node: PiList) -> Code:
+    elements = [compile_stmt(e) for e in node.elements]
+    return lambda env: make_list([e(env) for e in elements])
+
+def _compile_tuple(node: PiTuple) -> Code:
+    elements = [compile_stmt(e) for e in node.elements]
+    return lambda env: VTuple(tuple([e(env) for e in elements]))
+
+def _compile_dict(node: PiDict) -> Code:
+    items = [(compile_stmt(k), compile_stmt(v)) for k, v in zip(node.keys, node.values)]
+    return lambda env: make_dict([(k(env), v(env)) for k, v in items])
+
+def _compile_set(node: PiSet) -> Code:
+    elements = [compile_stmt(e) for e in node.elements]
+    return lambda env: make_set([e(env) for e in elements])
+
+def _compile_variable(node: PiVariable) -> Code:
+    name = node.name
+    depth = node.depth
+    slot = node.slot
+    if depth is None:
+        return lambda env: env.lookup(name)
+    if slot is None:
+        # Variable globale : on remonte jusqu'à l'environnement du module.
+        def load_global(env):
+            for _ in range(depth):
+                env = env.parent
+            return env.lookup(name)
+        return load_global
+    if depth == 0:
+        def load_local(env):
+            value = env.values[slot]
+            if value is UNBOUND:
+                return env.parent.lookup(name)
+            return value
+        return load_local
+    def load_enclosing(env):
+        for _ in range(depth):
+            env = env.parent
+        value = env.values[slot]
+        if value is UNBOUND:
+            return env.parent.lookup(name)
+        return value
+    return load_enclosing
+
+def _compile_binary_operation(node: PiBinaryOperation) -> Code:
+    left = compile_stmt(node.left)
+    right = compile_stmt(node.right)
+    site = node.site
+    if site is None:
+        # Opérateur non lié : résolu dans l'environnement, comme un appel de fonction.
+        return _compile_call(compile_stmt(PiVariable(name=node.operator)), [left, right])
+    return lambda env: site(left(env), right(env))
+
+def _compile_assignment(node: PiAssignment) -> Code:
+    name = node.name
+    slot = node.slot
+    value = compile_stmt(node.value)
+    if slot is None:
+        def assign_name(env):
+            result = value(env)
+            env.vars[name] = result
+            return result
+        return assign_name
+    def assign_slot(env):
+        result = value(env)
+        env.values[slot] = result
+        return result
+    return assign_slot
+
+def _compile_if(node: PiIfThenElse) -> Code:
+    condition = compile_stmt(node.condition)
+    then_branch = _compile_block(node.then_branch)
+    else_branch = _compile_block(node.else_branch)
+    def if_then_else(env):
+        cond = condition(env)
+        if not isinstance(cond, VBool):
+            check_type(cond, VBool)
+        if cond.value:
+            return then_branch(env)
+        return else_branch(env)
+    return if_then_else
+
+def _compile_not(node: PiNot) -> Code:
+    operand = compile_stmt(node.operand)
+    def not_(env):
+        value = operand(env)
+        _check_valid_piandor_type(value)
+        return V_FALSE if value.value else V_TRUE # type: ignore
+    return not_
+
+def _compile_and(node: PiAnd) -> Code:
+    left = compile_stmt(node.left)
+    right = compile_stmt(node.right)
+    def and_(env):
+        value = left(env)
+        _check_valid_piandor_type(value)
+        if not value.value: # type: ignore
+            return value
+        value = right(env)
+        _check_valid_piandor_type(value)
+        return value
+    return and_
+
+def _compile_or(node: PiOr) -> Code:
+    left = compile_stmt(node.left)
+    right = compile_stmt(node.right)
+    def or_(env):
+        value = left(env)
+        _check_valid_piandor_type(value)
+        if value.value: # type: ignore
+            return value
+        value = right(env)
+        _check_valid_piandor_type(value)
+        return value
+    return or_
+
+def _compile_while(node: PiWhile) -> Code:
+    condition = compile_stmt(node.condition)
+    body = _compile_counted_block(node.body, node.fuel)
+    if not _may_complete(node.body):
+        def while_(env):
+            last_value = V_NONE
+            while True:
+                cond = condition(env)
+                if not isinstance(cond, VBool):
+                    check_type(cond, VBool)
+                if not cond.value:
+                    break
+                last_value = body(env)
+            return last_value
+        return while_
+    def while_with_completion(env):
+        last_value = V_NONE
+        while True:
+            cond = condition(env)
+            if not isinstance(cond, VBool):
+                check_type(cond, VBool)
+            if not cond.value:
+                break
+            result = body(env)
+            if isinstance(result, Completion):
+                if result is BREAK:
+                    break
+                if result is CONTINUE:
+                    continue
+                return result
+            last_value = result
+        return last_value
+    return while_with_completion
+
+def _compile_for(node: PiFor) -> Code:
+    # Les variables sont dans un dict (module) ou dans les emplacements du cadre.
+    slot = node.slot
+    key = node.var if slot is None else slot
+    iterable = compile_stmt(node.iterable)
+    body = _compile_counted_block(node.body, node.fuel)
+    may_complete = _may_complete(node.body)
+    def for_(env):
+        iterable_val = iterable(env)
+        last_value = V_NONE
+        variables = env.vars if slot is None else env.values
+        for item in iterate_value(iterable_val):
+            variables[key] = item
+            result = body(env)
+            if may_complete and isinstance(result, Completion):
+                if result is BREAK:
+                    break
+                if result is CONTINUE:
+                    continue
+                return result
+            last_value = result
+        return last_value
+    return for_
+
+def _compile_break(node: PiBreak) -> Code:
+    return lambda env: BREAK
+
+def _compile_continue(node: PiContinue) -> Code:
+    return lambda env: CONTINUE
+
+def _compile_function_def(node: PiFunctionDef) -> Code:
+    slot = node.slot
+    key = node.name if slot is None else slot
+    body = _compile_counted_block(node.body, node.fuel)
+    wrapper = node.wrapper
+    def function_def(env):
+        variables = env.vars if slot is None else env.values
+        closure = VFunctionClosure(node, env, code=body)
+        variables[key] = closure if wrapper is None else wrapper.wrap(closure, _call_closure)
+        return V_NONE
+    return function_def
+
+def _compile_class_def(node: PiClassDef) -> Code:
+    slot = node.slot
+    key = node.name if slot is None else slot
+    name = node.name
+    methods = [(method, _compile_counted_block(method.body, method.fuel)) for method in node.methods]
+    def class_def(env):
+        variables = env.vars if slot is None else env.values
+        functions = {}
+        for method, body in methods:
+            closure = VFunctionClosure(method, env, code=body)
+            functions[method.name] = closure if method.wrapper is None else method.wrapper.wrap(closure, _call_closure)
+        variables[key] = VClassDef(name, functions)
+        return V_NONE
+    return class_def
+
+def _compile_attribute(node: PiAttribute) -> Code:
+    obj = compile_stmt(node.object)
+    cache = node.cache
+    load = cache.load
+    def attribute(env):
+        value = obj(env)
+        # Cas monomorphe du cache en ligne, testé sur place.
+        if type(value) is VObject and value.shape is cache.shape:
+            return value.values[cache.slot]
+        return load(value)
+    return attribute
+
+def _compile_attribute_assignment(node: PiAttributeAssignment) -> Code:
+    value = compile_stmt(node.value)
+    obj = compile_stmt(node.object)
+    cache = node.cache
+    store = cache.store
+    def assign_attribute(env):
+        result = value(env)
+        target = obj(env)
+        if type(target) is VObject and target.shape is cache.shape:
+            target.values[cache.slot] = result
+        else:
+            store(target, result)
+        return result
+    return assign_attribute
+
+def _compile_return(node: PiReturn) -> Code:
+    value = compile_stmt(node.value)
+    return lambda env: Completion(RETURN, value(env))
+
+def _compile_function_call(node: PiFunctionCall) -> Code:
+    if type(node.function) is PiAttribute:
+        return _compile_method_call(node.function, [compile_stmt(arg) for arg in node.args])
+    return _compile_call(compile_stmt(node.function), [compile_stmt(arg) for arg in node.args])
+
+def _compile_method_call(attribute: PiAttribute, args: list[Code]) -> Code:
+    """`obj.m(...)` : la méthode est appelée avec l'objet en tête des arguments, sans méthode liée."""
+    obj = compile_stmt(attribute.object)
+    cache = attribute.cache
+    lookup_method = cache.lookup_method
+    def method_call(env):
+        value = obj(env)
+        if type(value) is VObject and value.shape is cache.method_shape:
+            method = cache.method
+        else:
+            method = lookup_method(value)
+            if method is None:
+                func_val = cache.load(value)
+                return _call_value(func_val, [arg(env) for arg in args])
+        arg_values = [value]
+        for arg in args:
+            arg_values.append(arg(env))
+        if type(method) is VFunctionClosure and method.code is not None:
+            return _call_closure(method, arg_values)
+        return _call_value(method, arg_values)
+    return method_call
+
+def _compile_call(function: Code, args: list[Code]) -> Code:
+    def call(env):
+        func_val = function(env)
+        arg_values = [arg(env) for arg in args]
+        if callable(func_val):
+            return func_val(arg_values)
+        if isinstance(func_val, VFunctionClosure) and func_val.code is not None:
+            return _call_closure(func_val, arg_values)
+        return _call_value(func_val, arg_values)
+    return call
+
+def _call_value(func_val: EnvValue, args: list[EnvValue]) -> EnvValue:
+    """Appelle une valeur quelconque : primitive, fermeture, méthode liée ou classe."""
+    if callable(func_val):
+        return func_val(args)
+    if isinstance(func_val, VFunctionClosure):
+        if func_val.code is not None:
+            return _call_closure(func_val, args)
+        return call_function(func_val, args)
+    return call_object(func_val, args, _call_value)
+
+def _call_closure(func_val: VFunctionClosure, args: list[EnvValue]) -> EnvValue:
+    """Appelle une fermeture dont le corps a été compilé par ce moteur."""
+    call_env = make_call_frame(func_val.funcdef, func_val.closure_env, args)
+    result = func_val.code(call_env)
+    if isinstance(result, Completion):
+        if result.kind is RETURN:
+            return result.value
+        raise result.to_exception()
+    return result
+
+def _compile_in(node: PiIn) -> Code:
+    container = compile_stmt(node.container)
+    element = compile_stmt(node.element)
+    def in_(env):
+        container_val = container(env)
+        return contains_value(container_val, element(env))
+    return in_
+
+def _compile_subscript(node: PiSubscript) -> Code:
+    collection = compile_stmt(node.collection)
+    index = compile_stmt(node.index)
+    def subscript(env):
+        collection_val = collection(env)
+        return subscript_value(collection_val, index(env))
+    return subscript
+
+
+_COMPILERS: dict[type, Callable[..., Code]] = {
+    PiNumber: _compile_number,
+    PiBool: _compile_bool,
+    PiNone: _compile_none,
+    PiString: _compile_string,
+    PiList: _compile_list,
+    PiTuple: _compile_tuple,
+    PiDict: _compile_dict,
+    PiSet: _compile_set,
+    PiVariable: _compile_variable,
+    PiBinaryOperation: _compile_binary_operation,
+    PiAssignment: _compile_assignment,
+    PiIfThenElse: _compile_if,
+    PiNot: _compile_not,
+    PiAnd: _compile_and,
+    PiOr: _compile_or,
+    PiWhile: _compile_while,
+    PiFor: _compile_for,
+    PiBreak: _compile_break,
+    PiContinue: _compile_continue,
+    PiFunctionDef: _compile_function_def,
+    PiReturn: _compile_return,
+    PiFunctionCall: _compile_function_call,
+    PiIn: _compile_in,
+    PiSubscript: _compile_subscript,
+    PiClassDef: _compile_class_def,
+    PiAttribute: _compile_attribute,
+    PiAttributeAssignment: _compile_attribute_assignment,
+}
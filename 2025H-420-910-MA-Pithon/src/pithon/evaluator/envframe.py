@@ -32,4 +32,43 @@ class EnvFrame:
         """
         newf = EnvFrame(self.parent)
         newf.vars = self.vars.copy()
-        return newf
\ No newline at end of file
+        return newf
+
+
+# Marque un emplacement local qui n'a pas encore reçu de valeur.
+UNBOUND = object()
+
+
+class SlotFrame:
+    """
+    Cadre d'appel d'une fonction résolue : les variables locales sont rangées dans
+    un tableau de taille fixe et accédées par leur indice (voir `resolver.py`).
+    """
+    __slots__ = ("names", "values", "parent")
+
+    def __init__(self, names, values, parent):
+        """
+        Initialise un cadre avec les noms des emplacements, leurs valeurs et le cadre parent.
+        """
+        self.names = names
+        self.values = values
+        self.parent = parent
+
+    def lookup(self, name):
+        """
+        Recherche une variable par son nom ; un emplacement non affecté est ignoré,
+        comme une variable absente d'un EnvFrame.
+        """
+        if name in self.names:
+            value = self.values[self.names.index(name)]
+            if value is not UNBOUND:
+                return value
+        return self.parent.lookup(name)
+
+    def insert(self, name, value):
+        """
+        Affecte l'emplacement portant ce nom.
+        """
+        if name not in self.names:
+            raise NameError(f"Variable '{name}' sans emplacement dans ce cadre.")
+        self.values[self.names.index(name)] = value
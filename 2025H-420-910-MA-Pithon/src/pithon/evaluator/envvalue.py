@@ -1,49 +1,110 @@
 """Définitions des valeurs pour l'évaluateur Pithon."""
 
-from typing import Union,  Callable
-from dataclasses import dataclass
+from array import array
+from typing import Any, Iterator, Union,  Callable
+from dataclasses import dataclass, field
 from pithon.syntax import ( PiFunctionDef,
 )
 from pithon.evaluator.envframe import EnvFrame
 
 PrimitiveFunction = Callable[..., 'EnvValue']
 
-@dataclass
+def containers_equal(a: 'EnvValue', b: 'EnvValue') -> bool:
+    """
+    Égalité de deux conteneurs (`__eq__` des listes, tuples, tableaux et
+    dictionnaires). Deux conteneurs de même type sont comparés par la
+    comparaison native de leurs champs `value`, qui vérifie d'abord les
+    longueurs, puis l'identité de chaque couple d'éléments avant de le
+    comparer. Une structure trop profonde pour la pile Python est comparée par
+    `_deep_equal`, qui la parcourt avec une pile explicite.
+    """
+    kind, other = type(a), type(b)
+    if kind is other:
+        try:
+            return a.value == b.value
+        except RecursionError:
+            return _deep_equal(a, b)
+    # Une VNumberArray ou un intervalle est comparé à une VList par ses éléments, vus comme des VNumber.
+    return kind in _LISTS and other in _LISTS and len(a.value) == len(b.value) and list(a) == list(b)
+
+@dataclass(slots=True)
 class VFunctionClosure:
     """Représente une fermeture de fonction avec son environnement."""
     funcdef: PiFunctionDef
     closure_env: EnvFrame
+    # Forme compilée du corps, propre au moteur d'exécution (None pour l'évaluateur arborescent).
+    code: Any = field(default=None, compare=False, repr=False)
 
     def __str__(self) -> str:
         return f"<function {self.funcdef.name} at {id(self)}>"
 
-@dataclass
+@dataclass(slots=True)
 class VList:
     """Représente une liste de valeurs."""
     value: list['EnvValue']
 
+    def __iter__(self) -> Iterator['EnvValue']:
+        return iter(self.value)
+
+    __eq__ = containers_equal
+
     def __str__(self) -> str:
         return str(self.value)
 
     def __repr__(self) -> str:
         return repr(self.value)
 
-@dataclass
+@dataclass(slots=True, eq=False)
+class VNumberArray:
+    """
+    Représente une liste de nombres compactée dans un `array` : 'q' si tous
+    les éléments sont des entiers, 'd' si ce sont tous des flottants. Elle se
+    comporte comme une VList de VNumber (affichage, égalité, indexation).
+    """
+    value: array
+
+    def __iter__(self) -> Iterator['VNumber']:
+        return map(make_number, self.value)
+
+    __eq__ = containers_equal
+
+    def __str__(self) -> str:
+        return str(self.value.tolist())
+
+    def __repr__(self) -> str:
+        return repr(self.value.tolist())
+
+@dataclass(slots=True)
 class VTuple:
-    """Représente un tuple de valeurs."""
+    """Représente un tuple de valeurs ; hachable si tous ses éléments le sont."""
     value: tuple['EnvValue', ...]
 
+    def __iter__(self) -> Iterator['EnvValue']:
+        return iter(self.value)
+
+    __eq__ = containers_equal
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
     def __str__(self) -> str:
         return str(self.value)
 
     def __repr__(self) -> str:
         return repr(self.value)
 
-@dataclass
+@dataclass(slots=True)
 class VNumber:
     """Représente un nombre (float)."""
     value: float
 
+    def __eq__(self, other) -> bool:
+        # Comme les listes Python, un même flottant (nan compris) est égal à lui-même.
+        return type(other) is VNumber and (self.value == other.value or self.value is other.value)
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
     def __str__(self) -> str:
         return str(self.value)
 
@@ -51,53 +112,177 @@ class VNumber:
     def __repr__(self) -> str:
         return repr(self.value)
 
-@dataclass
+@dataclass(slots=True)
 class VBool:
     """Représente une valeur booléenne."""
     value: bool
 
+    def __eq__(self, other) -> bool:
+        return type(other) is VBool and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
     def __str__(self) -> str:
         return str(self.value)
 
     def __repr__(self) -> str:
         return repr(self.value)
 
-@dataclass
+@dataclass(slots=True)
 class VNone:
     """Représente la valeur None."""
     value: None = None
 
+    def __eq__(self, other) -> bool:
+        return type(other) is VNone
+
+    def __hash__(self) -> int:
+        return hash(None)
+
     def __str__(self) -> str:
         return str(None)
 
     def __repr__(self) -> str:
         return repr(self.value)
 
-@dataclass
+@dataclass(slots=True)
 class VString:
     """Représente une chaîne de caractères."""
     value: str
 
+    def __eq__(self, other) -> bool:
+        return type(other) is VString and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __iter__(self) -> Iterator['VString']:
+        return (VString(char) for char in self.value)
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+@dataclass(slots=True)
+class VDict:
+    """
+    Représente un dictionnaire. Ses clés sont des valeurs hachables (nombres,
+    chaînes, booléens, None, tuples de telles valeurs) ; l'itération parcourt
+    les clés dans l'ordre d'insertion.
+    """
+    value: dict['EnvValue', 'EnvValue']
+
+    def __iter__(self) -> Iterator['EnvValue']:
+        return iter(self.value)
+
+    __eq__ = containers_equal
+
     def __str__(self) -> str:
         return str(self.value)
 
     def __repr__(self) -> str:
         return repr(self.value)
 
-@dataclass
+@dataclass(slots=True)
+class VSet:
+    """
+    Représente un ensemble de valeurs hachables. Ses éléments sont les clés
+    d'un dictionnaire : ils sont parcourus et affichés dans leur ordre
+    d'insertion, indépendant de `PYTHONHASHSEED`.
+    """
+    value: dict['EnvValue', None]
+
+    def __iter__(self) -> Iterator['EnvValue']:
+        return iter(self.value)
+
+    def __str__(self) -> str:
+        return "{" + ", ".join(map(repr, self.value)) + "}" if self.value else "set()"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+@dataclass(slots=True)
+class VRange:
+    """
+    Représente un intervalle d'entiers paresseux, produit par 'range'. Il se
+    comporte comme la liste de ses nombres : égalité, `+` et `*` (qui le
+    matérialisent en liste).
+    """
+    value: range
+
+    def __iter__(self) -> Iterator[VNumber]:
+        return map(make_number, self.value)
+
+    __eq__ = containers_equal
+
+    def __contains__(self, element: 'EnvValue') -> bool:
+        # Même égalité que pour une liste de VNumber : 2.0 appartient à range(3).
+        if not isinstance(element, VNumber):
+            return False
+        number = element.value
+        if isinstance(number, float) and not number.is_integer():
+            return False
+        return int(number) in self.value
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+class Shape:
+    """
+    Forme cachée d'objets : classe et emplacement de chaque attribut. Les
+    objets d'une classe dont les attributs ont été créés dans le même ordre
+    partagent la même forme ; ajouter un attribut fait passer l'objet à la
+    forme suivante, créée une seule fois puis réutilisée (`with_attribute`).
+    """
+    __slots__ = ("class_def", "slots", "transitions")
+
+    def __init__(self, class_def: 'VClassDef', slots: dict[str, int]):
+        self.class_def = class_def
+        self.slots = slots
+        self.transitions: dict[str, Shape] = {}
+
+    def with_attribute(self, name: str) -> 'Shape':
+        """Forme obtenue en ajoutant l'attribut `name`, à l'emplacement suivant."""
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = Shape(self.class_def, {**self.slots, name: len(self.slots)})
+            self.transitions[name] = shape
+        return shape
+
+    def __repr__(self) -> str:
+        return f"<shape {self.class_def.name}({', '.join(self.slots)})>"
+
+@dataclass(slots=True, eq=False)
 class VClassDef:
-    """Représente une définition de classe avec ses méthodes."""
+    """
+    Représente une définition de classe avec ses méthodes (fermetures, ou
+    fonctions enveloppées). Ses instances commencent avec la forme vide `shape`.
+    """
     name: str
-    methods: dict[str, VFunctionClosure]
+    methods: dict[str, 'EnvValue']
+    shape: Shape = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.shape = Shape(self, {})
 
     def __str__(self) -> str:
         return f"<class {self.name} at {id(self)}>"
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class VObject:
-    """Représente une instance d'une classe avec ses attributs."""
-    class_def: VClassDef
-    attributes: dict[str, 'EnvValue']
+    """Représente une instance d'une classe : sa forme et la valeur de chaque emplacement."""
+    shape: Shape
+    values: list['EnvValue'] = field(default_factory=list)
+
+    @property
+    def class_def(self) -> VClassDef:
+        return self.shape.class_def
 
     def __str__(self) -> str:
         return f"<{self.class_def.name} object at {id(self)}>"
@@ -105,10 +290,10 @@ class VObject:
     def __repr__(self) -> str:
         return self.__str__()
 
-@dataclass
+@dataclass(slots=True)
 class VMethodClosure:
     """Représente une méthode liée à une instance."""
-    function: VFunctionClosure
+    function: 'EnvValue'
     instance: VObject
 
     def __str__(self) -> str:
@@ -117,13 +302,162 @@ class VMethodClosure:
     def __repr__(self) -> str:
         return self.__str__()
 
+# Les valeurs immuables (nombres, chaînes, booléens, None et tuples) sont
+# hachables, d'un hachage cohérent avec leur égalité : 1 et 1.0 sont égaux et
+# ont le même hachage. Elles peuvent servir de clés de VDict et d'éléments de
+# VSet, dont l'appartenance et l'indexation se font en temps constant.
+
+# Valeurs canoniques : les booléens, None et les petits entiers ne sont alloués
+# qu'une fois. Les valeurs Pithon n'étant jamais modifiées en place, elles
+# peuvent être partagées ; l'égalité reste structurelle.
+V_TRUE = VBool(True)
+V_FALSE = VBool(False)
+V_NONE = VNone()
+
+SMALL_INT_MIN = -5
+SMALL_INT_MAX = 256
+_SMALL_NUMBERS = [VNumber(i) for i in range(SMALL_INT_MIN, SMALL_INT_MAX + 1)]
+
+def make_bool(value: bool) -> VBool:
+    """Retourne le VBool canonique correspondant à la valeur."""
+    return V_TRUE if value else V_FALSE
+
+def make_number(value: float) -> VNumber:
+    """Retourne un VNumber, partagé pour les petits entiers (les flottants ne le sont pas)."""
+    if type(value) is int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+        return _SMALL_NUMBERS[value - SMALL_INT_MIN]
+    return VNumber(value)
+
+def make_list(elements: list['EnvValue']) -> 'VList | VNumberArray':
+    """Crée une liste ; une liste non vide de VNumber est compactée si possible."""
+    if elements and all(type(element) is VNumber for element in elements):
+        return pack_numbers([element.value for element in elements])
+    return VList(elements)
+
+def make_dict(items: list[tuple['EnvValue', 'EnvValue']]) -> VDict:
+    """Crée un dictionnaire à partir de couples (clé, valeur) ; une clé répétée garde sa dernière valeur."""
+    try:
+        return VDict(dict(items))
+    except TypeError:
+        raise _unhashable([key for key, _ in items]) from None
+
+def make_set(elements: list['EnvValue']) -> VSet:
+    """Crée un ensemble ; les éléments doivent être hachables."""
+    try:
+        return VSet(dict.fromkeys(elements))
+    except TypeError:
+        raise _unhashable(elements) from None
+
+def unhashable_error(value: 'EnvValue') -> TypeError:
+    """Erreur levée quand une valeur non hachable sert de clé ou d'élément d'ensemble."""
+    names = {VList: "list", VNumberArray: "list", VDict: "dict", VSet: "set", VTuple: "tuple"}
+    return TypeError(f"Type non hachable : '{names.get(type(value), type(value).__name__)}'")
+
+def _unhashable(values: list['EnvValue']) -> TypeError:
+    for value in values:
+        try:
+            hash(value)
+        except TypeError:
+            return unhashable_error(value)
+    return TypeError("Valeur non hachable.")
+
+def pack_numbers(numbers) -> 'VList | VNumberArray':
+    """
+    Crée une liste à partir de nombres Python : une VNumberArray s'ils sont
+    tous entiers (sur 64 bits) ou tous flottants, sinon une VList de VNumber
+    afin de conserver la distinction entre 1 et 1.0.
+    """
+    numbers = list(numbers)
+    if numbers and all(type(number) is int for number in numbers):
+        try:
+            return VNumberArray(array("q", numbers))
+        except OverflowError:
+            pass
+    elif numbers and all(type(number) is float for number in numbers):
+        return VNumberArray(array("d", numbers))
+    return VList([make_number(number) for number in numbers])
+
+# Égalité structurelle
+
+# Valeurs comparées par leur seul champ `value`.
+_SCALARS = frozenset({VNumber, VString, VBool, VNone})
+# Valeurs comparées par leurs éléments.
+_CONTAINERS = frozenset({VList, VNumberArray, VRange, VTuple, VDict})
+# Une VNumberArray ou un intervalle est égal à la VList des mêmes nombres.
+_LISTS = frozenset({VList, VNumberArray, VRange})
+
+def values_equal(a: 'EnvValue', b: 'EnvValue') -> bool:
+    """
+    Égalité structurelle de deux valeurs (`==`, `!=`, `in`, clés de
+    dictionnaire). Une valeur est égale à elle-même sans être parcourue ; des
+    types ou des longueurs différents concluent sans comparer les éléments.
+    """
+    if a is b:
+        return True
+    kind = type(a)
+    if kind in _SCALARS:
+        return type(b) is kind and (a.value == b.value or a.value is b.value)
+    if kind in _CONTAINERS:
+        return containers_equal(a, b)
+    return a == b
+
+def _deep_equal(a: 'EnvValue', b: 'EnvValue') -> bool:
+    """Égalité de deux conteneurs parcourus en profondeur avec une pile explicite, sans récursion."""
+    pairs = _element_pairs(a, b)
+    if pairs is None:
+        return False
+    # Itérateurs des couples d'éléments en cours de comparaison, du plus externe au plus profond.
+    pending = [pairs]
+    while pending:
+        for x, y in pending[-1]:
+            if x is y:
+                continue
+            kind = type(x)
+            if kind in _SCALARS:
+                if type(y) is not kind or (x.value != y.value and x.value is not y.value):
+                    return False
+            elif kind in _CONTAINERS:
+                pairs = _element_pairs(x, y)
+                if pairs is None:
+                    return False
+                pending.append(pairs)
+                break
+            elif x != y:
+                return False
+        else:
+            pending.pop()
+    return True
+
+def _element_pairs(a: 'EnvValue', b: 'EnvValue') -> Iterator[tuple['EnvValue', 'EnvValue']] | None:
+    """Couples d'éléments de deux conteneurs, ou None s'ils diffèrent déjà par leur type ou leur taille."""
+    kind, other = type(a), type(b)
+    if kind is not other and not (kind in _LISTS and other in _LISTS):
+        return None
+    if len(a.value) != len(b.value):
+        return None
+    if kind is VDict:
+        if a.value.keys() != b.value.keys():
+            return None
+        return zip(a.value.values(), map(b.value.__getitem__, a.value))
+    if kind is not other:
+        # Listes de représentations différentes : éléments vus comme des VNumber.
+        return zip(a, b)
+    if kind is VNumberArray or kind is VRange:
+        # Comparaison native des tableaux ou des intervalles, sans créer de VNumber.
+        return iter(()) if a.value == b.value else None
+    return zip(a.value, b.value)
+
 EnvValue = Union[
     VNumber,
     VBool,
     VNone,
     VString,
     VList,
+    VNumberArray,
     VTuple,
+    VDict,
+    VSet,
+    VRange,
     VObject,
     VFunctionClosure,
     VMethodClosure,
@@ -1,17 +1,31 @@
-from pithon.evaluator.envframe import EnvFrame
+from typing import Iterator
+from pithon.evaluator.envframe import UNBOUND, EnvFrame, SlotFrame
+from pithon.evaluator.output import OutputSink, make_print
 from pithon.evaluator.primitive import check_type, get_primitive_dict
 from pithon.syntax import (
     PiAssignment, PiBinaryOperation, PiNumber, PiBool, PiStatement, PiProgram, PiSubscript, PiVariable,
-    PiIfThenElse, PiNot, PiAnd, PiOr, PiWhile, PiNone, PiList, PiTuple, PiString,
-    PiFunctionDef, PiFunctionCall, PiFor, PiBreak, PiContinue, PiIn, PiReturn
+    PiIfThenElse, PiNot, PiAnd, PiOr, PiWhile, PiNone, PiList, PiTuple, PiDict, PiSet, PiString,
+    PiFunctionDef, PiFunctionCall, PiFor, PiBreak, PiContinue, PiIn, PiReturn, PiClassDef, PiAttribute,
+    PiAttributeAssignment
 )
-from pithon.evaluator.envvalue import EnvValue, VFunctionClosure, VList, VNone, VTuple, VNumber, VBool, VString
+from pithon.evaluator.envvalue import (
+    EnvValue, VClassDef, VDict, VFunctionClosure, VList, VNone, VNumberArray, VObject, VRange, VSet, VTuple,
+    VNumber, VBool, VString, V_FALSE, V_NONE, make_bool, make_dict, make_list, make_number, make_set,
+    unhashable_error
+)
+from pithon.evaluator.objects import call_object, get_attribute, set_attribute
+from pithon.evaluator.resolver import resolve
 
 
-def initial_env() -> EnvFrame:
-    """Crée et retourne l'environnement initial avec les primitives."""
+def initial_env(output: OutputSink | None = None) -> EnvFrame:
+    """
+    Crée et retourne l'environnement initial avec les primitives ; `print`
+    écrit dans `output` s'il est donné.
+    """
     env = EnvFrame()
     env.vars.update(get_primitive_dict())
+    if output is not None:
+        env.vars["print"] = make_print(output)
     return env
 
 def lookup(env: EnvFrame, name: str) -> EnvValue:
@@ -22,12 +36,25 @@ def insert(env: EnvFrame, name: str, value: EnvValue) -> None:
     """Insère une variable dans l'environnement."""
     env.insert(name, value)
 
+def evaluate_program(program: PiProgram, env: EnvFrame, bind_operators: bool = True) -> EnvValue:
+    """Résout les variables (et les opérateurs) du programme puis l'évalue."""
+    result = evaluate(resolve(program, bind_operators), env)
+    if isinstance(result, Completion):
+        # 'return', 'break' ou 'continue' hors de toute fonction ou boucle.
+        raise result.to_exception()
+    return result
+
 def evaluate(node: PiProgram, env: EnvFrame) -> EnvValue:
-    """Évalue un programme ou une liste d'instructions."""
+    """
+    Évalue un programme ou une liste d'instructions. Un 'return', 'break' ou
+    'continue' interrompt le bloc et est retourné sous forme de `Completion`.
+    """
     if isinstance(node, list):
-        last_value = VNone(value=None)
+        last_value = V_NONE
         for stmt in node:
             last_value = evaluate_stmt(stmt, env)
+            if isinstance(last_value, Completion):
+                return last_value
         return last_value
     elif isinstance(node, PiStatement):
         return evaluate_stmt(node, env)
@@ -38,39 +65,54 @@ def evaluate_stmt(node: PiStatement, env: EnvFrame) -> EnvValue:
     """Évalue une instruction ou expression Pithon."""
 
     if isinstance(node, PiNumber):
-        return VNumber(node.value)
+        return make_number(node.value)
 
     elif isinstance(node, PiBool):
-        return VBool(node.value)
+        return make_bool(node.value)
 
     elif isinstance(node, PiNone):
-        return VNone(node.value)
+        return V_NONE
 
     elif isinstance(node, PiString):
         return VString(node.value)
 
     elif isinstance(node, PiList):
         elements = [evaluate_stmt(e, env) for e in node.elements]
-        return VList(elements)
+        return make_list(elements)
 
     elif isinstance(node, PiTuple):
         elements = tuple(evaluate_stmt(e, env) for e in node.elements)
         return VTuple(elements)
 
+    elif isinstance(node, PiDict):
+        items = [(evaluate_stmt(k, env), evaluate_stmt(v, env)) for k, v in zip(node.keys, node.values)]
+        return make_dict(items)
+
+    elif isinstance(node, PiSet):
+        return make_set([evaluate_stmt(e, env) for e in node.elements])
+
     elif isinstance(node, PiVariable):
-        return lookup(env, node.name)
+        if node.depth is None:
+            return lookup(env, node.name)
+        if node.depth == 0:
+            value = env.values[node.slot]
+            if value is not UNBOUND:
+                return value
+        return _evaluate_variable(node, env)
 
     elif isinstance(node, PiBinaryOperation):
-        # Traite l'opération binaire comme un appel de fonction
-        fct_call = PiFunctionCall(
-            function=PiVariable(name=node.operator),
-            args=[node.left, node.right]
-        )
-        return evaluate_stmt(fct_call, env)
+        if node.site is not None:
+            return node.site(evaluate_stmt(node.left, env), evaluate_stmt(node.right, env))
+        # Opérateur non lié : traité comme un appel de la fonction de ce nom.
+        operator = lookup(env, node.operator)
+        return call_function(operator, [evaluate_stmt(node.left, env), evaluate_stmt(node.right, env)])
 
     elif isinstance(node, PiAssignment):
         value = evaluate_stmt(node.value, env)
-        insert(env, node.name, value)
+        if node.slot is None:
+            insert(env, node.name, value)
+        else:
+            env.values[node.slot] = value
         return value
 
     elif isinstance(node, PiIfThenElse):
@@ -84,7 +126,7 @@ def evaluate_stmt(node: PiStatement, env: EnvFrame) -> EnvValue:
         operand = evaluate_stmt(node.operand, env)
         # Vérifie le type pour l'opérateur 'not'
         _check_valid_piandor_type(operand)
-        return VBool(not operand.value) # type: ignore
+        return make_bool(not operand.value) # type: ignore
 
     elif isinstance(node, PiAnd):
         left = evaluate_stmt(node.left, env)
@@ -109,12 +151,17 @@ def evaluate_stmt(node: PiStatement, env: EnvFrame) -> EnvValue:
 
     elif isinstance(node, PiFunctionDef):
         closure = VFunctionClosure(node, env)
-        insert(env, node.name, closure)
-        return VNone(value=None)
+        if node.wrapper is not None:
+            closure = node.wrapper.wrap(closure, call_function)
+        if node.slot is None:
+            insert(env, node.name, closure)
+        else:
+            env.values[node.slot] = closure
+        return V_NONE
 
     elif isinstance(node, PiReturn):
         value = evaluate_stmt(node.value, env)
-        raise ReturnException(value)
+        return Completion(RETURN, value)
 
     elif isinstance(node, PiFunctionCall):
         return _evaluate_function_call(node, env)
@@ -123,10 +170,10 @@ def evaluate_stmt(node: PiStatement, env: EnvFrame) -> EnvValue:
         return _evaluate_for(node, env)
 
     elif isinstance(node, PiBreak):
-        raise BreakException()
+        return BREAK
 
     elif isinstance(node, PiContinue):
-        raise ContinueException()
+        return CONTINUE
 
     elif isinstance(node, PiIn):
         return _evaluate_in(node, env)
@@ -134,108 +181,277 @@ def evaluate_stmt(node: PiStatement, env: EnvFrame) -> EnvValue:
     elif isinstance(node, PiSubscript):
         return _evaluate_subscript(node, env)
 
+    elif isinstance(node, PiAttribute):
+        value = evaluate_stmt(node.object, env)
+        cache = node.cache
+        if cache is None:
+            return get_attribute(value, node.attr)
+        # Cas monomorphe du cache en ligne, testé sur place.
+        if type(value) is VObject and value.shape is cache.shape:
+            return value.values[cache.slot]
+        return cache.load(value)
+
+    elif isinstance(node, PiAttributeAssignment):
+        # Comme en Python, la valeur est évaluée avant l'objet.
+        value = evaluate_stmt(node.value, env)
+        obj = evaluate_stmt(node.object, env)
+        cache = node.cache
+        if cache is None:
+            set_attribute(obj, node.attr, value)
+        elif type(obj) is VObject and obj.shape is cache.shape:
+            obj.values[cache.slot] = value
+        else:
+            cache.store(obj, value)
+        return value
+
+    elif isinstance(node, PiClassDef):
+        return _evaluate_class_def(node, env)
+
     else:
         raise TypeError(f"Type de nœud non supporté : {type(node)}")
 
+def _evaluate_class_def(node: PiClassDef, env: EnvFrame) -> EnvValue:
+    """Crée la classe ; ses méthodes sont des fermetures sur l'environnement courant."""
+    methods = {}
+    for method in node.methods:
+        closure = VFunctionClosure(method, env)
+        methods[method.name] = closure if method.wrapper is None else method.wrapper.wrap(closure, call_function)
+    class_def = VClassDef(node.name, methods)
+    if node.slot is None:
+        insert(env, node.name, class_def)
+    else:
+        env.values[node.slot] = class_def
+    return V_NONE
+
 def _check_valid_piandor_type(obj):
     """Vérifie que le type est valide pour 'and'/'or'."""
-    if not isinstance(obj, VBool | VNumber | VString | VNone | VList | VTuple):
+    if not isinstance(obj, VBool | VNumber | VString | VNone | VList | VNumberArray | VRange | VTuple | VDict | VSet):
         raise TypeError(f"Type non supporté pour l'opérateur 'and': {type(obj).__name__}")
 
+def _evaluate_variable(node: PiVariable, env) -> EnvValue:
+    """Lit une variable à partir de son adresse lexicale (profondeur, emplacement)."""
+    frame = env
+    for _ in range(node.depth):
+        frame = frame.parent
+    if node.slot is None:
+        return frame.lookup(node.name)
+    value = frame.values[node.slot]
+    if value is UNBOUND:
+        # Emplacement pas encore affecté : on continue dans les portées englobantes.
+        return frame.parent.lookup(node.name)
+    return value
+
 def _evaluate_while(node: PiWhile, env: EnvFrame) -> EnvValue:
     """Évalue une boucle while."""
-    last_value = VNone(value=None)
+    last_value = V_NONE
+    fuel = node.fuel
     while True:
         cond = evaluate_stmt(node.condition, env)
         cond = check_type(cond, VBool)
         if not cond.value:
             break
-        try:
-            last_value = evaluate(node.body, env)
-        except BreakException:
-            break
-        except ContinueException:
-            continue
+        if fuel is not None:
+            fuel()
+        result = evaluate(node.body, env)
+        if isinstance(result, Completion):
+            if result is BREAK:
+                break
+            if result is CONTINUE:
+                continue
+            return result
+        last_value = result
     return last_value
 
 def _evaluate_for(node: PiFor, env: EnvFrame) -> EnvValue:
     """Évalue une boucle for."""
     iterable_val = evaluate_stmt(node.iterable, env)
-    if not isinstance(iterable_val, (VList, VTuple)):
-        raise TypeError("La boucle for attend une liste ou un tuple.")
-    last_value = VNone(value=None)
-    iterable = iterable_val.value
-    for item in iterable:
-        env.insert(node.var, item)  # Pas de nouvel environnement pour la variable de boucle
-        try:
-            last_value = evaluate(node.body, env)
-        except BreakException:
-            break
-        except ContinueException:
-            continue
+    last_value = V_NONE
+    fuel = node.fuel
+    for item in iterate_value(iterable_val):
+        # Pas de nouvel environnement pour la variable de boucle
+        if node.slot is None:
+            env.insert(node.var, item)
+        else:
+            env.values[node.slot] = item
+        if fuel is not None:
+            fuel()
+        result = evaluate(node.body, env)
+        if isinstance(result, Completion):
+            if result is BREAK:
+                break
+            if result is CONTINUE:
+                continue
+            return result
+        last_value = result
     return last_value
 
+def iterate_value(iterable: EnvValue) -> Iterator[EnvValue]:
+    """
+    Retourne un itérateur sur les éléments d'une valeur. Toute valeur dont la
+    classe définit `__iter__` est itérable : listes, tuples, chaînes (caractère
+    par caractère), dictionnaires (leurs clés), ensembles et intervalles paresseux.
+    """
+    if not hasattr(type(iterable), "__iter__"):
+        raise TypeError("La boucle for attend une valeur itérable : liste, tuple, chaîne, dictionnaire, "
+                        "ensemble ou range.")
+    return iter(iterable)
+
 def _evaluate_subscript(node: PiSubscript, env: EnvFrame) -> EnvValue:
     """Évalue une opération d'indexation (subscript)."""
     collection = evaluate_stmt(node.collection, env)
     index = evaluate_stmt(node.index, env)
+    return subscript_value(collection, index)
+
+def subscript_value(collection: EnvValue, index: EnvValue) -> EnvValue:
+    """Indexe une liste, un tuple, une chaîne ou un intervalle par un nombre, un dictionnaire par une clé."""
     # Indexation pour liste, tuple ou chaîne
     if isinstance(collection, VList):
         idx = check_type(index, VNumber)
         return collection.value[int(idx.value)]
+    elif isinstance(collection, VDict):
+        try:
+            return collection.value[index]
+        except TypeError:
+            raise unhashable_error(index) from None
     elif isinstance(collection, VTuple):
         idx = check_type(index, VNumber)
         return collection.value[int(idx.value)]
     elif isinstance(collection, VString):
         idx = check_type(index, VNumber)
         return VString(collection.value[int(idx.value)])
+    elif isinstance(collection, (VNumberArray, VRange)):
+        idx = check_type(index, VNumber)
+        return make_number(collection.value[int(idx.value)])
     else:
-        raise TypeError("L'indexation n'est supportée que pour les listes, tuples et chaînes.")
+        raise TypeError("L'indexation n'est supportée que pour les listes, tuples, chaînes, dictionnaires "
+                        "et range.")
 
 def _evaluate_in(node: PiIn, env: EnvFrame) -> EnvValue:
     """Évalue l'opérateur 'in'."""
     container = evaluate_stmt(node.container, env)
     element = evaluate_stmt(node.element, env)
+    return contains_value(container, element)
+
+def contains_value(container: EnvValue, element: EnvValue) -> EnvValue:
+    """
+    Teste l'appartenance d'un élément à une liste, un tuple, une chaîne, un
+    intervalle, ou, en temps constant, à un dictionnaire (ses clés) ou un ensemble.
+    """
     if isinstance(container, (VList, VTuple)):
-        return VBool(element in container.value)
+        return make_bool(element in container.value)
+    elif isinstance(container, (VDict, VSet)):
+        try:
+            return make_bool(element in container.value)
+        except TypeError:
+            raise unhashable_error(element) from None
     elif isinstance(container, VString):
         if isinstance(element, VString):
-            return VBool(element.value in container.value)
+            return make_bool(element.value in container.value)
         else:
-            return VBool(False)
+            return V_FALSE
+    elif isinstance(container, VNumberArray):
+        return make_bool(type(element) is VNumber and element.value in container.value)
+    elif isinstance(container, VRange):
+        return make_bool(element in container)
     else:
-        raise TypeError("'in' n'est supporté que pour les listes et chaînes.")
+        raise TypeError("'in' n'est supporté que pour les listes, chaînes, dictionnaires et ensembles.")
 
 def _evaluate_function_call(node: PiFunctionCall, env: EnvFrame) -> EnvValue:
     """Évalue un appel de fonction (primitive ou définie par l'utilisateur)."""
-    func_val = evaluate_stmt(node.function, env)
+    function = node.function
+    if type(function) is PiAttribute and function.cache is not None:
+        return _evaluate_method_call(node, function, env)
+    func_val = evaluate_stmt(function, env)
     args = [evaluate_stmt(arg, env) for arg in node.args]
+    return call_function(func_val, args)
+
+def _evaluate_method_call(node: PiFunctionCall, attribute: PiAttribute, env: EnvFrame) -> EnvValue:
+    """Évalue `obj.m(...)` : la méthode est appelée avec l'objet en tête des arguments, sans méthode liée."""
+    obj = evaluate_stmt(attribute.object, env)
+    cache = attribute.cache
+    if type(obj) is VObject and obj.shape is cache.method_shape:
+        method = cache.method
+    else:
+        method = cache.lookup_method(obj)
+        if method is None:
+            func_val = cache.load(obj)
+            return call_function(func_val, [evaluate_stmt(arg, env) for arg in node.args])
+    args = [obj]
+    for arg in node.args:
+        args.append(evaluate_stmt(arg, env))
+    return call_function(method, args)
+
+def call_function(func_val: EnvValue, args: list[EnvValue]) -> EnvValue:
+    """Appelle une fonction (primitive ou définie par l'utilisateur) avec des valeurs déjà évaluées."""
     # Fonction primitive
     if callable(func_val):
         return func_val(args)
-    # Fonction utilisateur
+    # Méthode liée ou classe
     if not isinstance(func_val, VFunctionClosure):
-        raise TypeError("Tentative d'appel d'un objet non-fonction.")
+        return call_object(func_val, args, call_function)
+    # Fonction utilisateur
     funcdef = func_val.funcdef
     closure_env = func_val.closure_env
-    call_env = EnvFrame(parent=closure_env)
-    for i, arg_name in enumerate(funcdef.arg_names):
-        if i < len(args):
-            call_env.insert(arg_name, args[i])
-        else:
-            raise TypeError("Argument manquant pour la fonction.")
+    if funcdef.local_names is not None:
+        call_env = make_call_frame(funcdef, closure_env, args)
+    else:
+        call_env = EnvFrame(parent=closure_env)
+        for i, arg_name in enumerate(funcdef.arg_names):
+            if i < len(args):
+                call_env.insert(arg_name, args[i])
+            else:
+                raise TypeError("Argument manquant pour la fonction.")
+        if funcdef.vararg:
+            varargs = VList(args[len(funcdef.arg_names):])
+            call_env.insert(funcdef.vararg, varargs)
+        elif len(args) > len(funcdef.arg_names):
+            raise TypeError("Trop d'arguments pour la fonction.")
+    if funcdef.fuel is not None:
+        funcdef.fuel()
+    result = V_NONE
+    for stmt in funcdef.body:
+        result = evaluate_stmt(stmt, call_env)
+        if isinstance(result, Completion):
+            if result.kind is RETURN:
+                return result.value
+            # 'break' ou 'continue' hors d'une boucle de la fonction.
+            raise result.to_exception()
+    return result
+
+def make_call_frame(funcdef: PiFunctionDef, closure_env, args: list[EnvValue]) -> SlotFrame:
+    """Crée le cadre d'appel d'une fonction résolue, paramètres dans les premiers emplacements."""
+    argcount = len(funcdef.arg_names)
+    if len(args) < argcount:
+        raise TypeError("Argument manquant pour la fonction.")
+    values = args[:argcount]
     if funcdef.vararg:
-        varargs = VList(args[len(funcdef.arg_names):])
-        call_env.insert(funcdef.vararg, varargs)
-    elif len(args) > len(funcdef.arg_names):
+        values.append(VList(args[argcount:]))
+    elif len(args) > argcount:
         raise TypeError("Trop d'arguments pour la fonction.")
-    result = VNone(value=None)
-    try:
-        for stmt in funcdef.body:
-            result = evaluate_stmt(stmt, call_env)
-    except ReturnException as ret:
-        return ret.value
-    return result
+    values.extend([UNBOUND] * (len(funcdef.local_names) - len(values)))
+    return SlotFrame(funcdef.local_names, values, closure_env)
+
+RETURN = "return"
+
+class Completion:
+    """
+    Fin anticipée d'une instruction ('return', 'break' ou 'continue'), retournée
+    à la place d'une valeur jusqu'à la boucle ou l'appel de fonction qui la traite.
+    """
+    __slots__ = ("kind", "value")
+
+    def __init__(self, kind: str, value: EnvValue | None = None):
+        self.kind = kind
+        self.value = value
+
+    def to_exception(self) -> Exception:
+        """Convertit le signal non traité en l'exception correspondante."""
+        if self.kind is RETURN:
+            return ReturnException(self.value)
+        return BreakException() if self is BREAK else ContinueException()
+
+BREAK = Completion("break")
+CONTINUE = Completion("continue")
 
 class ReturnException(Exception):
     """Exception pour retourner une valeur depuis une fonction."""
@@ -0,0 +1,245 @@
+"""
+Limites de ressources d'une exécution : carburant et mémoire (`--fuel`,
+`--memory-limit`), pour exécuter du code non fiable.
+
+Le carburant est un nombre de pas : chaque itération de boucle et chaque appel
+de fonction Pithon en consomme un. `limit_program` retourne une copie du
+programme dont chaque boucle et chaque fonction porte le décompte des pas
+(champ `fuel`), appelé par chaque moteur au début de son corps. Les primitives qui
+parcourent leurs arguments (`sum`, `set`, `vadd`...) consomment un pas par
+élément, et les opérateurs `+` et `*` un pas par élément de la séquence qu'ils
+créent, avant de commencer. Le reste d'un programme s'exécute au plus une fois
+par pas, et chaque opération n'y parcourt que des valeurs dont les éléments
+ont déjà été payés : un programme limité en carburant s'arrête donc toujours,
+après un travail borné par son carburant et la taille des valeurs qu'il a
+créées (une comparaison de deux longues listes reste un seul pas).
+
+La mémoire est comptée approximativement, en octets cumulés alloués par les
+opérations qui créent des listes, tuples, chaînes, dictionnaires et
+ensembles : `limit_env` enveloppe les fonctions primitives de
+l'environnement, et `limit_program` lie chaque opérateur `+` et `*` du
+programme à un site d'appel qui compte ses allocations, conservé par tous les
+moteurs. Ce site garde le cache monomorphe et les chemins rapides des
+opérateurs : seules les opérations sur des séquences sont comptées. La taille d'une répétition (`lst * n`), d'une concaténation et du
+résultat des primitives qui créent une valeur par élément parcouru (`set`,
+`dict`, `vadd`, `vmul`) est estimée avant l'opération, si bien qu'une
+allocation démesurée est refusée avant d'être tentée. Les littéraux, bornés
+par la taille du source à chaque pas, ne sont pas comptés.
+
+Les deux comptes ne dépendent que du programme : une exécution qui dépasse une
+limite la dépasse au même endroit à chaque fois. Sans limite, rien de tout
+cela n'est créé et l'exécution n'est pas ralentie.
+"""
+
+from dataclasses import fields, is_dataclass, replace
+from typing import Callable
+from pithon.evaluator.envframe import EnvFrame
+from pithon.evaluator.envvalue import (
+    EnvValue, VDict, VList, VNumber, VNumberArray, VRange, VSet, VString, VTuple
+)
+from pithon.evaluator.operators import BinarySite, bind_operator
+from pithon.syntax import PiBinaryOperation, PiFor, PiFunctionDef, PiProgram, PiWhile
+
+# Opérateurs pouvant créer une séquence.
+ALLOCATING_OPERATORS = frozenset({"+", "*"})
+
+# Taille approximative d'une séquence : en-tête de l'objet puis octets par élément.
+HEADER_SIZE = 64
+POINTER_SIZE = 8
+
+# Octets par élément de chaque type de séquence ou de table (None : taille des éléments du tableau).
+_ITEM_SIZES = {
+    VString: 1, VList: POINTER_SIZE, VTuple: POINTER_SIZE, VNumberArray: None,
+    # Table de hachage : hachage, clé (et valeur), avec de la place libre.
+    VDict: 4 * POINTER_SIZE, VSet: 3 * POINTER_SIZE,
+}
+# Séquences opérandes de `+` et `*` ; un intervalle y est matérialisé en liste de nombres.
+_SEQUENCES = frozenset({VString, VList, VTuple, VNumberArray, VRange})
+
+# Primitives qui parcourent les éléments de leurs arguments.
+ITERATING_PRIMITIVES = frozenset({"sum", "min", "max", "dot", "vadd", "vmul", "set", "dict"})
+# Type du résultat des primitives qui créent une valeur par élément parcouru.
+_RESULT_TYPES = {"set": VSet, "dict": VDict, "vadd": VNumberArray, "vmul": VNumberArray}
+# Primitives qui ne créent jamais de séquence : elles ne sont pas enveloppées pour la mémoire.
+_NON_ALLOCATING_PRIMITIVES = frozenset({"print", "range"})
+# Valeurs dont les éléments peuvent être parcourus.
+_ITERABLES = frozenset({VString, VList, VTuple, VNumberArray, VRange, VDict, VSet})
+
+
+class ResourceLimitExceeded(Exception):
+    """Une exécution a dépassé l'une de ses limites de ressources."""
+
+
+class FuelExhausted(ResourceLimitExceeded):
+    """Le programme a consommé tout son carburant."""
+
+
+class MemoryLimitExceeded(ResourceLimitExceeded):
+    """Le programme a alloué plus de mémoire que sa limite."""
+
+
+class Limits:
+    """Compteurs d'une exécution limitée ; une limite à None n'est pas appliquée."""
+
+    def __init__(self, fuel: int | None = None, memory: int | None = None):
+        self.fuel = fuel
+        self.memory = memory
+        self.steps = 0
+        self.allocated = 0
+
+    def step(self) -> None:
+        """Consomme le pas d'une itération ou d'un appel ; appelé au début du corps par les moteurs."""
+        self.steps += 1
+        if self.steps > self.fuel:
+            raise FuelExhausted(f"Carburant épuisé ({self.fuel} pas).")
+
+    def spend(self, steps: int) -> None:
+        """Consomme `steps` pas d'un coup, avant une opération qui parcourt autant d'éléments."""
+        if self.fuel is not None:
+            self.steps += steps
+            if self.steps > self.fuel:
+                raise FuelExhausted(f"Carburant épuisé ({self.fuel} pas).")
+
+    def allocate(self, size: int) -> None:
+        self.allocated += size
+        if self.allocated > self.memory:
+            raise MemoryLimitExceeded(f"Limite mémoire dépassée ({self.memory} octets).")
+
+    def account(self, name: str, primitive: Callable) -> Callable:
+        """
+        Enveloppe une fonction primitive pour compter, avant l'appel, les pas
+        des éléments qu'elle parcourt et la taille estimée de son résultat,
+        sinon, après l'appel, la taille des séquences qu'elle crée.
+        """
+        iterating = name in ITERATING_PRIMITIVES
+        result_type = _RESULT_TYPES.get(name)
+
+        def accounted(args: list[EnvValue]) -> EnvValue:
+            if iterating:
+                lengths = list(map(_length, args))
+                if result_type is not None and self.memory is not None:
+                    self.allocate(_result_size(result_type, max(lengths, default=0)))
+                self.spend(sum(lengths))
+            result = primitive(args)
+            if result_type is None and self.memory is not None and type(result) in _ITEM_SIZES:
+                # Un argument retourné tel quel n'est pas une allocation.
+                for arg in args:
+                    if arg is result:
+                        return result
+                self.allocate(size_of(result))
+            return result
+
+        return accounted
+
+    def operator_site(self, operator: str) -> BinarySite:
+        """
+        Site d'appel de `+` ou `*` qui compte, avant l'opération, la taille et
+        les éléments de la séquence créée. Comme le site de
+        `pithon.evaluator.operators.bind_operator`, il garde la fonction
+        choisie pour le dernier couple de types : les nombres et les autres
+        opérandes qui ne créent pas de séquence ne sont pas comptés.
+        """
+        accounted = {}
+
+        def specialize(left_type: type, right_type: type, function: BinarySite) -> BinarySite:
+            key = (left_type, right_type)
+            if key not in accounted:
+                accounted[key] = self._accounted(operator, left_type, right_type, function)
+            return accounted[key]
+
+        return bind_operator(operator, specialize)
+
+    def _accounted(self, operator: str, left_type: type, right_type: type, function: BinarySite) -> BinarySite:
+        """Fonction d'une opération sur ces types, précédée du compte de la séquence qu'elle crée."""
+        if operator == "+" and left_type in _SEQUENCES and right_type in _SEQUENCES:
+            if VRange in (left_type, right_type):
+                measure = lambda left, right: _length(left) + _length(right)
+            else:
+                measure = lambda left, right: len(left.value) + len(right.value)
+            result_type = _result_type(left_type)
+        elif operator == "*" and left_type in _SEQUENCES and right_type is VNumber:
+            measure = lambda left, right: _length(left) * max(0, int(right.value))
+            result_type = _result_type(left_type)
+        elif operator == "*" and left_type is VNumber and right_type in _SEQUENCES:
+            measure = lambda left, right: _length(right) * max(0, int(left.value))
+            result_type = _result_type(right_type)
+        else:
+            return function
+        item_size = _ITEM_SIZES[result_type] or POINTER_SIZE
+        memory = self.memory is not None
+        fuel = self.fuel is not None
+
+        def accounted(left: EnvValue, right: EnvValue) -> EnvValue:
+            length = measure(left, right)
+            if memory:
+                self.allocate(HEADER_SIZE + length * item_size)
+            if fuel:
+                self.spend(length)
+            return function(left, right)
+
+        return accounted
+
+
+def size_of(value: EnvValue) -> int:
+    """Taille approximative d'une séquence, en octets ; 0 pour les autres valeurs."""
+    if type(value) in _ITEM_SIZES:
+        return _sequence_size(value, len(value.value))
+    return 0
+
+def limit_program(program: PiProgram, limits: Limits) -> PiProgram:
+    """
+    Retourne une copie du programme qui consomme un pas par itération et par
+    appel, et dont les opérateurs `+` et `*` comptent leurs allocations.
+    """
+    if limits.fuel is None and limits.memory is None:
+        return program
+    return [_node(stmt, limits) for stmt in program]
+
+def limit_env(env: EnvFrame, limits: Limits) -> None:
+    """
+    Enveloppe les fonctions primitives : celles qui parcourent leurs arguments
+    pour le carburant, toutes celles qui peuvent créer une séquence pour la
+    mémoire.
+    """
+    for name, value in list(env.vars.items()):
+        if callable(value) and name.isidentifier() and (
+                name in ITERATING_PRIMITIVES
+                or (limits.memory is not None and name not in _NON_ALLOCATING_PRIMITIVES)):
+            env.vars[name] = limits.account(name, value)
+
+def _sequence_size(sequence: EnvValue, length: int) -> int:
+    item_size = _ITEM_SIZES[type(sequence)]
+    return HEADER_SIZE + length * (sequence.value.itemsize if item_size is None else item_size)
+
+def _result_size(result_type: type, length: int) -> int:
+    item_size = _ITEM_SIZES[result_type]
+    return HEADER_SIZE + length * (POINTER_SIZE if item_size is None else item_size)
+
+def _length(value: EnvValue) -> int:
+    """Nombre d'éléments parcourus en itérant la valeur, sans la parcourir ; 0 si elle n'est pas itérable."""
+    if type(value) is VRange:
+        return max(0, value.value.stop - value.value.start)
+    if type(value) in _ITERABLES:
+        return len(value.value)
+    return 0
+
+def _result_type(sequence_type: type) -> type:
+    return VNumberArray if sequence_type is VRange else sequence_type
+
+def _node(node, limits: Limits):
+    if not is_dataclass(node):
+        return node
+    changes = {}
+    for f in fields(node):
+        value = getattr(node, f.name)
+        if isinstance(value, list):
+            changes[f.name] = [_node(item, limits) for item in value]
+        elif isinstance(value, tuple):
+            changes[f.name] = tuple(_node(item, limits) for item in value)
+        elif is_dataclass(value):
+            changes[f.name] = _node(value, limits)
+    if limits.fuel is not None and isinstance(node, (PiWhile, PiFor, PiFunctionDef)):
+        changes["fuel"] = limits.step
+    if isinstance(node, PiBinaryOperation) and node.operator in ALLOCATING_OPERATORS:
+        changes["site"] = limits.operator_site(node.operator)
+    return replace(node, **changes) if changes else node
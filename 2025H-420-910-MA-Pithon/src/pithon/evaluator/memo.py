@@ -0,0 +1,143 @@
+"""
+Mémoïsation des fonctions pures (`pithon --memoize`).
+
+`memoize_program` pose la table de mémoïsation (champ `wrapper`) sur les
+définitions des fonctions pures du module (voir `pithon.evaluator.purity`).
+Quand il exécute une telle définition, chaque moteur enveloppe la fermeture
+dans une `MemoizedFunction`, qu'il appelle ensuite comme une primitive, en lui
+passant sa propre façon d'appeler la fermeture.
+
+Chaque fermeture a son cache LRU, indexé par les valeurs des arguments. Un
+appel dont un argument n'est pas hachable (liste, fonction) n'est pas mis en
+cache, pas plus qu'un appel qui lève une exception.
+"""
+
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Callable
+from pithon.evaluator.envvalue import EnvValue, VBool, VFunctionClosure, VNone, VNumber, VString, VTuple
+from pithon.evaluator.purity import pure_functions
+from pithon.syntax import PiFunctionDef, PiProgram
+
+DEFAULT_MEMO_SIZE = 4096
+
+Invoke = Callable[[VFunctionClosure, list[EnvValue]], EnvValue]
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Cache borné : l'entrée la moins récemment utilisée est évincée en premier."""
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        if maxsize < 1:
+            raise ValueError("La taille du cache doit être au moins 1.")
+        self.maxsize = maxsize
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Retourne la valeur associée à la clé et la marque comme la plus récente."""
+        value = self.entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        """Ajoute une entrée, en évinçant la plus ancienne si le cache est plein."""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class MemoizedFunction:
+    """Fermeture d'une fonction pure dont les résultats sont conservés par arguments."""
+    __slots__ = ("closure", "invoke", "cache")
+
+    def __init__(self, closure: VFunctionClosure, invoke: Invoke, cache: LRUCache):
+        self.closure = closure
+        self.invoke = invoke
+        self.cache = cache
+
+    def __call__(self, args: list[EnvValue]) -> EnvValue:
+        key = _arguments_key(args)
+        if key is None:
+            return self.invoke(self.closure, args)
+        result = self.cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = self.invoke(self.closure, args)
+            self.cache.put(key, result)
+        return result
+
+    def __str__(self) -> str:
+        return str(self.closure)
+
+
+class Memoizer:
+    """Table de mémoïsation d'une exécution : taille des caches et statistiques."""
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        if maxsize < 1:
+            raise ValueError("La taille du cache doit être au moins 1.")
+        self.maxsize = maxsize
+        self.functions: list[MemoizedFunction] = []
+
+    def wrap(self, closure: VFunctionClosure, invoke: Invoke) -> MemoizedFunction:
+        """Enveloppe une fermeture qui vient d'être créée, avec un cache qui lui est propre."""
+        function = MemoizedFunction(closure, invoke, LRUCache(self.maxsize))
+        self.functions.append(function)
+        return function
+
+    def statistics(self) -> dict[str, tuple[int, int, int]]:
+        """Succès, échecs et évictions cumulés par nom de fonction."""
+        totals = {}
+        for function in self.functions:
+            cache = function.cache
+            hits, misses, evictions = totals.get(function.closure.funcdef.name, (0, 0, 0))
+            totals[function.closure.funcdef.name] = (
+                hits + cache.hits, misses + cache.misses, evictions + cache.evictions
+            )
+        return totals
+
+    def report(self) -> str:
+        """Résumé des statistiques, une ligne par fonction mémoïsée."""
+        lines = [f"{name} : {hits} succès, {misses} échecs, {evictions} évictions"
+                 for name, (hits, misses, evictions) in sorted(self.statistics().items())]
+        return "\n".join(lines) if lines else "Aucune fonction mémoïsée."
+
+
+def memoize_program(program: PiProgram, memoizer: Memoizer) -> PiProgram:
+    """Retourne une copie du programme dont les fonctions pures portent la table de mémoïsation."""
+    pure = pure_functions(program)
+    return [replace(stmt, wrapper=memoizer) if isinstance(stmt, PiFunctionDef) and stmt.name in pure else stmt
+            for stmt in program]
+
+
+def _arguments_key(args: list[EnvValue]) -> tuple | None:
+    keys = []
+    for arg in args:
+        key = _value_key(arg)
+        if key is None:
+            return None
+        keys.append(key)
+    return tuple(keys)
+
+def _value_key(value: EnvValue):
+    """Clé hachable d'une valeur, ou None ; 1 et 1.0 (qui s'affichent différemment) sont distingués."""
+    kind = type(value)
+    if kind is VNumber or kind is VString or kind is VBool or kind is VNone:
+        return (kind, type(value.value), value.value)
+    if kind is VTuple:
+        keys = _arguments_key(value.value)
+        return None if keys is None else (kind, keys)
+    return None
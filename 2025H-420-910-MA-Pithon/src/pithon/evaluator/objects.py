@@ -0,0 +1,231 @@
+"""
+Modèle objet de Pithon : instanciation des classes et accès aux attributs.
+
+Une instance ne porte pas de dictionnaire d'attributs : ses valeurs sont
+rangées dans une liste d'emplacements (`VObject.values`) décrite par sa forme
+cachée (`Shape`), partagée par toutes les instances de la classe dont les
+attributs ont été créés dans le même ordre. Lire un attribut revient donc à
+trouver son emplacement dans la forme, puis à indexer la liste.
+
+Chaque site `obj.attr` du programme a de plus son cache en ligne, créé à la
+compilation (`AttributeCache` en lecture, `AttributeStoreCache` en
+affectation) : il retient, pour chaque forme rencontrée, l'emplacement de
+l'attribut, la méthode trouvée dans la classe ou, pour une affectation, la
+forme suivante. Un site qui n'a vu qu'une forme (monomorphe) se contente d'une
+comparaison d'identité ; jusqu'à `POLYMORPHIC_LIMIT` formes, il consulte sa
+table ; au-delà (mégamorphe), les nouvelles formes passent par la recherche
+complète à chaque accès.
+
+Un appel de méthode `obj.m(...)` ne crée pas de méthode liée : les moteurs
+appellent directement la fonction de la classe, l'instance en tête des
+arguments. Une `VMethodClosure` n'est créée que lorsque la méthode est lue
+comme une valeur (`f = obj.m`).
+
+Une entrée ne devient jamais fausse : une forme n'appartient qu'à une classe,
+dont les méthodes sont fixées à sa définition, et un attribut qui masque une
+méthode fait changer la forme de l'objet.
+"""
+
+from typing import Callable
+from pithon.evaluator.envvalue import EnvValue, Shape, VClassDef, VMethodClosure, VObject
+
+# Nombre maximal de formes retenues par un site d'accès.
+POLYMORPHIC_LIMIT = 4
+
+Call = Callable[[EnvValue, list[EnvValue]], EnvValue]
+
+
+class _InlineCache:
+    """
+    Cache en ligne d'un site d'accès à l'attribut `name`. Les premières formes
+    rencontrées sont testées par identité avant toute autre chose (cas
+    monomorphe) ; toutes sont conservées dans `entries`, jusqu'à
+    `POLYMORPHIC_LIMIT` formes.
+    """
+    __slots__ = ("name", "entries")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.entries: dict[Shape, object] = {}
+
+    def _remember(self, shape: Shape, entry) -> None:
+        if len(self.entries) < POLYMORPHIC_LIMIT:
+            self.entries[shape] = entry
+
+
+class AttributeCache(_InlineCache):
+    """
+    Cache d'un site de lecture `obj.attr`. Une entrée est l'emplacement de
+    l'attribut (int) ou la méthode trouvée dans la classe, retournée liée à
+    l'instance par `load`. Un appel `obj.attr(...)` utilise plutôt
+    `lookup_method` : la méthode est appelée avec l'instance en tête des
+    arguments, sans créer de `VMethodClosure`.
+    """
+    __slots__ = ("shape", "slot", "method_shape", "method")
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        # Cas monomorphe : première forme où l'attribut est un champ, puis une méthode.
+        self.shape: Shape | None = None
+        self.slot = 0
+        self.method_shape: Shape | None = None
+        self.method = None
+
+    def load(self, value: EnvValue) -> EnvValue:
+        """Lit l'attribut de la valeur."""
+        if type(value) is VObject:
+            shape = value.shape
+            if shape is self.shape:
+                return value.values[self.slot]
+            if shape is self.method_shape:
+                return VMethodClosure(self.method, value)
+            return self._load(value, shape)
+        return get_attribute(value, self.name)
+
+    def lookup_method(self, value: EnvValue) -> EnvValue | None:
+        """
+        Méthode de la classe appelée par `value.name(...)`, sans la lier à
+        l'instance ; None si l'attribut existe mais n'est pas une méthode d'un
+        objet (champ, fonction lue sur une classe...).
+        """
+        if type(value) is VObject:
+            shape = value.shape
+            if shape is self.method_shape:
+                return self.method
+            if shape is self.shape:
+                return None
+            entry = self._entry(shape)
+            return None if type(entry) is int else entry
+        # Lève l'erreur d'un attribut inexistant avant l'évaluation des arguments.
+        get_attribute(value, self.name)
+        return None
+
+    def _load(self, value: VObject, shape: Shape) -> EnvValue:
+        entry = self._entry(shape)
+        if type(entry) is int:
+            return value.values[entry]
+        return VMethodClosure(entry, value)
+
+    def _entry(self, shape: Shape):
+        entry = self.entries.get(shape)
+        if entry is None:
+            entry = shape.slots.get(self.name)
+            if entry is None:
+                entry = shape.class_def.methods.get(self.name)
+                if entry is None:
+                    raise _missing(shape.class_def, self.name)
+            self._remember(shape, entry)
+        return entry
+
+    def _remember(self, shape: Shape, entry) -> None:
+        if type(entry) is int:
+            if self.shape is None:
+                self.shape = shape
+                self.slot = entry
+        elif self.method_shape is None:
+            self.method_shape = shape
+            self.method = entry
+        super()._remember(shape, entry)
+
+
+class AttributeStoreCache(_InlineCache):
+    """
+    Cache d'un site d'affectation `obj.attr = valeur`. Une entrée est
+    l'emplacement de l'attribut (int) ou, s'il n'existe pas encore, la forme
+    obtenue en l'ajoutant.
+    """
+    __slots__ = ("shape", "slot", "transition", "next_shape")
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        # Cas monomorphe : première forme où l'attribut existe, puis première forme où il est ajouté.
+        self.shape: Shape | None = None
+        self.slot = 0
+        self.transition: Shape | None = None
+        self.next_shape: Shape | None = None
+
+    def store(self, value: EnvValue, new_value: EnvValue) -> None:
+        """Affecte l'attribut de l'objet, en le créant au besoin."""
+        if type(value) is not VObject:
+            return set_attribute(value, self.name, new_value)
+        shape = value.shape
+        if shape is self.shape:
+            value.values[self.slot] = new_value
+        elif shape is self.transition:
+            value.shape = self.next_shape
+            value.values.append(new_value)
+        else:
+            self._store(value, shape, new_value)
+
+    def _store(self, value: VObject, shape: Shape, new_value: EnvValue) -> None:
+        entry = self.entries.get(shape)
+        if entry is None:
+            entry = shape.slots.get(self.name)
+            if entry is None:
+                entry = shape.with_attribute(self.name)
+            self._remember(shape, entry)
+        if type(entry) is int:
+            value.values[entry] = new_value
+        else:
+            value.shape = entry
+            value.values.append(new_value)
+
+    def _remember(self, shape: Shape, entry) -> None:
+        if type(entry) is int:
+            if self.shape is None:
+                self.shape = shape
+                self.slot = entry
+        elif self.transition is None:
+            self.transition = shape
+            self.next_shape = entry
+        super()._remember(shape, entry)
+
+
+def get_attribute(value: EnvValue, name: str) -> EnvValue:
+    """Lit un attribut sans cache : champ ou méthode liée d'un objet, méthode d'une classe."""
+    if type(value) is VObject:
+        slot = value.shape.slots.get(name)
+        if slot is not None:
+            return value.values[slot]
+        method = value.class_def.methods.get(name)
+        if method is None:
+            raise _missing(value.class_def, name)
+        return VMethodClosure(method, value)
+    if type(value) is VClassDef:
+        method = value.methods.get(name)
+        if method is None:
+            raise AttributeError(f"La classe {value.name} n'a pas d'attribut '{name}'.")
+        return method
+    raise AttributeError(f"Une valeur de type {type(value).__name__} n'a pas d'attribut '{name}'.")
+
+def set_attribute(value: EnvValue, name: str, new_value: EnvValue) -> None:
+    """Affecte un attribut d'objet sans cache."""
+    if type(value) is not VObject:
+        raise AttributeError(f"Impossible d'affecter l'attribut '{name}' d'une valeur de type {type(value).__name__}.")
+    slot = value.shape.slots.get(name)
+    if slot is None:
+        value.shape = value.shape.with_attribute(name)
+        value.values.append(new_value)
+    else:
+        value.values[slot] = new_value
+
+def instantiate(class_def: VClassDef, args: list[EnvValue], call: Call) -> VObject:
+    """Crée une instance et l'initialise par `__init__`, appelée avec `call`."""
+    instance = VObject(class_def.shape, [])
+    init = class_def.methods.get("__init__")
+    if init is not None:
+        call(init, [instance, *args])
+    elif args:
+        raise TypeError(f"{class_def.name}() ne prend pas d'arguments.")
+    return instance
+
+def call_object(func_val: EnvValue, args: list[EnvValue], call: Call) -> EnvValue:
+    """Appelle une méthode liée ou une classe ; `call` appelle les fonctions du moteur."""
+    if type(func_val) is VMethodClosure:
+        return call(func_val.function, [func_val.instance, *args])
+    if type(func_val) is VClassDef:
+        return instantiate(func_val, args, call)
+    raise TypeError("Tentative d'appel d'un objet non-fonction.")
+
+def _missing(class_def: VClassDef, name: str) -> AttributeError:
+    return AttributeError(f"L'objet {class_def.name} n'a pas d'attribut '{name}'.")
@@ -0,0 +1,92 @@
+"""
+Liaison des opérateurs binaires à leur primitive à la compilation.
+
+Chaque occurrence d'un opérateur dans le programme reçoit son propre site
+d'appel (`bind_operator`). Le site mémorise le dernier couple de types
+d'opérandes et la fonction spécialisée correspondante : dans le cas courant
+(par exemple VNumber × VNumber), l'opération ne cherche plus l'opérateur dans
+l'environnement et ne parcourt plus les tests de type de la primitive.
+
+Les fonctions spécialisées ont exactement la sémantique des primitives de
+`primitive.py`, messages d'erreur compris. Un opérateur redéfini dans
+l'environnement par le programme hôte n'est plus consulté : les moteurs
+acceptent `bind_operators=False` pour revenir à la résolution par nom.
+"""
+
+from typing import Callable
+from pithon.evaluator.envvalue import EnvValue, VList, VNumber, VString, VTuple, V_FALSE, V_TRUE, make_number
+from pithon.evaluator.primitive import get_primitive_dict
+
+BinarySite = Callable[[EnvValue, EnvValue], EnvValue]
+
+_PRIMITIVES = get_primitive_dict()
+
+
+def bind_operator(operator: str,
+                  specialize: Callable[[type, type, BinarySite], BinarySite] | None = None) -> BinarySite | None:
+    """
+    Crée un site d'appel pour l'opérateur, ou None s'il n'est pas une primitive.
+    `specialize` reçoit les types des opérandes et la fonction choisie pour
+    eux, et retourne celle que le site garde (comptage de `pithon.evaluator.limits`).
+    """
+    primitive = _PRIMITIVES.get(operator)
+    if primitive is None:
+        return None
+
+    def generic(left, right):
+        return primitive([left, right])
+
+    cached_left = cached_right = None
+    cached = generic
+
+    def site(left, right):
+        nonlocal cached_left, cached_right, cached
+        if type(left) is cached_left and type(right) is cached_right:
+            return cached(left, right)
+        cached_left, cached_right = type(left), type(right)
+        cached = FAST_PATHS.get((operator, cached_left, cached_right), generic)
+        if specialize is not None:
+            cached = specialize(cached_left, cached_right, cached)
+        return cached(left, right)
+
+    site.operator = operator
+    return site
+
+
+def _divide(left, right):
+    if right.value == 0:
+        raise ZeroDivisionError("Division par zéro")
+    return VNumber(left.value / right.value)
+
+def _modulo(left, right):
+    if right.value == 0:
+        raise ZeroDivisionError("Modulo par zéro")
+    return make_number(left.value % right.value)
+
+def _same_number(left, right):
+    # Comme `values_equal` : un même flottant (nan compris) est égal à lui-même.
+    return left.value == right.value or left.value is right.value
+
+# Fonctions spécialisées par (opérateur, type gauche, type droit).
+FAST_PATHS: dict[tuple[str, type, type], BinarySite] = {
+    ("+", VNumber, VNumber): lambda left, right: make_number(left.value + right.value),
+    ("-", VNumber, VNumber): lambda left, right: make_number(left.value - right.value),
+    ("*", VNumber, VNumber): lambda left, right: make_number(left.value * right.value),
+    ("/", VNumber, VNumber): _divide,
+    ("%", VNumber, VNumber): _modulo,
+    ("<", VNumber, VNumber): lambda left, right: V_TRUE if left.value < right.value else V_FALSE,
+    ("<=", VNumber, VNumber): lambda left, right: V_TRUE if left.value <= right.value else V_FALSE,
+    (">", VNumber, VNumber): lambda left, right: V_TRUE if left.value > right.value else V_FALSE,
+    (">=", VNumber, VNumber): lambda left, right: V_TRUE if left.value >= right.value else V_FALSE,
+    ("==", VNumber, VNumber): lambda left, right: V_TRUE if _same_number(left, right) else V_FALSE,
+    ("!=", VNumber, VNumber): lambda left, right: V_FALSE if _same_number(left, right) else V_TRUE,
+    ("+", VString, VString): lambda left, right: VString(left.value + right.value),
+    ("<", VString, VString): lambda left, right: V_TRUE if left.value < right.value else V_FALSE,
+    ("<=", VString, VString): lambda left, right: V_TRUE if left.value <= right.value else V_FALSE,
+    (">", VString, VString): lambda left, right: V_TRUE if left.value > right.value else V_FALSE,
+    (">=", VString, VString): lambda left, right: V_TRUE if left.value >= right.value else V_FALSE,
+    ("==", VString, VString): lambda left, right: V_TRUE if left.value == right.value else V_FALSE,
+    ("!=", VString, VString): lambda left, right: V_FALSE if left.value == right.value else V_TRUE,
+    ("+", VList, VList): lambda left, right: VList(left.value + right.value),
+    ("+", VTuple, VTuple): lambda left, right: VTuple(left.value + right.value),
+}
@@ -0,0 +1,119 @@
+"""
+Sorties des programmes Pithon : destinations de la primitive `print`.
+
+L'environnement créé par `initial_env(output)` lie `print` à une sortie :
+
+- `StreamSink` accumule les lignes et les écrit par blocs sur un flux (par
+  défaut `sys.stdout`, lu au moment de l'écriture) : une écriture quand
+  `buffer_size` caractères sont en attente, à chaque ligne si `buffer_size`
+  vaut 0 ou si le flux est un terminal, et à `flush()` ;
+- `CaptureSink` conserve toute la sortie en mémoire (`getvalue()`) ;
+- `RingBufferSink` n'en conserve que les `max_chars` derniers caractères,
+  par lignes entières, et compte les lignes écartées : sa mémoire est bornée
+  quel que soit le programme.
+
+Sans sortie, `print` appelle le `print` de Python à chaque valeur.
+"""
+
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, TextIO
+from pithon.evaluator.envvalue import EnvValue, V_NONE
+
+# Caractères en attente avant une écriture sur le flux.
+DEFAULT_BUFFER_SIZE = 64 * 1024
+# Caractères conservés par un RingBufferSink.
+DEFAULT_RING_SIZE = 64 * 1024
+
+
+class OutputSink(ABC):
+    """Destination des lignes écrites par `print`."""
+
+    @abstractmethod
+    def write_line(self, line: str) -> None:
+        """Écrit une ligne, sans son saut de ligne final."""
+
+    def flush(self) -> None:
+        """Écrit les lignes en attente ; rien à faire pour une sortie en mémoire."""
+
+
+class StreamSink(OutputSink):
+    """Sortie tamponnée vers un flux texte."""
+
+    def __init__(self, stream: TextIO | None = None, buffer_size: int | None = None):
+        self.stream = stream
+        if buffer_size is None:
+            buffer_size = 0 if _is_terminal(self.target()) else DEFAULT_BUFFER_SIZE
+        self.buffer_size = buffer_size
+        self.pending: list[str] = []
+        self.pending_size = 0
+
+    def target(self) -> TextIO:
+        return sys.stdout if self.stream is None else self.stream
+
+    def write_line(self, line: str) -> None:
+        self.pending.append(line)
+        self.pending_size += len(line) + 1
+        if self.pending_size > self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            target = self.target()
+            target.write("\n".join(self.pending) + "\n")
+            target.flush()
+            self.pending.clear()
+            self.pending_size = 0
+
+
+class CaptureSink(OutputSink):
+    """Sortie conservée en mémoire."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def write_line(self, line: str) -> None:
+        self.lines.append(line)
+
+    def getvalue(self) -> str:
+        return "".join(line + "\n" for line in self.lines)
+
+
+class RingBufferSink(OutputSink):
+    """Sortie en mémoire bornée : seules les dernières lignes sont conservées."""
+
+    def __init__(self, max_chars: int = DEFAULT_RING_SIZE):
+        self.max_chars = max_chars
+        self.lines: deque[str] = deque()
+        self.size = 0
+        self.dropped = 0
+
+    def write_line(self, line: str) -> None:
+        self.lines.append(line)
+        self.size += len(line) + 1
+        while self.size > self.max_chars:
+            self.size -= len(self.lines.popleft()) + 1
+            self.dropped += 1
+
+    def getvalue(self) -> str:
+        return "".join(line + "\n" for line in self.lines)
+
+
+def make_print(sink: OutputSink) -> Callable[[list[EnvValue]], EnvValue]:
+    """Primitive `print` écrivant dans la sortie donnée."""
+    write_line = sink.write_line
+
+    def primitive_print(args: list[EnvValue]) -> EnvValue:
+        """Affiche la valeur passée en argument."""
+        v, = args
+        write_line(str(v))
+        return V_NONE
+
+    return primitive_print
+
+def _is_terminal(stream: TextIO) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
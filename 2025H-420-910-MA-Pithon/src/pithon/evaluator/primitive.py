@@ -3,8 +3,12 @@ Fonctions primitives pour l'évaluateur Pithon.
 Contient les opérations arithmétiques, comparaisons et fonctions utilitaires de base.
 """
 
+import operator
 from typing import Any, Type, TypeVar
-from pithon.evaluator.envvalue import EnvValue, VList, VNone, VTuple, VNumber, VBool, VString
+from pithon.evaluator.envvalue import (
+    EnvValue, VDict, VList, VNone, VNumberArray, VRange, VSet, VTuple, VNumber, VBool, VString, V_NONE,
+    make_bool, make_dict, make_list, make_number, make_set, pack_numbers, values_equal
+)
 
 T = TypeVar('T')
 def check_type(obj: Any, mytype: Type[T]) -> T:
@@ -15,35 +19,47 @@ def check_type(obj: Any, mytype: Type[T]) -> T:
 
 def primitive_add(args: list[EnvValue]):
     """Additionne deux valeurs (nombres, listes, tuples ou chaînes)."""
-    a, b = args
+    a, b = _materialize(args)
     if isinstance(a, VList) and isinstance(b, VList):
         return VList(a.value + b.value)
+    if isinstance(a, VNumberArray) and isinstance(b, VNumberArray) and a.value.typecode == b.value.typecode:
+        return VNumberArray(a.value + b.value)
+    if isinstance(a, (VList, VNumberArray)) and isinstance(b, (VList, VNumberArray)):
+        return make_list(list(a) + list(b))
     if isinstance(a, VTuple) and isinstance(b, VTuple):
         return VTuple(a.value + b.value)
     if isinstance(a, VNumber) and isinstance(b, VNumber):
-        return VNumber(a.value + b.value)
+        return make_number(a.value + b.value)
     if isinstance(a, VString) and isinstance(b, VString):
         return VString(a.value + b.value)
     raise TypeError(f"Addition non supportée entre {type(a).__name__} et {type(b).__name__}")
 
+def _materialize(args: list[EnvValue]) -> list[EnvValue]:
+    """Remplace les intervalles par la liste de leurs nombres, pour `+` et `*`."""
+    return [make_list(list(arg)) if isinstance(arg, VRange) else arg for arg in args]
+
 def primitive_sub(args: list[EnvValue]):
     """Soustrait deux nombres."""
     a, b = args
     if isinstance(a, VNumber) and isinstance(b, VNumber):
-        return VNumber(a.value - b.value)
+        return make_number(a.value - b.value)
     raise TypeError(f"Soustraction non supportée entre {type(a).__name__} et {type(b).__name__}")
 
 def primitive_mul(args: list[EnvValue]):
     """Multiplie deux nombres ou répète une séquence (liste, tuple, chaîne)."""
-    a, b = args
+    a, b = _materialize(args)
     # String/List/Tuple repetition: str * int, list * int, tuple * int
     if isinstance(a, VNumber) and isinstance(b, VNumber):
-        return VNumber(a.value * b.value)
+        return make_number(a.value * b.value)
     # Support for repetition operations
     if isinstance(a, VList) and isinstance(b, VNumber):
         return VList(a.value * int(b.value))
     if isinstance(a, VNumber) and isinstance(b, VList):
         return VList(b.value * int(a.value))
+    if isinstance(a, VNumberArray) and isinstance(b, VNumber):
+        return VNumberArray(a.value * int(b.value))
+    if isinstance(a, VNumber) and isinstance(b, VNumberArray):
+        return VNumberArray(b.value * int(a.value))
     if isinstance(a, VTuple) and isinstance(b, VNumber):
         return VTuple(a.value * int(b.value))
     if isinstance(a, VNumber) and isinstance(b, VTuple):
@@ -69,63 +85,63 @@ def primitive_mod(args: list[EnvValue]):
     if isinstance(a, VNumber) and isinstance(b, VNumber):
         if b.value == 0:
             raise ZeroDivisionError("Modulo par zéro")
-        return VNumber(a.value % b.value)
+        return make_number(a.value % b.value)
     raise TypeError(f"Modulo non supporté entre {type(a).__name__} et {type(b).__name__}")
 
 def primitive_eq(args: list[EnvValue]):
     """Teste l'égalité entre deux valeurs."""
     a, b = args
-    return VBool(a == b)
+    return make_bool(values_equal(a, b))
 
 def primitive_neq(args: list[EnvValue]):
     """Teste la différence entre deux valeurs."""
     a, b = args
-    return VBool(a != b)
+    return make_bool(not values_equal(a, b))
 
 def primitive_lt(args: list[EnvValue]):
     """Teste si la première valeur est inférieure à la seconde (nombres ou chaînes)."""
     a, b = args
     if isinstance(a, VNumber) and isinstance(b, VNumber):
-        return VBool(a.value < b.value)
+        return make_bool(a.value < b.value)
     if isinstance(a, VString) and isinstance(b, VString):
-        return VBool(a.value < b.value)
+        return make_bool(a.value < b.value)
     raise TypeError(f"Comparaison '<' non supportée entre {type(a).__name__} et {type(b).__name__}")
 
 def primitive_lte(args: list[EnvValue]):
     """Teste si la première valeur est inférieure ou égale à la seconde (nombres ou chaînes)."""
     a, b = args
     if isinstance(a, VNumber) and isinstance(b, VNumber):
-        return VBool(a.value <= b.value)
+        return make_bool(a.value <= b.value)
     if isinstance(a, VString) and isinstance(b, VString):
-        return VBool(a.value <= b.value)
+        return make_bool(a.value <= b.value)
     raise TypeError(f"Comparaison '<=' non supportée entre {type(a).__name__} et {type(b).__name__}")
 
 def primitive_gt(args: list[EnvValue]):
     """Teste si la première valeur est supérieure à la seconde (nombres ou chaînes)."""
     a, b = args
     if isinstance(a, VNumber) and isinstance(b, VNumber):
-        return VBool(a.value > b.value)
+        return make_bool(a.value > b.value)
     if isinstance(a, VString) and isinstance(b, VString):
-        return VBool(a.value > b.value)
+        return make_bool(a.value > b.value)
     raise TypeError(f"Comparaison '>' non supportée entre {type(a).__name__} et {type(b).__name__}")
 
 def primitive_gte(args: list[EnvValue]):
     """Teste si la première valeur est supérieure ou égale à la seconde (nombres ou chaînes)."""
     a, b = args
     if isinstance(a, VNumber) and isinstance(b, VNumber):
-        return VBool(a.value >= b.value)
+        return make_bool(a.value >= b.value)
     if isinstance(a, VString) and isinstance(b, VString):
-        return VBool(a.value >= b.value)
+        return make_bool(a.value >= b.value)
     raise TypeError(f"Comparaison '>=' non supportée entre {type(a).__name__} et {type(b).__name__}")
 
 def primitive_print(args: list[EnvValue]):
     """Affiche la valeur passée en argument."""
     v, = args
     print(v)
-    return VNone(value=None)
+    return V_NONE
 
 def primitive_range(args: list[EnvValue]):
-    """Crée une liste de nombres dans un intervalle spécifié."""
+    """Crée un intervalle paresseux de nombres ; ses éléments ne sont créés qu'à l'itération."""
     if len(args) == 1:
         start = 0
         end = check_type(args[0], VNumber).value
@@ -134,7 +150,29 @@ def primitive_range(args: list[EnvValue]):
         end = check_type(args[1], VNumber).value
     else:
         raise TypeError("La fonction 'range' attend 1 ou 2 arguments.")
-    return VList([VNumber(i) for i in range(int(start), int(end))])
+    return VRange(range(int(start), int(end)))
+
+def primitive_dict(args: list[EnvValue]):
+    """Crée un dictionnaire à partir d'une séquence de couples (clé, valeur)."""
+    if len(args) > 1:
+        raise TypeError("La fonction 'dict' attend au plus 1 argument.")
+    items = []
+    for pair in _elements(args[0], "dict") if args else ():
+        if not isinstance(pair, (VTuple, VList)) or len(pair.value) != 2:
+            raise ValueError("La fonction 'dict' attend une séquence de couples (clé, valeur).")
+        items.append(tuple(pair.value))
+    return make_dict(items)
+
+def primitive_set(args: list[EnvValue]):
+    """Crée un ensemble à partir des éléments d'une valeur itérable."""
+    if len(args) > 1:
+        raise TypeError("La fonction 'set' attend au plus 1 argument.")
+    return make_set(list(_elements(args[0], "set")) if args else [])
+
+def _elements(iterable: EnvValue, name: str):
+    if not hasattr(type(iterable), "__iter__"):
+        raise TypeError(f"La fonction '{name}' attend une valeur itérable.")
+    return iter(iterable)
 
 def primitive_str(args: list[EnvValue]):
     """Convertit une valeur en chaîne de caractères."""
@@ -143,11 +181,68 @@ def primitive_str(args: list[EnvValue]):
     value = args[0]
     if isinstance(value, VString):
         return value
-    if isinstance(value, (VNumber, VBool, VNone, VList, VTuple)):
+    if isinstance(value, (VNumberArray, VDict, VSet)):
+        return VString(str(value))
+    if isinstance(value, (VNumber, VBool, VNone, VList, VTuple, VRange)):
         return VString(str(value.value))
     else:
         raise TypeError(f"Type non supporté pour 'str': {type(value).__name__}")
 
+def _numbers(sequence: EnvValue, name: str):
+    """Retourne les nombres Python d'une séquence de nombres (liste, tuple ou range)."""
+    if isinstance(sequence, (VNumberArray, VRange)):
+        return sequence.value
+    if isinstance(sequence, (VList, VTuple)):
+        return [check_type(element, VNumber).value for element in sequence.value]
+    raise TypeError(f"La fonction '{name}' attend une liste de nombres.")
+
+def _number_pairs(args: list[EnvValue], name: str):
+    if len(args) != 2:
+        raise TypeError(f"La fonction '{name}' attend exactement 2 arguments.")
+    a, b = _numbers(args[0], name), _numbers(args[1], name)
+    if len(a) != len(b):
+        raise ValueError(f"La fonction '{name}' attend deux séquences de même longueur.")
+    return a, b
+
+def primitive_sum(args: list[EnvValue]):
+    """Calcule la somme d'une séquence de nombres."""
+    if len(args) != 1:
+        raise TypeError("La fonction 'sum' attend exactement 1 argument.")
+    return make_number(sum(_numbers(args[0], "sum")))
+
+def primitive_min(args: list[EnvValue]):
+    """Retourne le plus petit nombre d'une séquence non vide."""
+    if len(args) != 1:
+        raise TypeError("La fonction 'min' attend exactement 1 argument.")
+    numbers = _numbers(args[0], "min")
+    if not numbers:
+        raise ValueError("La fonction 'min' attend une séquence non vide.")
+    return make_number(min(numbers))
+
+def primitive_max(args: list[EnvValue]):
+    """Retourne le plus grand nombre d'une séquence non vide."""
+    if len(args) != 1:
+        raise TypeError("La fonction 'max' attend exactement 1 argument.")
+    numbers = _numbers(args[0], "max")
+    if not numbers:
+        raise ValueError("La fonction 'max' attend une séquence non vide.")
+    return make_number(max(numbers))
+
+def primitive_dot(args: list[EnvValue]):
+    """Calcule le produit scalaire de deux séquences de nombres de même longueur."""
+    a, b = _number_pairs(args, "dot")
+    return make_number(sum(map(operator.mul, a, b)))
+
+def primitive_vadd(args: list[EnvValue]):
+    """Additionne deux séquences de nombres élément par élément."""
+    a, b = _number_pairs(args, "vadd")
+    return pack_numbers(map(operator.add, a, b))
+
+def primitive_vmul(args: list[EnvValue]):
+    """Multiplie deux séquences de nombres élément par élément."""
+    a, b = _number_pairs(args, "vmul")
+    return pack_numbers(map(operator.mul, a, b))
+
 def get_primitive_dict():
     """Retourne le dictionnaire des fonctions primitives."""
     return {
@@ -165,4 +260,12 @@ def get_primitive_dict():
         'print': primitive_print,
         'range': primitive_range,
         'str': primitive_str,
+        'dict': primitive_dict,
+        'set': primitive_set,
+        'sum': primitive_sum,
+        'min': primitive_min,
+        'max': primitive_max,
+        'dot': primitive_dot,
+        'vadd': primitive_vadd,
+        'vmul': primitive_vmul,
     }
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Profileur déterministe des programmes Pithon (`pithon --profile`).
+
+`instrument` retourne une copie du programme préparée pour le profilage :
+
+- chaque définition de fonction porte le profileur (champ `wrapper`) ; à sa
+  création, la fermeture est enveloppée dans une `ProfiledFunction` qui compte
+  les appels et mesure les temps inclusif et exclusif ;
+- chaque instruction dont la ligne est connue est précédée d'un appel à la
+  primitive cachée `.line`, qui compte les passages par ligne.
+
+`instrument_env` enveloppe de même les primitives de l'environnement. Sans
+`--profile`, rien de tout cela n'est créé et l'exécution n'est pas ralentie.
+Avec, les fonctions profilées sont appelées comme des primitives : le moteur
+vm ne leur applique ni sa pile d'appels explicite ni l'appel terminal.
+
+Le temps inclusif d'une fonction récursive n'est compté qu'une fois, pour
+l'appel le plus externe. `collapsed_stacks` produit le format des piles
+repliées (une ligne `<module>;f;g durée` par pile, en microsecondes), lu par
+flamegraph.pl, inferno ou speedscope.
+"""
+
+from collections import Counter
+from dataclasses import fields, is_dataclass, replace
+from time import perf_counter_ns
+from typing import Callable
+from pithon.evaluator.envframe import EnvFrame
+from pithon.evaluator.envvalue import EnvValue, VFunctionClosure, V_NONE
+from pithon.syntax import PiFunctionCall, PiFunctionDef, PiIfThenElse, PiNumber, PiProgram, PiVariable
+
+# Nom de la primitive de comptage des lignes : invalide en Python, il ne peut
+# pas masquer une variable du programme.
+LINE_HOOK = ".line"
+
+MODULE = "<module>"
+
+# Nombre de lignes affichées dans le rapport.
+REPORT_LINES = 20
+
+# Champs contenant une suite d'instructions.
+_BLOCK_FIELDS = ("body", "then_branch", "else_branch")
+
+
+class FunctionStats:
+    """Statistiques cumulées d'une fonction ; les temps sont en nanosecondes."""
+    __slots__ = ("calls", "inclusive", "exclusive", "active")
+
+    def __init__(self):
+        self.calls = 0
+        self.inclusive = 0
+        self.exclusive = 0
+        # Appels en cours, pour ne compter qu'une fois le temps inclusif d'une récursion.
+        self.active = 0
+
+
+class ProfiledFunction:
+    """Fonction (fermeture ou primitive) dont les appels sont mesurés par le profileur."""
+    __slots__ = ("profiler", "name", "target", "function")
+
+    def __init__(self, profiler: 'Profiler', name: str, target, function: Callable):
+        self.profiler = profiler
+        self.name = name
+        self.target = target
+        self.function = function
+
+    def __call__(self, args: list[EnvValue]) -> EnvValue:
+        return self.profiler.call(self.name, self.function, args)
+
+    def __str__(self) -> str:
+        return str(self.target)
+
+
+class Profiler:
+    """Mesures d'une exécution : fonctions, lignes et piles d'appels."""
+
+    def __init__(self, source: str = ""):
+        self.source_lines = source.splitlines()
+        self.functions: dict[str, FunctionStats] = {}
+        self.lines: Counter[int] = Counter()
+        # Pile repliée -> temps exclusif cumulé (ns).
+        self.stacks: Counter[str] = Counter()
+        # Appels en cours : [nom, temps passé dans les appels enfants].
+        self.stack: list[list] = []
+
+    def wrap(self, closure: VFunctionClosure, invoke) -> ProfiledFunction:
+        """Enveloppe une fermeture qui vient d'être créée."""
+        return ProfiledFunction(self, closure.funcdef.name, closure, lambda args: invoke(closure, args))
+
+    def run(self, evaluate: Callable[[PiProgram, EnvFrame], EnvValue], program: PiProgram,
+            env: EnvFrame) -> EnvValue:
+        """Évalue le programme instrumenté, mesuré comme la fonction `<module>`."""
+        return self.call(MODULE, lambda args: evaluate(program, env), [])
+
+    def call(self, name: str, function: Callable, args: list[EnvValue]) -> EnvValue:
+        stats = self.functions.get(name)
+        if stats is None:
+            stats = self.functions[name] = FunctionStats()
+        stats.calls += 1
+        stats.active += 1
+        frame = [name, 0]
+        self.stack.append(frame)
+        start = perf_counter_ns()
+        try:
+            return function(args)
+        finally:
+            elapsed = perf_counter_ns() - start
+            self.stack.pop()
+            exclusive = elapsed - frame[1]
+            stats.exclusive += exclusive
+            stats.active -= 1
+            if not stats.active:
+                stats.inclusive += elapsed
+            if self.stack:
+                self.stack[-1][1] += elapsed
+            self.stacks[";".join([f[0] for f in self.stack] + [name])] += exclusive
+
+    def count_line(self, args: list[EnvValue]) -> EnvValue:
+        """Primitive `.line` insérée devant chaque instruction."""
+        self.lines[args[0].value] += 1
+        return V_NONE
+
+    def report(self) -> str:
+        """Rapport trié par temps inclusif, suivi des lignes les plus exécutées."""
+        out = ["Fonctions (temps en ms) :",
+               f"{'appels':>10} {'inclusif':>12} {'exclusif':>12}  fonction"]
+        ranked = sorted(self.functions.items(), key=lambda item: (-item[1].inclusive, item[0]))
+        for name, stats in ranked:
+            out.append(f"{stats.calls:>10} {stats.inclusive / 1e6:>12.3f} {stats.exclusive / 1e6:>12.3f}  {name}")
+        if self.lines:
+            out += ["", "Lignes les plus exécutées :", f"{'ligne':>10} {'passages':>12}  source"]
+            for line, hits in sorted(self.lines.items(), key=lambda item: (-item[1], item[0]))[:REPORT_LINES]:
+                text = self.source_lines[line - 1].strip() if line <= len(self.source_lines) else ""
+                out.append(f"{line:>10} {hits:>12}  {text}")
+        return "\n".join(out)
+
+    def collapsed_stacks(self) -> str:
+        """Piles repliées pour les outils de flamegraph, durées en microsecondes."""
+        return "".join(f"{stack} {elapsed // 1000}\n" for stack, elapsed in sorted(self.stacks.items())
+                       if elapsed >= 1000)
+
+
+def instrument(program: PiProgram, profiler: Profiler) -> PiProgram:
+    """Retourne une copie du programme qui compte les lignes et dont les fonctions sont profilées."""
+    return _block(program, profiler)
+
+def instrument_env(env: EnvFrame, profiler: Profiler) -> None:
+    """Enveloppe les primitives de l'environnement et y ajoute le compteur de lignes."""
+    for name, value in list(env.vars.items()):
+        if callable(value):
+            env.vars[name] = ProfiledFunction(profiler, name, value, value)
+    env.vars[LINE_HOOK] = profiler.count_line
+
+def _block(stmts: list, profiler: Profiler) -> list:
+    result = []
+    for stmt in stmts:
+        line = getattr(stmt, "line", None)
+        if line is not None:
+            result.append(PiFunctionCall(PiVariable(LINE_HOOK), [PiNumber(line)]))
+        result.append(_node(stmt, profiler))
+    return result
+
+def _node(node, profiler: Profiler):
+    if not is_dataclass(node):
+        return node
+    # Les branches d'une expression conditionnelle (sans ligne) sont des expressions.
+    is_expression = isinstance(node, PiIfThenElse) and node.line is None
+    changes = {}
+    for f in fields(node):
+        value = getattr(node, f.name)
+        if f.name in _BLOCK_FIELDS and not is_expression:
+            changes[f.name] = _block(value, profiler)
+        elif isinstance(value, list):
+            changes[f.name] = [_node(item, profiler) for item in value]
+        elif isinstance(value, tuple):
+            changes[f.name] = tuple(_node(item, profiler) for item in value)
+        elif is_dataclass(value):
+            changes[f.name] = _node(value, profiler)
+    if isinstance(node, PiFunctionDef):
+        changes["wrapper"] = profiler
+    return replace(node, **changes) if changes else node
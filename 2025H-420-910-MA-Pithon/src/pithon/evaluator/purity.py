@@ -0,0 +1,120 @@
+"""
+Analyse de pureté des fonctions Pithon, utilisée par la mémoïsation.
+
+Une fonction définie au niveau du module est pure si son résultat ne dépend
+que de ses arguments et si son appel n'a pas d'effet observable. Les valeurs
+Pithon ne sont pas modifiables et une affectation dans une fonction est
+toujours locale ; il suffit donc de vérifier que le corps :
+
+- ne définit ni fonction ni classe et n'utilise aucun attribut ;
+- ne lit, hors de ses paramètres et des variables locales déjà affectées,
+  que des noms globaux stables : liés une seule fois, par une instruction du
+  niveau du module, ou jamais liés par le programme (primitives, sauf 'print') ;
+- n'appelle, par leur nom global, que des fonctions pures ou des primitives
+  autres que 'print'.
+
+Les appels ajoutés par l'instrumentation (passages par ligne du profileur
+`.line`) ne changent pas le résultat : ils ne rendent pas une fonction impure.
+
+Les fonctions qui s'appellent entre elles sont analysées ensemble : toutes
+sont d'abord supposées pures, puis celles qui appellent une fonction impure
+sont retirées jusqu'à stabilité.
+"""
+
+from collections import Counter
+from dataclasses import fields, is_dataclass
+from pithon.evaluator.primitive import get_primitive_dict
+from pithon.evaluator.profiler import LINE_HOOK
+from pithon.evaluator.resolver import assigned_names, local_names
+from pithon.syntax import (
+    PiAssignment, PiAttribute, PiAttributeAssignment, PiClassDef, PiFor, PiFunctionCall,
+    PiFunctionDef, PiProgram, PiStatement, PiVariable
+)
+
+# Primitives dont l'appel a un effet observable.
+IMPURE_PRIMITIVES = frozenset({"print"})
+
+# Primitives cachées de l'instrumentation, sans effet sur le résultat.
+HOOKS = frozenset({LINE_HOOK})
+
+# Champs contenant une suite d'instructions.
+_BLOCK_FIELDS = ("body", "then_branch", "else_branch")
+
+
+def pure_functions(program: PiProgram) -> set[str]:
+    """Retourne les noms des fonctions du module dont les appels peuvent être mémoïsés."""
+    bindings = Counter(assigned_names(program))
+    stable = {stmt.name for stmt in program
+              if isinstance(stmt, (PiAssignment, PiFunctionDef)) and bindings[stmt.name] == 1}
+    primitives = {name for name in get_primitive_dict()
+                  if name not in IMPURE_PRIMITIVES and bindings[name] == 0} | HOOKS
+
+    def readable(name: str) -> bool:
+        return name in stable or (bindings[name] == 0 and name not in IMPURE_PRIMITIVES)
+
+    analyses = {}
+    for stmt in program:
+        if isinstance(stmt, PiFunctionDef) and stmt.name in stable:
+            analysis = _Analysis(stmt)
+            if analysis.pure and all(readable(name) for name in analysis.reads):
+                analyses[stmt.name] = analysis
+    pure = set(analyses)
+    changed = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            if not all(callee in pure or callee in primitives for callee in analyses[name].calls):
+                pure.discard(name)
+                changed = True
+    return pure
+
+
+class _Analysis:
+    """Noms lus et appelés par le corps d'une fonction, dans l'ordre d'évaluation."""
+
+    def __init__(self, funcdef: PiFunctionDef):
+        self.locals = set(local_names(funcdef))
+        # Noms qui peuvent être lus dans l'environnement du module.
+        self.reads: set[str] = set()
+        # Noms globaux appelés.
+        self.calls: set[str] = set()
+        self.pure = True
+        parameters = set(funcdef.arg_names) | ({funcdef.vararg} if funcdef.vararg else set())
+        self.block(funcdef.body, parameters)
+
+    def block(self, stmts: list[PiStatement], assigned: set[str]) -> None:
+        # Une variable locale lue avant toute affectation est cherchée dans le module.
+        assigned = set(assigned)
+        for stmt in stmts:
+            self.node(stmt, assigned)
+            if isinstance(stmt, PiAssignment):
+                assigned.add(stmt.name)
+
+    def node(self, node, assigned: set[str]) -> None:
+        if isinstance(node, (PiFunctionDef, PiClassDef, PiAttribute, PiAttributeAssignment)):
+            self.pure = False
+        elif isinstance(node, PiVariable):
+            if node.name not in assigned:
+                self.reads.add(node.name)
+        elif isinstance(node, PiFunctionCall):
+            function = node.function
+            if isinstance(function, PiVariable) and function.name not in self.locals:
+                self.calls.add(function.name)
+            else:
+                # Fonction reçue en argument ou calculée : elle peut avoir un effet.
+                self.pure = False
+            for arg in node.args:
+                self.node(arg, assigned)
+        elif isinstance(node, PiFor):
+            self.node(node.iterable, assigned)
+            self.block(node.body, assigned | {node.var})
+        elif is_dataclass(node):
+            for f in fields(node):
+                value = getattr(node, f.name)
+                if f.name in _BLOCK_FIELDS:
+                    self.block(value, assigned)
+                elif isinstance(value, (list, tuple)):
+                    for item in value:
+                        self.node(item, assigned)
+                else:
+                    self.node(value, assigned)
@@ -0,0 +1,117 @@
+"""
+Résolution lexicale des variables Pithon.
+
+Dans une fonction, chaque nom affecté (paramètres, affectations, variables de
+boucle, définitions imbriquées) reçoit un emplacement dans le cadre d'appel.
+Chaque `PiVariable` reçoit alors une adresse (profondeur, emplacement) : le
+nombre de cadres à remonter puis l'indice à lire. Les noms globaux (primitives
+comprises) gardent une résolution par nom dans l'environnement du module, ce
+qui permet au REPL de les redéfinir.
+
+Un emplacement encore vide à la lecture est ignoré et la recherche continue
+dans les portées englobantes, comme avec `EnvFrame.lookup`.
+
+Chaque `PiBinaryOperation` reçoit aussi son site d'appel lié à la primitive
+de l'opérateur, sauf si `bind_operators` est faux ; un site déjà fixé (voir
+`pithon.evaluator.limits`) est conservé. Chaque accès à un attribut reçoit son
+propre cache en ligne (voir `pithon.evaluator.objects`).
+"""
+
+from dataclasses import fields, is_dataclass, replace
+from pithon.evaluator.objects import AttributeCache, AttributeStoreCache
+from pithon.evaluator.operators import bind_operator
+from pithon.syntax import (
+    PiAssignment, PiAttribute, PiAttributeAssignment, PiBinaryOperation, PiClassDef, PiFor, PiFunctionDef, PiIfThenElse, PiProgram,
+    PiStatement, PiVariable, PiWhile
+)
+
+
+def assigned_names(stmts: list[PiStatement]) -> list[str]:
+    """Retourne les noms liés par un bloc, sans descendre dans les fonctions imbriquées."""
+    names = []
+    for stmt in stmts:
+        if isinstance(stmt, PiAssignment):
+            names.append(stmt.name)
+        elif isinstance(stmt, (PiFunctionDef, PiClassDef)):
+            names.append(stmt.name)
+        elif isinstance(stmt, PiFor):
+            names.append(stmt.var)
+            names.extend(assigned_names(stmt.body))
+        elif isinstance(stmt, PiWhile):
+            names.extend(assigned_names(stmt.body))
+        elif isinstance(stmt, PiIfThenElse):
+            names.extend(assigned_names(stmt.then_branch))
+            names.extend(assigned_names(stmt.else_branch))
+    return names
+
+def local_names(funcdef: PiFunctionDef) -> tuple[str, ...]:
+    """Retourne les noms des emplacements d'une fonction : paramètres, variadique, puis locaux."""
+    names = list(funcdef.arg_names)
+    if funcdef.vararg:
+        names.append(funcdef.vararg)
+    for name in assigned_names(funcdef.body):
+        if name not in names:
+            names.append(name)
+    return tuple(names)
+
+def resolve(program: PiProgram, bind_operators: bool = True) -> PiProgram:
+    """Retourne une copie du programme dont les variables des fonctions sont adressées."""
+    return _Resolver(None, bind_operators=bind_operators).rewrite(program)
+
+
+class _Resolver:
+    """Réécrit les nœuds d'une portée (fonction, ou module si `names` est None)."""
+
+    def __init__(self, names: tuple[str, ...] | None, parent: '_Resolver | None' = None,
+                 bind_operators: bool = True):
+        self.names = names
+        self.slots = {name: i for i, name in enumerate(names)} if names is not None else {}
+        self.parent = parent
+        self.bind_operators = bind_operators
+
+    def rewrite(self, value):
+        if isinstance(value, list):
+            return [self.rewrite(item) for item in value]
+        if isinstance(value, tuple):
+            return tuple(self.rewrite(item) for item in value)
+        if not is_dataclass(value):
+            return value
+        if isinstance(value, PiVariable):
+            return self.variable(value)
+        if isinstance(value, PiFunctionDef):
+            return self.function(value)
+        if isinstance(value, PiClassDef):
+            # Les méthodes ne sont pas liées dans la portée qui définit la classe.
+            slot = self.slots[value.name] if self.names is not None else None
+            return replace(value, methods=[self.function(m, bound=False) for m in value.methods], slot=slot)
+        changes = {f.name: self.rewrite(getattr(value, f.name)) for f in fields(value)
+                   if f.name not in ("slot", "depth", "site", "cache")}
+        if isinstance(value, PiBinaryOperation) and self.bind_operators and value.site is None:
+            changes["site"] = bind_operator(value.operator)
+        elif isinstance(value, PiAssignment) and self.names is not None:
+            changes["slot"] = self.slots[value.name]
+        elif isinstance(value, PiFor) and self.names is not None:
+            changes["slot"] = self.slots[value.var]
+        elif isinstance(value, PiAttribute):
+            changes["cache"] = AttributeCache(value.attr)
+        elif isinstance(value, PiAttributeAssignment):
+            changes["cache"] = AttributeStoreCache(value.attr)
+        return replace(value, **changes)
+
+    def variable(self, node: PiVariable) -> PiVariable:
+        if self.names is None:
+            return node
+        depth = 0
+        scope = self
+        while scope.names is not None:
+            if node.name in scope.slots:
+                return replace(node, depth=depth, slot=scope.slots[node.name])
+            depth += 1
+            scope = scope.parent
+        return replace(node, depth=depth, slot=None)
+
+    def function(self, node: PiFunctionDef, bound: bool = True) -> PiFunctionDef:
+        names = local_names(node)
+        body = _Resolver(names, self, self.bind_operators).rewrite(node.body)
+        slot = self.slots[node.name] if bound and self.names is not None else None
+        return replace(node, body=body, slot=slot, local_names=names)
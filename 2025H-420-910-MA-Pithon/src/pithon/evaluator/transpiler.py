@@ -0,0 +1,375 @@
+"""
+Transpilation d'un programme Pithon vers du code Python compilé par `compile()`.
+
+Chaque fonction Pithon devient une fonction Python qui reçoit l'environnement
+de sa fermeture et la liste de ses arguments ; les variables restent stockées
+dans des `EnvFrame`, les valeurs restent encapsulées (`VNumber`, `VString`...)
+et les conditions doivent toujours être des `VBool`. Les boucles, `break`,
+`continue` et `return` deviennent les instructions Python natives.
+"""
+
+from dataclasses import dataclass
+from types import CodeType
+from pithon.evaluator.envframe import EnvFrame
+from pithon.evaluator.envvalue import (
+    EnvValue, VClassDef, VFunctionClosure, VList, VObject, VNone, VTuple, VNumber, VBool, VString, V_FALSE,
+    V_NONE, V_TRUE, make_bool, make_dict, make_list, make_number, make_set
+)
+from pithon.evaluator.objects import AttributeCache, AttributeStoreCache, call_object
+from pithon.evaluator.operators import bind_operator
+from pithon.evaluator.evaluator import (
+    BreakException, ContinueException, ReturnException,
+    _check_valid_piandor_type, call_function, iterate_value, subscript_value, contains_value,
+)
+from pithon.evaluator.primitive import check_type
+from pithon.syntax import (
+    PiAssignment, PiBinaryOperation, PiNumber, PiBool, PiProgram, PiStatement, PiSubscript,
+    PiVariable, PiIfThenElse, PiNot, PiAnd, PiOr, PiWhile, PiNone, PiList, PiTuple, PiDict, PiSet, PiString,
+    PiFunctionDef, PiFunctionCall, PiFor, PiBreak, PiContinue, PiIn, PiReturn, PiClassDef, PiAttribute,
+    PiAttributeAssignment
+)
+from pithon.evaluator.resolver import assigned_names
+
+FILENAME = "<pithon>"
+ENTRY_POINT = "_pithon_main"
+
+
+@dataclass
+class TranspiledProgram:
+    """Programme transpilé : source Python générée, code compilé et constantes."""
+    source: str
+    code: CodeType
+    constants: dict[str, object]
+
+    def run(self, env: EnvFrame) -> EnvValue:
+        """Exécute le programme dans l'environnement donné."""
+        namespace = dict(_RUNTIME)
+        namespace.update(self.constants)
+        namespace["genv"] = env
+        exec(self.code, namespace)
+        return namespace[ENTRY_POINT](env)
+
+
+def transpile(program: PiProgram, bind_operators: bool = True) -> TranspiledProgram:
+    """Transpile un programme en code Python compilé."""
+    transpiler = _Transpiler(bind_operators)
+    source = transpiler.program(program)
+    return TranspiledProgram(source, compile(source, FILENAME, "exec"), transpiler.constants)
+
+def evaluate_transpiled(program: PiProgram, env: EnvFrame, bind_operators: bool = True) -> EnvValue:
+    """Transpile puis exécute un programme dans l'environnement donné."""
+    return transpile(program, bind_operators).run(env)
+
+
+# Fonctions d'exécution référencées par le code généré.
+
+def _call(func_val, args):
+    if callable(func_val):
+        return func_val(args)
+    if isinstance(func_val, VFunctionClosure):
+        if func_val.code is not None:
+            return func_val.code(func_val.closure_env, args)
+        return call_function(func_val, args)
+    return call_object(func_val, args, _call)
+
+def _call_method(method, cache, args):
+    # `args` commence par l'objet ; sans méthode, l'attribut est lu et appelé sans lui.
+    if method is None:
+        return _call(cache.load(args[0]), args[1:])
+    if type(method) is VFunctionClosure and method.code is not None:
+        return method.code(method.closure_env, args)
+    return _call(method, args)
+
+def _invoke(func_val, args):
+    return func_val.code(func_val.closure_env, args)
+
+def _truth(cond):
+    if not isinstance(cond, VBool):
+        check_type(cond, VBool)
+    return cond.value
+
+def _logic(value):
+    _check_valid_piandor_type(value)
+    return value
+
+def _not(value):
+    _check_valid_piandor_type(value)
+    return V_FALSE if value.value else V_TRUE
+
+def _unsupported(node_type):
+    raise TypeError(f"Type de nœud non supporté : {node_type}")
+
+_RUNTIME = {
+    "EnvFrame": EnvFrame, "VFunctionClosure": VFunctionClosure, "VList": VList, "VTuple": VTuple,
+    "VClassDef": VClassDef, "VObject": VObject, "make_list": make_list, "make_dict": make_dict,
+    "make_set": make_set,
+    "VBool": VBool, "check_type": check_type, "ReturnException": ReturnException,
+    "BreakException": BreakException, "ContinueException": ContinueException,
+    "_call": _call, "_call_method": _call_method, "_invoke": _invoke, "_truth": _truth, "_logic": _logic,
+    "_not": _not, "_iterate": iterate_value,
+    "_subscript": subscript_value, "_contains": contains_value, "_unsupported": _unsupported,
+}
+
+
+class _Scope:
+    """Portée d'une fonction en cours de transpilation (ou du module si `funcdef` est None)."""
+    def __init__(self, funcdef: PiFunctionDef | None):
+        self.lines: list[str] = []
+        self.loop_depth = 0
+        self.is_function = funcdef is not None
+        self.params = set(funcdef.arg_names) | ({funcdef.vararg} if funcdef.vararg else set()) if funcdef else set()
+        self.locals = set(assigned_names(funcdef.body)) if funcdef else set()
+
+
+class _Transpiler:
+    """Génère le source Python d'un programme Pithon."""
+
+    def __init__(self, bind_operators: bool = True):
+        self.bind_operators = bind_operators
+        self.constants: dict[str, object] = {}
+        self.constant_names: dict[tuple, str] = {}
+        self.functions: list[list[str]] = []
+        self.counter = 0
+
+    def program(self, program: PiProgram) -> str:
+        scope = _Scope(None)
+        self.block(scope, program, 1, "return {}")
+        chunks = [f"def {ENTRY_POINT}(env):", "    v = env.vars", *scope.lines]
+        for lines in self.functions:
+            chunks.extend(lines)
+        return "\n".join(chunks) + "\n"
+
+    def fresh(self, prefix: str) -> str:
+        self.counter += 1
+        return f"_{prefix}{self.counter}"
+
+    def constant(self, value) -> str:
+        if isinstance(value, (VNumber, VBool, VNone, VString)):
+            key = (type(value), repr(value))
+        else:
+            key = (type(value), id(value))
+        if key not in self.constant_names:
+            name = f"_K{len(self.constant_names)}"
+            self.constant_names[key] = name
+            self.constants[name] = value
+        return self.constant_names[key]
+
+    def none(self) -> str:
+        return self.constant(V_NONE)
+
+    # Instructions
+
+    def block(self, scope: _Scope, stmts: list[PiStatement], indent: int, sink: str | None) -> None:
+        """Génère un bloc ; la valeur de la dernière instruction est passée à `sink`."""
+        start = len(scope.lines)
+        if not stmts and sink is not None:
+            self.emit(scope, indent, sink.format(self.none()))
+        for stmt in stmts[:-1]:
+            self.stmt(scope, stmt, indent, None)
+        if stmts:
+            self.stmt(scope, stmts[-1], indent, sink)
+        if len(scope.lines) == start:
+            self.emit(scope, indent, "pass")
+
+    def emit(self, scope: _Scope, indent: int, line: str) -> None:
+        scope.lines.append("    " * indent + line)
+
+    def stmt(self, scope: _Scope, node: PiStatement, indent: int, sink: str | None) -> None:
+        if isinstance(node, PiAssignment):
+            value = self.expr(scope, node.value)
+            if sink is None:
+                self.emit(scope, indent, f"v[{node.name!r}] = {value}")
+            else:
+                temp = self.fresh("t")
+                self.emit(scope, indent, f"v[{node.name!r}] = {temp} = {value}")
+                self.emit(scope, indent, sink.format(temp))
+        elif isinstance(node, PiIfThenElse):
+            cond = self.fresh("c")
+            self.emit_condition(scope, indent, cond, node.condition)
+            self.emit(scope, indent, f"if {cond}.value:")
+            self.block(scope, node.then_branch, indent + 1, sink)
+            if node.else_branch or sink is not None:
+                self.emit(scope, indent, "else:")
+                self.block(scope, node.else_branch, indent + 1, sink)
+        elif isinstance(node, PiWhile):
+            last = self.init_loop_value(scope, indent, sink)
+            cond = self.fresh("c")
+            self.emit(scope, indent, "while True:")
+            self.emit_condition(scope, indent + 1, cond, node.condition)
+            self.emit(scope, indent + 1, f"if not {cond}.value:")
+            self.emit(scope, indent + 2, "break")
+            self.loop_body(scope, node, indent + 1, last)
+            self.finish_loop(scope, indent, sink, last)
+        elif isinstance(node, PiFor):
+            last = self.init_loop_value(scope, indent, sink)
+            item = self.fresh("i")
+            self.emit(scope, indent, f"for {item} in _iterate({self.expr(scope, node.iterable)}):")
+            self.emit(scope, indent + 1, f"v[{node.var!r}] = {item}")
+            self.loop_body(scope, node, indent + 1, last)
+            self.finish_loop(scope, indent, sink, last)
+        elif isinstance(node, PiBreak):
+            self.emit(scope, indent, "break" if scope.loop_depth else "raise BreakException()")
+        elif isinstance(node, PiContinue):
+            self.emit(scope, indent, "continue" if scope.loop_depth else "raise ContinueException()")
+        elif isinstance(node, PiFunctionDef):
+            self.emit(scope, indent, f"v[{node.name!r}] = {self.closure(node)}")
+            if sink is not None:
+                self.emit(scope, indent, sink.format(self.none()))
+        elif isinstance(node, PiClassDef):
+            methods = ", ".join(f"{method.name!r}: {self.closure(method)}" for method in node.methods)
+            self.emit(scope, indent, f"v[{node.name!r}] = VClassDef({node.name!r}, {{{methods}}})")
+            if sink is not None:
+                self.emit(scope, indent, sink.format(self.none()))
+        elif isinstance(node, PiAttributeAssignment):
+            # Comme en Python, la valeur est évaluée avant l'objet.
+            temp = self.fresh("t")
+            target = self.fresh("o")
+            cache = self.constant(AttributeStoreCache(node.attr))
+            self.emit(scope, indent, f"{temp} = {self.expr(scope, node.value)}")
+            self.emit(scope, indent, f"{target} = {self.expr(scope, node.object)}")
+            # Cas monomorphe du cache en ligne, testé sur place.
+            self.emit(scope, indent, f"if type({target}) is VObject and {target}.shape is {cache}.shape:")
+            self.emit(scope, indent + 1, f"{target}.values[{cache}.slot] = {temp}")
+            self.emit(scope, indent, "else:")
+            self.emit(scope, indent + 1, f"{cache}.store({target}, {temp})")
+            if sink is not None:
+                self.emit(scope, indent, sink.format(temp))
+        elif isinstance(node, PiReturn):
+            value = self.expr(scope, node.value)
+            if scope.is_function:
+                self.emit(scope, indent, f"return {value}")
+            else:
+                self.emit(scope, indent, f"raise ReturnException({value})")
+        else:
+            value = self.expr(scope, node)
+            self.emit(scope, indent, value if sink is None else sink.format(value))
+
+    def emit_condition(self, scope: _Scope, indent: int, name: str, condition) -> None:
+        self.emit(scope, indent, f"{name} = {self.expr(scope, condition)}")
+        self.emit(scope, indent, f"if not isinstance({name}, VBool):")
+        self.emit(scope, indent + 1, f"check_type({name}, VBool)")
+
+    def init_loop_value(self, scope: _Scope, indent: int, sink: str | None) -> str | None:
+        if sink is None:
+            return None
+        last = self.fresh("last")
+        self.emit(scope, indent, f"{last} = {self.none()}")
+        return last
+
+    def loop_body(self, scope: _Scope, node: PiWhile | PiFor, indent: int, last: str | None) -> None:
+        scope.loop_depth += 1
+        if node.fuel is not None:
+            self.emit(scope, indent, f"{self.constant(node.fuel)}()")
+        self.block(scope, node.body, indent, None if last is None else f"{last} = {{}}")
+        scope.loop_depth -= 1
+
+    def finish_loop(self, scope: _Scope, indent: int, sink: str | None, last: str | None) -> None:
+        if sink is not None:
+            self.emit(scope, indent, sink.format(last))
+
+    def closure(self, node: PiFunctionDef) -> str:
+        """Expression qui crée la fermeture d'une fonction (ou d'une méthode) dans `env`."""
+        closure = f"VFunctionClosure({self.constant(node)}, env, code={self.function(node)})"
+        if node.wrapper is not None:
+            closure = f"{self.constant(node.wrapper)}.wrap({closure}, _invoke)"
+        return closure
+
+    def function(self, node: PiFunctionDef) -> str:
+        """Génère la fonction Python correspondant à une fonction Pithon et retourne son nom."""
+        name = self.fresh(f"pithon_fn_{node.name}_")
+        scope = _Scope(node)
+        argcount = len(node.arg_names)
+        lines = ["", f"def {name}(closure_env, args):",
+                 "    env = EnvFrame(closure_env)",
+                 "    v = env.vars"]
+        lines.append(f"    if len(args) < {argcount}:")
+        lines.append("        raise TypeError(\"Argument manquant pour la fonction.\")")
+        for i, arg_name in enumerate(node.arg_names):
+            lines.append(f"    v[{arg_name!r}] = args[{i}]")
+        if node.vararg:
+            lines.append(f"    v[{node.vararg!r}] = VList(args[{argcount}:])")
+        else:
+            lines.append(f"    if len(args) > {argcount}:")
+            lines.append("        raise TypeError(\"Trop d'arguments pour la fonction.\")")
+        if node.fuel is not None:
+            lines.append(f"    {self.constant(node.fuel)}()")
+        self.functions.append(lines)
+        self.block(scope, node.body, 1, "return {}")
+        lines.extend(scope.lines)
+        return name
+
+    # Expressions
+
+    def expr(self, scope: _Scope, node) -> str:
+        if isinstance(node, PiNumber):
+            return self.constant(make_number(node.value))
+        elif isinstance(node, PiBool):
+            return self.constant(make_bool(node.value))
+        elif isinstance(node, PiNone):
+            return self.constant(V_NONE)
+        elif isinstance(node, PiString):
+            return self.constant(VString(node.value))
+        elif isinstance(node, PiVariable):
+            return self.variable(scope, node.name)
+        elif isinstance(node, PiBinaryOperation):
+            left = self.expr(scope, node.left)
+            right = self.expr(scope, node.right)
+            site = node.site or (bind_operator(node.operator) if self.bind_operators else None)
+            if site is not None:
+                return f"{self.constant(site)}({left}, {right})"
+            return f"genv.lookup({node.operator!r})([{left}, {right}])"
+        elif isinstance(node, PiList):
+            return f"make_list([{', '.join(self.expr(scope, e) for e in node.elements)}])"
+        elif isinstance(node, PiTuple):
+            return f"VTuple(({''.join(self.expr(scope, e) + ', ' for e in node.elements)}))"
+        elif isinstance(node, PiDict):
+            items = ", ".join(f"({self.expr(scope, key)}, {self.expr(scope, value)})"
+                              for key, value in zip(node.keys, node.values))
+            return f"make_dict([{items}])"
+        elif isinstance(node, PiSet):
+            return f"make_set([{', '.join(self.expr(scope, e) for e in node.elements)}])"
+        elif isinstance(node, PiNot):
+            return f"_not({self.expr(scope, node.operand)})"
+        elif isinstance(node, (PiAnd, PiOr)):
+            temp = self.fresh("l")
+            left = self.expr(scope, node.left)
+            right = self.expr(scope, node.right)
+            test = "not " if isinstance(node, PiAnd) else ""
+            return f"({temp} if {test}_logic({temp} := {left}).value else _logic({right}))"
+        elif isinstance(node, PiFunctionCall) and isinstance(node.function, PiAttribute):
+            # Appel de méthode : l'objet est passé en premier argument, sans méthode liée.
+            value = self.fresh("o")
+            cache = self.constant(AttributeCache(node.function.attr))
+            obj = self.expr(scope, node.function.object)
+            args = "".join(", " + self.expr(scope, arg) for arg in node.args)
+            return (f"_call_method({cache}.method if type({value} := {obj}) is VObject"
+                    f" and {value}.shape is {cache}.method_shape else {cache}.lookup_method({value}),"
+                    f" {cache}, [{value}{args}])")
+        elif isinstance(node, PiFunctionCall):
+            function = self.expr(scope, node.function)
+            args = ", ".join(self.expr(scope, arg) for arg in node.args)
+            return f"_call({function}, [{args}])"
+        elif isinstance(node, PiIn):
+            return f"_contains({self.expr(scope, node.container)}, {self.expr(scope, node.element)})"
+        elif isinstance(node, PiSubscript):
+            return f"_subscript({self.expr(scope, node.collection)}, {self.expr(scope, node.index)})"
+        elif isinstance(node, PiAttribute):
+            value = self.fresh("o")
+            cache = self.constant(AttributeCache(node.attr))
+            return (f"({value}.values[{cache}.slot] if type({value} := {self.expr(scope, node.object)}) is VObject"
+                    f" and {value}.shape is {cache}.shape else {cache}.load({value}))")
+        elif isinstance(node, PiIfThenElse) and len(node.then_branch) == 1 and len(node.else_branch) == 1:
+            cond = self.expr(scope, node.condition)
+            then_value = self.expr(scope, node.then_branch[0])
+            else_value = self.expr(scope, node.else_branch[0])
+            return f"({then_value} if _truth({cond}) else {else_value})"
+        else:
+            return f"_unsupported({self.constant(type(node))})"
+
+    def variable(self, scope: _Scope, name: str) -> str:
+        if name in scope.params:
+            return f"v[{name!r}]"
+        if name in scope.locals:
+            # Un local pas encore affecté est cherché dans les portées englobantes.
+            return f"(v[{name!r}] if {name!r} in v else env.parent.lookup({name!r}))"
+        return f"env.lookup({name!r})"
@@ -0,0 +1,377 @@
+"""
+Optimiseur de l'AST Pithon, appliqué entre `SimpleParser.parse` et l'évaluation.
+
+Les passes sont appliquées dans l'ordre selon le niveau d'optimisation :
+
+- niveau 1 : propagation des constantes (opérations sur des littéraux),
+  élagage des branches dont la condition est constante, suppression des
+  instructions inaccessibles après 'return', 'break' ou 'continue' ;
+- niveau 2 : en plus, élimination des sous-expressions communes.
+
+Chaque passe conserve la sémantique de l'évaluateur : une opération qui
+échouerait (division par zéro, types incompatibles) n'est pas calculée à
+l'avance et reste une erreur d'exécution.
+"""
+
+from dataclasses import fields, is_dataclass, replace
+from pithon.evaluator.envvalue import VBool, VNone, VNumber, VString
+from pithon.evaluator.primitive import get_primitive_dict
+from pithon.syntax import (
+    PiAnd, PiAssignment, PiBinaryOperation, PiBool, PiBreak, PiContinue, PiFor,
+    PiIfThenElse, PiIn, PiNone, PiNot, PiNumber, PiOr, PiProgram, PiReturn, PiStatement, PiString,
+    PiSubscript, PiTuple, PiVariable, PiWhile
+)
+
+DEFAULT_OPT_LEVEL = 1
+OPT_LEVELS = (0, 1, 2)
+
+# Longueur maximale d'une chaîne calculée à la compilation.
+MAX_FOLDED_LENGTH = 4096
+
+# Préfixe des variables temporaires de l'élimination des sous-expressions communes.
+TEMPORARY_PREFIX = ".cse"
+
+# Champs contenant une suite d'instructions (et non une liste d'expressions).
+_BLOCK_FIELDS = ("body", "then_branch", "else_branch")
+
+
+def optimize(program: PiProgram, level: int = DEFAULT_OPT_LEVEL) -> PiProgram:
+    """Retourne une copie optimisée du programme ; le niveau 0 le laisse inchangé."""
+    if level not in OPT_LEVELS:
+        raise ValueError(f"Niveau d'optimisation invalide : {level}")
+    for pass_level, optimization in PASSES:
+        if level >= pass_level:
+            program = optimization().block(program)
+    return program
+
+
+class _Pass:
+    """Parcours générique de l'AST : reconstruit les nœuds à partir des enfants transformés."""
+
+    def block(self, stmts: list[PiStatement]) -> list[PiStatement]:
+        return [self.node(stmt) for stmt in stmts]
+
+    def node(self, node):
+        if not is_dataclass(node):
+            return node
+        changes = {}
+        for f in fields(node):
+            value = getattr(node, f.name)
+            if f.name in _BLOCK_FIELDS:
+                changes[f.name] = self.block(value)
+            elif isinstance(value, list):
+                changes[f.name] = [self.node(item) for item in value]
+            elif isinstance(value, tuple):
+                changes[f.name] = tuple(self.node(item) for item in value)
+            elif is_dataclass(value):
+                changes[f.name] = self.node(value)
+        return replace(node, **changes) if changes else node
+
+
+class ConstantFolder(_Pass):
+    """Calcule à la compilation les opérations dont les opérandes sont des littéraux."""
+
+    def __init__(self):
+        self.primitives = get_primitive_dict()
+
+    def node(self, node):
+        node = super().node(node)
+        if isinstance(node, PiBinaryOperation):
+            return self.binary_operation(node)
+        if isinstance(node, PiNot) and _is_literal(node.operand):
+            return PiBool(not node.operand.value)
+        if isinstance(node, (PiAnd, PiOr)) and _is_literal(node.left):
+            # Le résultat est l'opérande lui-même ; l'opérande droit doit encore être vérifié.
+            if bool(node.left.value) == isinstance(node, PiOr):
+                return node.left
+            if _is_literal(node.right):
+                return node.right
+        return node
+
+    def binary_operation(self, node: PiBinaryOperation):
+        if not (_is_literal(node.left) and _is_literal(node.right)):
+            return node
+        if node.operator == "*" and _repeated_length(node.left, node.right) > MAX_FOLDED_LENGTH:
+            return node
+        left, right = _to_value(node.left), _to_value(node.right)
+        try:
+            result = self.primitives[node.operator]([left, right])
+        except Exception:
+            # L'erreur sera levée à l'exécution, seulement si l'opération est atteinte.
+            return node
+        if isinstance(result, VString) and len(result.value) > MAX_FOLDED_LENGTH:
+            return node
+        return _to_literal(result) or node
+
+
+class DeadBranchPruner(_Pass):
+    """Remplace les 'if' et 'while' de condition constante par la branche exécutée."""
+
+    def block(self, stmts: list[PiStatement]) -> list[PiStatement]:
+        result = []
+        for i, stmt in enumerate(stmts):
+            stmt = self.node(stmt)
+            is_last = i == len(stmts) - 1
+            if isinstance(stmt, PiIfThenElse) and isinstance(stmt.condition, PiBool):
+                branch = stmt.then_branch if stmt.condition.value else stmt.else_branch
+                result.extend(branch or _none_if(is_last))
+            elif isinstance(stmt, PiWhile) and stmt.condition == PiBool(False):
+                result.extend(_none_if(is_last))
+            else:
+                result.append(stmt)
+        return result
+
+    def node(self, node):
+        node = super().node(node)
+        # Expression conditionnelle (ou 'if' à une instruction par branche).
+        if (isinstance(node, PiIfThenElse) and isinstance(node.condition, PiBool)
+                and len(node.then_branch) == 1 and len(node.else_branch) == 1):
+            return node.then_branch[0] if node.condition.value else node.else_branch[0]
+        return node
+
+
+class UnreachableCodeRemover(_Pass):
+    """Supprime les instructions qui suivent un 'return', un 'break' ou un 'continue'."""
+
+    def block(self, stmts: list[PiStatement]) -> list[PiStatement]:
+        result = []
+        for stmt in stmts:
+            result.append(self.node(stmt))
+            if isinstance(stmt, (PiReturn, PiBreak, PiContinue)):
+                break
+        return result
+
+
+class CommonSubexpressionEliminator(_Pass):
+    """
+    Calcule une seule fois une sous-expression pure répétée dans une même
+    instruction, en la stockant d'abord dans une variable temporaire.
+
+    Seules les instructions sans appel de fonction sont traitées : aucune
+    variable ne peut alors changer entre deux occurrences. Une sous-expression
+    n'est anticipée que si elle est évaluée sans condition (hors opérande droit
+    d'un 'and'/'or' et branches d'une expression conditionnelle). Les
+    opérandes évalués avant sa première occurrence et qui peuvent échouer sont
+    anticipés eux aussi, dans leur ordre : l'ordre d'évaluation, et donc la
+    première erreur levée, est conservé.
+    """
+
+    def __init__(self):
+        self.counter = 0
+
+    def block(self, stmts: list[PiStatement]) -> list[PiStatement]:
+        result = []
+        for stmt in stmts:
+            result.extend(self.statement(self.node(stmt)))
+        return result
+
+    def statement(self, stmt: PiStatement) -> list[PiStatement]:
+        if _is_pure(stmt):
+            # Instruction-expression : elle est entièrement remplacée.
+            expression, rebuild = stmt, lambda e: e
+        else:
+            field_name = _expression_field(stmt)
+            if field_name is None:
+                return [stmt]
+            expression = getattr(stmt, field_name)
+            rebuild = lambda e: replace(stmt, **{field_name: e})
+        if not _is_pure(expression):
+            return [stmt]
+        counts = {}
+        _count_unconditional(expression, counts)
+        repeated = next((key for key in counts if counts[key] > 1), None)
+        if repeated is None:
+            return [stmt]
+        before = []
+        subexpression = _first_unconditional(expression, repeated, before)
+        hoisted, temporaries = [], {}
+        for operand in before:
+            if not _cannot_raise(operand):
+                name = self.temporary()
+                hoisted += self.statement(PiAssignment(name, operand))
+                temporaries[id(operand)] = PiVariable(name)
+        if temporaries:
+            expression = _Replacement(temporaries).node(expression)
+        name = self.temporary()
+        expression = _substitute(expression, repeated, PiVariable(name))
+        # La sous-expression anticipée peut elle-même contenir des répétitions.
+        hoisted += self.statement(PiAssignment(name, subexpression))
+        return hoisted + self.statement(rebuild(expression))
+
+    def temporary(self) -> str:
+        name = f"{TEMPORARY_PREFIX}{self.counter}"
+        self.counter += 1
+        return name
+
+
+# Ordre et niveau minimal des passes.
+PASSES = (
+    (1, ConstantFolder),
+    (1, DeadBranchPruner),
+    (1, UnreachableCodeRemover),
+    (2, CommonSubexpressionEliminator),
+)
+
+
+def _is_literal(node) -> bool:
+    return isinstance(node, (PiNumber, PiBool, PiNone, PiString))
+
+def _to_value(node):
+    if isinstance(node, PiNumber):
+        return VNumber(node.value)
+    if isinstance(node, PiBool):
+        return VBool(node.value)
+    if isinstance(node, PiString):
+        return VString(node.value)
+    return VNone(value=None)
+
+def _to_literal(value):
+    if isinstance(value, VNumber):
+        return PiNumber(value.value)
+    if isinstance(value, VBool):
+        return PiBool(value.value)
+    if isinstance(value, VString):
+        return PiString(value.value)
+    return None
+
+def _repeated_length(left, right) -> float:
+    """Longueur de la chaîne produite par une répétition 'chaîne * nombre'."""
+    for text, count in ((left, right), (right, left)):
+        if isinstance(text, PiString) and isinstance(count, PiNumber):
+            return len(text.value) * count.value
+    return 0
+
+def _none_if(is_last: bool) -> list[PiStatement]:
+    # Un bloc vide vaut None : la valeur du bloc englobant doit être conservée.
+    return [PiNone(value=None)] if is_last else []
+
+def _expression_field(stmt: PiStatement) -> str | None:
+    """Champ contenant l'expression évaluée une fois par l'instruction, s'il existe."""
+    if isinstance(stmt, (PiAssignment, PiReturn)):
+        return "value"
+    if isinstance(stmt, PiIfThenElse):
+        return "condition"
+    if isinstance(stmt, PiFor):
+        return "iterable"
+    return None
+
+def _is_expression(node) -> bool:
+    return isinstance(node, (PiBinaryOperation, PiNot, PiAnd, PiOr, PiIn, PiSubscript, PiTuple))
+
+def _is_pure(node) -> bool:
+    """Une expression pure n'a pas d'effet de bord et ne crée pas d'objet modifiable."""
+    if _is_literal(node) or isinstance(node, PiVariable):
+        return True
+    if isinstance(node, PiBinaryOperation):
+        return _is_pure(node.left) and _is_pure(node.right)
+    if isinstance(node, PiNot):
+        return _is_pure(node.operand)
+    if isinstance(node, (PiAnd, PiOr)):
+        return _is_pure(node.left) and _is_pure(node.right)
+    if isinstance(node, PiIn):
+        return _is_pure(node.container) and _is_pure(node.element)
+    if isinstance(node, PiSubscript):
+        return _is_pure(node.collection) and _is_pure(node.index)
+    if isinstance(node, PiTuple):
+        return all(_is_pure(element) for element in node.elements)
+    if isinstance(node, PiIfThenElse):
+        return all(_is_pure(part) for part in (node.condition, *node.then_branch, *node.else_branch))
+    return False
+
+def _count_unconditional(node, counts: dict[str, int]) -> None:
+    """Compte les sous-expressions composées évaluées sans condition, dans l'ordre d'évaluation."""
+    if _is_expression(node) and not isinstance(node, PiTuple):
+        key = repr(node)
+        counts[key] = counts.get(key, 0) + 1
+    for child in _unconditional_children(node):
+        _count_unconditional(child, counts)
+
+def _unconditional_children(node) -> list:
+    """Opérandes toujours évalués par l'expression, dans l'ordre d'évaluation."""
+    if isinstance(node, PiBinaryOperation):
+        return [node.left, node.right]
+    if isinstance(node, PiNot):
+        return [node.operand]
+    if isinstance(node, (PiAnd, PiOr)):
+        return [node.left]
+    if isinstance(node, PiIn):
+        return [node.container, node.element]
+    if isinstance(node, PiSubscript):
+        return [node.collection, node.index]
+    if isinstance(node, PiTuple):
+        return list(node.elements)
+    if isinstance(node, PiIfThenElse):
+        return [node.condition]
+    return []
+
+def _first_unconditional(node, key: str, before: list):
+    """
+    Retourne la première occurrence évaluée sans condition de la
+    sous-expression `key`, et ajoute à `before` les opérandes entièrement
+    évalués avant elle, dans l'ordre d'évaluation.
+    """
+    if repr(node) == key:
+        return node
+    for child in _unconditional_children(node):
+        found = _first_unconditional(child, key, before)
+        if found is not None:
+            return found
+        before.append(child)
+    return None
+
+def _cannot_raise(node) -> bool:
+    """
+    Une expression formée de littéraux et de variables temporaires, sans
+    opération, ne peut pas échouer.
+    """
+    if _is_literal(node):
+        return True
+    if isinstance(node, PiVariable):
+        return node.name.startswith(TEMPORARY_PREFIX)
+    if isinstance(node, PiNot):
+        return _cannot_raise(node.operand)
+    if isinstance(node, (PiAnd, PiOr)):
+        return _cannot_raise(node.left) and _cannot_raise(node.right)
+    if isinstance(node, PiTuple):
+        return all(_cannot_raise(element) for element in node.elements)
+    return False
+
+def _substitute(node, key: str, variable: PiVariable):
+    """Remplace toutes les occurrences de la sous-expression `key` par la variable."""
+    if repr(node) == key:
+        return variable
+    return _Substitution(key, variable).node(node)
+
+def _children(node) -> list:
+    children = []
+    for f in fields(node):
+        value = getattr(node, f.name)
+        if isinstance(value, (list, tuple)):
+            children.extend(item for item in value if is_dataclass(item))
+        elif is_dataclass(value):
+            children.append(value)
+    return children
+
+
+class _Substitution(_Pass):
+    def __init__(self, key: str, variable: PiVariable):
+        self.key = key
+        self.variable = variable
+
+    def node(self, node):
+        if is_dataclass(node) and repr(node) == self.key:
+            return self.variable
+        return super().node(node)
+
+
+class _Replacement(_Pass):
+    """Remplace des nœuds précis (par identité) par des variables."""
+
+    def __init__(self, variables: dict[int, PiVariable]):
+        self.variables = variables
+
+    def node(self, node):
+        variable = self.variables.get(id(node))
+        if variable is not None:
+            return variable
+        return super().node(node)
@@ -0,0 +1,96 @@
+"""
+Cache sur disque des programmes analysés (l'équivalent des fichiers .pyc).
+
+Le `PiProgram` produit par `SimpleParser` est sérialisé avec pickle dans un
+fichier dont le nom est l'empreinte SHA-256 du source et de la version de
+l'interpréteur : version de Python, format du cache et empreinte des sources
+de l'analyseur et de `pithon.syntax`. Une modification de l'un d'eux, même
+sans changer la définition des nœuds, change la clé : les anciennes entrées
+ne sont donc jamais relues.
+
+Le répertoire est `$PITHON_CACHE_DIR`, sinon `$XDG_CACHE_HOME/pithon`, sinon
+`~/.cache/pithon` ; il est créé avec les droits 0700 puisque pickle exécute ce
+qu'il charge. Les écritures passent par un fichier temporaire renommé
+atomiquement. Une entrée illisible est supprimée et le source réanalysé ; un
+répertoire inaccessible désactive simplement le cache.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from pithon import syntax
+from pithon.parser import simpleparser
+from pithon.parser.simpleparser import SimpleParser
+from pithon.syntax import PiProgram
+
+CACHE_FORMAT = 1
+SUFFIX = ".pithonc"
+
+
+def _interpreter_tag() -> bytes:
+    """Identifie la version de Python, le format du cache et les sources qui construisent l'AST."""
+    sources = hashlib.sha256()
+    for module in (syntax, simpleparser):
+        sources.update(Path(module.__file__).read_bytes())
+    tag = f"{sys.implementation.cache_tag}|{CACHE_FORMAT}|{sources.hexdigest()}"
+    return tag.encode("utf-8")
+
+INTERPRETER_TAG = _interpreter_tag()
+
+
+def cache_directory() -> Path:
+    """Retourne le répertoire du cache (non créé)."""
+    if "PITHON_CACHE_DIR" in os.environ:
+        return Path(os.environ["PITHON_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pithon"
+
+def cache_path(source: str, directory: Path | None = None) -> Path:
+    """Retourne le fichier de cache correspondant au source."""
+    digest = hashlib.sha256(INTERPRETER_TAG + b"\0" + source.encode("utf-8")).hexdigest()
+    return (directory or cache_directory()) / (digest + SUFFIX)
+
+def parse_cached(source: str, parser: SimpleParser | None = None,
+                 directory: Path | None = None) -> PiProgram:
+    """Analyse le source, ou relit son AST depuis le cache s'il y est déjà."""
+    path = cache_path(source, directory)
+    program = load_program(path)
+    if program is None:
+        program = (parser or SimpleParser()).parse(source)
+        store_program(path, program)
+    return program
+
+def load_program(path: Path) -> PiProgram | None:
+    """Relit un programme en cache ; retourne None si l'entrée est absente ou illisible."""
+    try:
+        with open(path, "rb") as f:
+            program = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Entrée tronquée ou corrompue : elle sera réécrite.
+        _remove(path)
+        return None
+    return program if isinstance(program, list) else None
+
+def store_program(path: Path, program: PiProgram) -> None:
+    """Écrit un programme dans le cache de façon atomique ; les erreurs d'écriture sont ignorées."""
+    temporary = None
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=path.parent, suffix=".tmp", delete=False) as f:
+            temporary = Path(f.name)
+            pickle.dump(program, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except (OSError, pickle.PicklingError, RecursionError):
+        if temporary is not None:
+            _remove(temporary)
+
+def _remove(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
@@ -2,7 +2,7 @@ import ast
 
 from pithon.syntax import (
     PiAssignment, PiBinaryOperation, PiNumber, PiBool, PiVariable, PiIfThenElse,
-    PiNot, PiAnd, PiOr, PiWhile, PiExpression, PiNone, PiList, PiTuple,
+    PiNot, PiAnd, PiOr, PiWhile, PiExpression, PiNone, PiList, PiTuple, PiDict, PiSet,
     PiString, PiFunctionDef, PiFunctionCall, PiFor, PiBreak, PiContinue, PiIn,
     PiReturn, PiSubscript, PiClassDef, PiAttribute, PiAttributeAssignment
 )
@@ -28,11 +28,11 @@ class SimpleParser(ast.NodeVisitor):
         
         if isinstance(target, ast.Name):
             # Simple variable assignment
-            return PiAssignment(name=target.id, value=value)
+            return PiAssignment(name=target.id, value=value, line=node.lineno)
         elif isinstance(target, ast.Attribute):
             # Attribute assignment
             obj = self.visit(target.value)
-            return PiAttributeAssignment(object=obj, attr=target.attr, value=value)
+            return PiAttributeAssignment(object=obj, attr=target.attr, value=value, line=node.lineno)
         else:
             raise ValueError("Les affectations ne peuvent être faites qu'à des variables ou des attributs.")
 
@@ -65,11 +65,23 @@ class SimpleParser(ast.NodeVisitor):
         elements = tuple(self.visit(elt) for elt in node.elts)
         return PiTuple(elements=elements)
 
+    def visit_Dict(self, node: ast.Dict) -> PiDict:
+        if any(key is None for key in node.keys):
+            raise ValueError("Le dépaquetage '**' n'est pas supporté dans un dictionnaire.")
+        keys = [self.visit(key) for key in node.keys]
+        values = [self.visit(value) for value in node.values]
+        return PiDict(keys=keys, values=values)
+
+    def visit_Set(self, node: ast.Set) -> PiSet:
+        elements = [self.visit(elt) for elt in node.elts]
+        return PiSet(elements=elements)
+
     def visit_If(self, node: ast.If) -> PiIfThenElse:
         condition = self.visit(node.test)
         then_branch = [self.visit(stmt) for stmt in node.body]
         else_branch = [self.visit(stmt) for stmt in node.orelse] if node.orelse else []
-        return PiIfThenElse(condition=condition, then_branch=then_branch, else_branch=else_branch)
+        return PiIfThenElse(condition=condition, then_branch=then_branch, else_branch=else_branch,
+                            line=node.lineno)
 
     def visit_IfExp(self, node: ast.IfExp) -> PiIfThenElse:
         # Pour les expressions ternaires (x if cond else y)
@@ -103,7 +115,7 @@ class SimpleParser(ast.NodeVisitor):
     def visit_While(self, node: ast.While) -> PiWhile:
         condition = self.visit(node.test)
         body = [self.visit(stmt) for stmt in node.body]
-        return PiWhile(condition=condition, body=body)
+        return PiWhile(condition=condition, body=body, line=node.lineno)
 
     def visit_For(self, node: ast.For) -> PiFor:
         if not isinstance(node.target, ast.Name):
@@ -111,13 +123,13 @@ class SimpleParser(ast.NodeVisitor):
         var = node.target.id
         iterable = self.visit(node.iter)
         body = [self.visit(stmt) for stmt in node.body]
-        return PiFor(var=var, iterable=iterable, body=body)
+        return PiFor(var=var, iterable=iterable, body=body, line=node.lineno)
 
     def visit_Break(self, node: ast.Break) -> PiBreak:
-        return PiBreak()
+        return PiBreak(line=node.lineno)
 
     def visit_Continue(self, node: ast.Continue) -> PiContinue:
-        return PiContinue()
+        return PiContinue(line=node.lineno)
 
     def visit_Compare(self, node: ast.Compare) -> PiExpression:
         if len(node.ops) == 1 and isinstance(node.ops[0], ast.In):
@@ -135,7 +147,7 @@ class SimpleParser(ast.NodeVisitor):
     def visit_Call(self, node: ast.Call) -> PiExpression:
         func = self.visit(node.func)
         args = [self.visit(arg) for arg in node.args]
-        return PiFunctionCall(function=func, args=args)
+        return PiFunctionCall(function=func, args=args, line=node.lineno)
 
     def visit_FunctionDef(self, node: ast.FunctionDef) -> PiFunctionDef:
         name = node.name
@@ -146,11 +158,11 @@ class SimpleParser(ast.NodeVisitor):
         if node.args.vararg:
             vararg = node.args.vararg.arg
         body = [self.visit(stmt) for stmt in node.body]
-        return PiFunctionDef(name=name, arg_names=arg_names, vararg=vararg, body=body)
+        return PiFunctionDef(name=name, arg_names=arg_names, vararg=vararg, body=body, line=node.lineno)
 
     def visit_Return(self, node: ast.Return) -> PiReturn:
         value = self.visit(node.value) if node.value else PiNone(value=None)
-        return PiReturn(value=value)
+        return PiReturn(value=value, line=node.lineno)
 
     def visit_Subscript(self, node: ast.Subscript) -> PiSubscript:
         collection = self.visit(node.value)
@@ -165,7 +177,7 @@ class SimpleParser(ast.NodeVisitor):
                 methods.append(self.visit_FunctionDef(stmt))
             else:
                 raise ValueError("Seules les définitions de méthodes sont autorisées dans les classes.")
-        return PiClassDef(name=name, methods=methods)
+        return PiClassDef(name=name, methods=methods, line=node.lineno)
 
     def visit_Attribute(self, node: ast.Attribute) -> PiAttribute:
         obj = self.visit(node.value)
@@ -0,0 +1,173 @@
+"""
+Exécution parallèle et isolée d'un lot de programmes Pithon (`pithon --test`).
+
+Chaque programme est exécuté par `run_file` dans son propre processus : un
+plantage ne laisse aucun état derrière lui et un programme qui dépasse son
+délai est tué sans bloquer le lot. Jusqu'à `jobs` processus (un par cœur par
+défaut) tournent en même temps ; le processus principal, sans fil d'exécution
+supplémentaire, attend leurs résultats et surveille les délais. Là où c'est
+possible, les processus sont créés par fork et démarrent donc sans réimporter
+l'interpréteur.
+
+La sortie standard de chaque programme est comparée au fichier `.out` voisin
+lorsqu'il existe ; sans `.out`, un programme réussit s'il se termine sans
+erreur. Le résumé s'écrit en JSON ou au format JUnit XML lu par les outils
+d'intégration continue.
+"""
+
+import contextlib
+import difflib
+import io
+import json
+import multiprocessing
+import os
+import traceback
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import asdict, dataclass
+from multiprocessing.connection import wait
+from pathlib import Path
+from time import perf_counter
+
+DEFAULT_DIRECTORY = Path("tests/fixtures/programs")
+DEFAULT_TIMEOUT = 10.0
+
+PASSED = "passed"
+FAILED = "failed"
+ERROR = "error"
+TIMEOUT = "timeout"
+
+
+@dataclass
+class ProgramResult:
+    """Résultat d'un programme ; `diff` compare la sortie attendue à la sortie obtenue."""
+    name: str
+    path: str
+    status: str
+    duration_s: float
+    stdout: str
+    stderr: str
+    diff: str = ""
+
+
+def collect_programs(paths: list[Path]) -> list[Path]:
+    """Programmes à exécuter : les fichiers donnés et les .py des répertoires donnés."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.py")) if path.is_dir() else [path])
+    return files
+
+def run_programs(paths: list[Path], options: dict | None = None, jobs: int | None = None,
+                 timeout: float = DEFAULT_TIMEOUT, on_result=None) -> list[ProgramResult]:
+    """
+    Exécute les programmes en parallèle avec les options de `run_file`.
+    `on_result` est appelé avec chaque résultat dès qu'il est connu ; la liste
+    retournée suit l'ordre des programmes.
+    """
+    programs = collect_programs(paths)
+    jobs = jobs or os.cpu_count() or 1
+    context = _process_context()
+    pending = deque(enumerate(programs))
+    # Connexion -> (indice, programme, processus, début).
+    running = {}
+    results: list[ProgramResult | None] = [None] * len(programs)
+
+    def finish(connection, result):
+        index = running.pop(connection)[0]
+        connection.close()
+        results[index] = result
+        if on_result is not None:
+            on_result(result)
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            index, path = pending.popleft()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_child, args=(str(path), options or {}, sender), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (index, path, process, perf_counter())
+        next_deadline = min(start for _, _, _, start in running.values()) + timeout
+        for connection in wait(list(running), timeout=max(0.0, next_deadline - perf_counter())):
+            _, path, process, start = running[connection]
+            try:
+                stdout, stderr, ok = connection.recv()
+            except EOFError:
+                stdout, stderr, ok = "", "", False
+            process.join()
+            if process.exitcode:
+                stderr += f"Processus terminé avec le code {process.exitcode}.\n"
+            finish(connection, _result(path, perf_counter() - start, stdout, stderr, ok))
+        now = perf_counter()
+        for connection, (_, path, process, start) in list(running.items()):
+            if now - start >= timeout:
+                process.kill()
+                process.join()
+                finish(connection, ProgramResult(path.name, str(path), TIMEOUT, now - start, "",
+                                                 f"Délai dépassé ({timeout:g} s).\n"))
+    return results
+
+def summary(results: list[ProgramResult]) -> dict[str, int]:
+    counts = {PASSED: 0, FAILED: 0, ERROR: 0, TIMEOUT: 0}
+    for result in results:
+        counts[result.status] += 1
+    return counts
+
+def write_json(results: list[ProgramResult], path: Path, duration_s: float) -> None:
+    """Écrit le résumé et le détail des résultats en JSON."""
+    report = {"total": len(results), **summary(results), "duration_s": duration_s,
+              "results": [asdict(result) for result in results]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+def write_junit(results: list[ProgramResult], path: Path, duration_s: float, suite: str = "pithon") -> None:
+    """Écrit les résultats au format JUnit XML : un cas de test par programme."""
+    counts = summary(results)
+    root = ET.Element("testsuite", name=suite, tests=str(len(results)), failures=str(counts[FAILED]),
+                      errors=str(counts[ERROR] + counts[TIMEOUT]), time=f"{duration_s:.3f}")
+    for result in results:
+        case = ET.SubElement(root, "testcase", classname=suite, name=result.name,
+                             time=f"{result.duration_s:.3f}")
+        if result.status == FAILED:
+            ET.SubElement(case, "failure", message="Sortie différente du fichier .out").text = result.diff
+        elif result.status == ERROR:
+            ET.SubElement(case, "error", message="Erreur à l'exécution").text = result.stderr
+        elif result.status == TIMEOUT:
+            ET.SubElement(case, "error", message="Délai dépassé").text = result.stderr
+        ET.SubElement(case, "system-out").text = result.stdout
+        ET.SubElement(case, "system-err").text = result.stderr
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def _process_context():
+    # fork évite de réimporter l'interpréteur dans chaque processus.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+def _run_child(path: str, options: dict, connection) -> None:
+    """Point d'entrée d'un processus : exécute le programme et envoie ses sorties."""
+    from pithon.cli import run_file
+    stdout, stderr = io.StringIO(), io.StringIO()
+    ok = True
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            run_file(path, **options)
+        except BaseException:
+            traceback.print_exc()
+            ok = False
+    connection.send((stdout.getvalue(), stderr.getvalue(), ok))
+    connection.close()
+
+def _result(path: Path, duration: float, stdout: str, stderr: str, ok: bool) -> ProgramResult:
+    expected_path = path.with_suffix(".out")
+    diff = ""
+    if expected_path.exists():
+        expected = expected_path.read_text(encoding="utf-8")
+        if stdout != expected:
+            diff = "".join(difflib.unified_diff(
+                expected.splitlines(keepends=True), stdout.splitlines(keepends=True),
+                fromfile=expected_path.name, tofile="sortie obtenue"))
+    status = ERROR if not ok else FAILED if diff else PASSED
+    return ProgramResult(path.name, str(path), status, duration, stdout, stderr, diff)
@@ -0,0 +1,81 @@
+"""
+Exécution coopérative de programmes Pithon dans une boucle asyncio.
+
+`run_async` exécute un programme sur la machine virtuelle et rend la main à la
+boucle d'événements tous les `interval` pas (un pas est un saut ou un appel
+de fonction compilée : chaque itération de boucle et chaque appel en compte
+au moins un). Une boucle `while True:` ne peut donc pas affamer les autres
+tâches, et des milliers de programmes peuvent s'exécuter dans un même
+processus, sans fil d'exécution :
+
+    results = await asyncio.gather(*(pithon.run_async(source) for source in sources))
+
+Chaque tâche a son propre environnement et, si `output` est donné, sa propre
+sortie (un `OutputSink`, par exemple un `CaptureSink`), à laquelle `print`
+est lié : aucune tâche ne touche à `sys.stdout`, si bien que des tâches
+simultanées n'écrivent jamais dans la sortie d'une autre.
+`max_steps` borne le nombre de pas de la tâche ; au-delà, `StepBudgetExceeded`
+est levée. L'annulation de la tâche (`task.cancel()`, `asyncio.wait_for`)
+prend effet au prochain point de reprise.
+
+Les appels des fonctions enveloppées (mémoïsation, profilage) et des
+primitives s'exécutent sans interruption.
+"""
+
+import asyncio
+from pithon.evaluator.envframe import EnvFrame
+from pithon.evaluator.envvalue import EnvValue
+from pithon.evaluator.evaluator import initial_env
+from pithon.evaluator.limits import ResourceLimitExceeded
+from pithon.evaluator.output import OutputSink, make_print
+from pithon.optimizer import DEFAULT_OPT_LEVEL, optimize
+from pithon.parser.simpleparser import SimpleParser
+from pithon.vm.compiler import compile_program
+from pithon.vm.machine import DEFAULT_MAX_DEPTH, module_steps
+
+# Nombre de pas exécutés entre deux retours à la boucle d'événements.
+DEFAULT_INTERVAL = 1000
+
+
+class StepBudgetExceeded(ResourceLimitExceeded):
+    """Le programme a atteint le nombre de pas qui lui était accordé."""
+
+
+async def run_async(source: str, env: EnvFrame | None = None, output: OutputSink | None = None,
+                    interval: int = DEFAULT_INTERVAL, max_steps: int | None = None,
+                    opt_level: int = DEFAULT_OPT_LEVEL, bind_operators: bool = True,
+                    max_depth: int = DEFAULT_MAX_DEPTH) -> EnvValue:
+    """
+    Exécute un programme en rendant la main tous les `interval` pas et
+    retourne sa valeur. Sans `env`, le programme s'exécute dans un
+    environnement initial neuf. `print` écrit dans `output`, vidé à la fin de
+    la tâche, sinon sur `sys.stdout`.
+    """
+    if interval < 1 or (max_steps is not None and max_steps < 1):
+        raise ValueError("L'intervalle et le nombre maximal de pas doivent être au moins 1.")
+    code = compile_program(optimize(SimpleParser().parse(source), opt_level), bind_operators)
+    if env is None:
+        env = initial_env(output)
+    elif output is not None:
+        env.vars["print"] = make_print(output)
+    executed = 0
+    steps = interval if max_steps is None else min(interval, max_steps)
+    execution = module_steps(code, env, max_depth, steps)
+    resume = None
+    try:
+        while True:
+            try:
+                execution.send(resume)
+            except StopIteration as stop:
+                return stop.value
+            executed += steps
+            if max_steps is not None:
+                if executed >= max_steps:
+                    raise StepBudgetExceeded(f"Nombre maximal de pas atteint ({max_steps}).")
+                steps = min(interval, max_steps - executed)
+            resume = steps
+            await asyncio.sleep(0)
+    finally:
+        execution.close()
+        if output is not None:
+            output.flush()
@@ -0,0 +1,229 @@
+"""
+Mode serveur de l'interpréteur (`pithon --serve`).
+
+Démarrer Python, importer `pithon` et construire l'environnement initial coûte
+bien plus cher que la plupart des programmes. Le serveur garde donc des
+processus de travail prêts : chacun a déjà importé l'interpréteur et exécute
+les programmes qu'on lui envoie, chaque fois dans un environnement neuf.
+
+Le protocole est une suite de lignes JSON, lues sur l'entrée standard ou sur
+les connexions d'un socket Unix (`--socket`). Une requête porte le source du
+programme et, au choix, son identifiant, son moteur, son niveau
+d'optimisation, son délai et ses limites de ressources (`fuel`,
+`memory_limit`, voir `pithon.evaluator.limits`) :
+
+    {"id": 1, "source": "print(1 + 2)", "engine": "vm", "timeout": 2}
+
+La réponse reprend l'identifiant et donne le statut (`ok`, `error` ou
+`timeout`), la sortie capturée, la valeur du programme et sa durée :
+
+    {"id": 1, "status": "ok", "stdout": "3\\n", "stderr": "", "result": "None",
+     "error": null, "duration_s": 0.0001, "dropped_lines": 0}
+
+Les affichages d'un programme sont conservés dans un `RingBufferSink` : seuls
+les derniers sont renvoyés, `dropped_lines` comptant les lignes écartées.
+
+Les requêtes s'exécutent simultanément, autant qu'il y a de processus ; les
+réponses de l'entrée standard sont écrites dans l'ordre où elles se terminent.
+Un processus qui dépasse son délai est tué et remplacé ; un processus est
+aussi remplacé après `max_jobs` programmes, ce qui borne la mémoire qu'il peut
+accumuler. Les programmes analysés passent par le cache sur disque, partagé
+par tous les processus.
+"""
+
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from pithon.evaluator.evaluator import initial_env
+from pithon.evaluator.limits import Limits, limit_env, limit_program
+from pithon.evaluator.output import RingBufferSink
+from pithon.optimizer import DEFAULT_OPT_LEVEL, optimize
+from pithon.parser.cache import parse_cached
+from pithon.parser.simpleparser import SimpleParser
+
+DEFAULT_TIMEOUT = 10.0
+# Programmes exécutés par un processus avant qu'il ne soit remplacé.
+DEFAULT_MAX_JOBS = 1000
+
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout"
+
+
+class Worker:
+    """Processus de travail : reçoit des requêtes sur un tube et renvoie les réponses."""
+
+    def __init__(self, context, options: dict):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, options), daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def run(self, request: dict, timeout: float) -> dict | None:
+        """Exécute une requête ; retourne None si le délai est dépassé ou si le processus meurt."""
+        self.jobs += 1
+        self.connection.send(request)
+        if not self.connection.poll(timeout):
+            return None
+        try:
+            return self.connection.recv()
+        except EOFError:
+            return None
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        self.connection.close()
+        self.process.join()
+
+
+class WorkerPool:
+    """
+    Processus de travail prêts à l'emploi. `submit` peut être appelé depuis
+    plusieurs fils d'exécution : chaque appel attend un processus libre.
+    """
+
+    def __init__(self, workers: int | None = None, options: dict | None = None,
+                 timeout: float = DEFAULT_TIMEOUT, max_jobs: int = DEFAULT_MAX_JOBS):
+        self.context = _process_context()
+        self.options = options or {}
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self.size = workers or os.cpu_count() or 1
+        self.idle: queue.Queue[Worker] = queue.Queue()
+        for _ in range(self.size):
+            self.idle.put(Worker(self.context, self.options))
+
+    def submit(self, request: dict) -> dict:
+        """Exécute une requête sur un processus libre et retourne sa réponse."""
+        timeout = request.get("timeout", self.timeout)
+        worker = self.idle.get()
+        start = perf_counter()
+        response = worker.run(request, timeout)
+        if response is None:
+            # Processus interrompu ou mort : son état est inconnu, il est remplacé.
+            if worker.process.is_alive():
+                response = _response(request, TIMEOUT, error=f"Délai dépassé ({timeout:g} s).",
+                                     duration=perf_counter() - start)
+            else:
+                response = _response(request, ERROR, error="Processus de travail terminé brutalement.",
+                                     duration=perf_counter() - start)
+            worker.stop(kill=True)
+            worker = Worker(self.context, self.options)
+        elif worker.jobs >= self.max_jobs:
+            worker.stop()
+            worker = Worker(self.context, self.options)
+        self.idle.put(worker)
+        return response
+
+    def handle_line(self, line: str) -> str:
+        """Traite une ligne JSON et retourne la ligne JSON de la réponse."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict) or not isinstance(request.get("source"), str):
+                raise ValueError("champ 'source' manquant")
+            timeout = request.get("timeout", self.timeout)
+            if not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise ValueError("délai invalide")
+        except ValueError as e:
+            response = _response({}, ERROR, error=f"Requête invalide : {e}")
+        else:
+            response = self.submit(request)
+        return json.dumps(response, ensure_ascii=False)
+
+    def close(self) -> None:
+        while not self.idle.empty():
+            self.idle.get().stop()
+
+
+def serve_stdio(pool: WorkerPool, input=None, output=None) -> None:
+    """Lit les requêtes sur l'entrée standard et écrit les réponses sur la sortie standard."""
+    input = input or sys.stdin
+    output = output or sys.stdout
+    lock = threading.Lock()
+
+    def handle(line):
+        response = pool.handle_line(line)
+        with lock:
+            output.write(response + "\n")
+            output.flush()
+
+    with ThreadPoolExecutor(pool.size) as executor:
+        for line in input:
+            if line.strip():
+                executor.submit(handle, line)
+
+def serve_socket(pool: WorkerPool, path: str) -> None:
+    """Accepte des connexions sur un socket Unix ; chaque connexion envoie ses requêtes une à une."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write(pool.handle_line(line.decode("utf-8")).encode("utf-8") + b"\n")
+
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+def _process_context():
+    # Les processus sont créés par un serveur de fork qui a déjà importé
+    # l'interpréteur : un remplacement démarre sans réimporter les modules.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["pithon.cli"])
+        return context
+    return multiprocessing.get_context()
+
+def _worker_main(connection, options: dict) -> None:
+    """Boucle d'un processus de travail ; se termine quand le tube est fermé."""
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        connection.send(_execute(request, options))
+
+def _execute(request: dict, options: dict) -> dict:
+    from pithon.cli import select_engine
+    engine = request.get("engine", options.get("engine", "tree"))
+    opt_level = request.get("opt_level", options.get("opt_level", DEFAULT_OPT_LEVEL))
+    limits = Limits(request.get("fuel", options.get("fuel")), request.get("memory_limit", options.get("memory_limit")))
+    stdout, stderr = RingBufferSink(), io.StringIO()
+    start = perf_counter()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            source = request["source"]
+            tree = parse_cached(source) if options.get("use_cache", True) else SimpleParser().parse(source)
+            tree = optimize(tree, opt_level)
+            env = initial_env(stdout)
+            if limits.fuel is not None or limits.memory is not None:
+                tree = limit_program(tree, limits)
+                limit_env(env, limits)
+            result = select_engine(engine, options.get("max_depth"), options.get("bind_operators", True))(tree, env)
+    except Exception as e:
+        return _response(request, ERROR, stdout.getvalue(), stderr.getvalue(),
+                         error=f"{type(e).__name__}: {e}", duration=perf_counter() - start,
+                         dropped_lines=stdout.dropped)
+    return _response(request, OK, stdout.getvalue(), stderr.getvalue(), str(result),
+                     duration=perf_counter() - start, dropped_lines=stdout.dropped)
+
+def _response(request: dict, status: str, stdout: str = "", stderr: str = "", result: str | None = None,
+              error: str | None = None, duration: float = 0.0, dropped_lines: int = 0) -> dict:
+    return {"id": request.get("id"), "status": status, "stdout": stdout, "stderr": stderr,
+            "result": result, "error": error, "duration_s": duration, "dropped_lines": dropped_lines}
@@ -1,126 +1,170 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiNone:
     value: None
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiNumber:
     value: float
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiBool:
     value: bool
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiVariable:
     name: str
+    # Adresse lexicale calculée par le résolveur : cadres à remonter, puis
+    # emplacement local (None pour une variable globale résolue par son nom).
+    depth: int | None = field(default=None, compare=False, repr=False)
+    slot: int | None = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiBinaryOperation:
     left: 'PiExpression'
     operator: str
     right: 'PiExpression'
+    # Site d'appel lié à la primitive de l'opérateur (voir `pithon.evaluator.operators`).
+    site: Any = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiAssignment:
     name: str
     value: 'PiExpression'
+    slot: int | None = field(default=None, compare=False, repr=False)
+    # Ligne du source (instructions et appels), pour le profilage.
+    line: int | None = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiIfThenElse:
     condition: 'PiExpression'
     then_branch: list['PiStatement']
     else_branch: list['PiStatement']
+    line: int | None = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiNot:
     operand: 'PiExpression'
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiAnd:
     left: 'PiExpression'
     right: 'PiExpression'
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiOr:
     left: 'PiExpression'
     right: 'PiExpression'
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiWhile:
     condition: 'PiExpression'
     body: list['PiStatement']
+    line: int | None = field(default=None, compare=False, repr=False)
+    # Décompte d'un pas de carburant au début du corps, fixé par `pithon.evaluator.limits`.
+    fuel: Any = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiList:
     elements: list['PiExpression']
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiTuple:
     elements: tuple['PiExpression', ...]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class PiDict:
+    keys: list['PiExpression']
+    values: list['PiExpression']
+
+@dataclass(frozen=True, slots=True)
+class PiSet:
+    elements: list['PiExpression']
+
+@dataclass(frozen=True, slots=True)
 class PiString:
     value: str
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiFunctionDef:
     name: str
     arg_names: list[str]
     vararg: str | None
     body: list['PiStatement']
-
-@dataclass
+    slot: int | None = field(default=None, compare=False, repr=False)
+    # Noms des emplacements du cadre d'appel (paramètres en tête), fixés par le résolveur.
+    local_names: tuple[str, ...] | None = field(default=None, compare=False, repr=False)
+    # Enveloppe appliquée à chaque fermeture créée : mémoïsation (`pithon.evaluator.memo`)
+    # ou profilage (`pithon.evaluator.profiler`).
+    wrapper: Any = field(default=None, compare=False, repr=False)
+    line: int | None = field(default=None, compare=False, repr=False)
+    # Décompte d'un pas de carburant au début du corps, fixé par `pithon.evaluator.limits`.
+    fuel: Any = field(default=None, compare=False, repr=False)
+
+@dataclass(frozen=True, slots=True)
 class PiFunctionCall:
     function: 'PiExpression'
     args: list['PiExpression']
+    line: int | None = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiFor:
     var: str
     iterable: 'PiExpression'
     body: list['PiStatement']
+    slot: int | None = field(default=None, compare=False, repr=False)
+    line: int | None = field(default=None, compare=False, repr=False)
+    # Décompte d'un pas de carburant au début du corps, fixé par `pithon.evaluator.limits`.
+    fuel: Any = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiBreak:
-    pass
+    line: int | None = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiContinue:
-    pass
+    line: int | None = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiIn:
     element: 'PiExpression'
     container: 'PiExpression'
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiReturn:
     value: 'PiExpression'
+    line: int | None = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiSubscript:
     collection: 'PiExpression'
     index: 'PiExpression'
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiClassDef:
     name: str
     methods: list['PiFunctionDef']
+    slot: int | None = field(default=None, compare=False, repr=False)
+    line: int | None = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiAttribute:
     object: 'PiExpression'
     attr: str
+    # Cache en ligne du site, créé par le résolveur (voir `pithon.evaluator.objects`).
+    cache: Any = field(default=None, compare=False, repr=False)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PiAttributeAssignment:
     object: 'PiExpression'
     attr: str
     value: 'PiExpression'
+    cache: Any = field(default=None, compare=False, repr=False)
+    line: int | None = field(default=None, compare=False, repr=False)
 
-PiValue = PiNumber | PiBool | PiNone | PiList | PiTuple | PiString
+PiValue = PiNumber | PiBool | PiNone | PiList | PiTuple | PiDict | PiSet | PiString
 
 PiExpression = (
     PiValue
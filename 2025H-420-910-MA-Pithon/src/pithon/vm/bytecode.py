@@ -0,0 +1,85 @@
+"""
+Jeu d'instructions et objets de code de la machine virtuelle Pithon.
+
+Une instruction est un couple (opcode, argument). Les sauts utilisent des
+positions absolues dans le tableau d'instructions.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+# Pile et constantes
+LOAD_CONST = 0          # arg : indice dans le tableau de constantes
+POP_TOP = 1
+DUP_TOP = 2
+
+# Variables
+LOAD_FAST = 3           # arg : emplacement local
+STORE_FAST = 4          # arg : emplacement local
+LOAD_DEREF = 5          # arg : (profondeur, emplacement) dans une fonction englobante
+LOAD_GLOBAL = 6         # arg : nom, résolu dans l'environnement global
+LOAD_NAME = 7           # arg : nom, résolu dans l'environnement courant (niveau module)
+STORE_NAME = 8          # arg : nom, stocké dans l'environnement courant (niveau module)
+
+# Opérations
+BINARY_OP = 9           # arg : site d'appel lié à la primitive (pithon.evaluator.operators)
+BINARY_OP_NAME = 28     # arg : symbole de l'opérateur, résolu dans l'environnement global
+NOT = 10
+CHECK_LOGIC = 11        # vérifie que le sommet est valide pour 'and'/'or'
+CONTAINS = 12
+SUBSCRIPT = 13
+BUILD_LIST = 14         # arg : nombre d'éléments
+BUILD_TUPLE = 15        # arg : nombre d'éléments
+BUILD_DICT = 35         # arg : nombre de couples clé, valeur
+BUILD_SET = 36          # arg : nombre d'éléments
+
+# Contrôle
+JUMP = 16               # arg : cible
+POP_JUMP_IF_FALSE = 17  # arg : cible ; la condition doit être un VBool
+JUMP_IF_FALSE_OR_POP = 18
+JUMP_IF_TRUE_OR_POP = 19
+GET_ITER = 20
+FOR_ITER = 21           # arg : cible quand l'itérateur est épuisé
+FUEL = 37               # arg : décompte d'un pas de carburant (pithon.evaluator.limits)
+
+# Fonctions
+MAKE_FUNCTION = 22      # arg : (PiFunctionDef, CodeObject)
+CALL = 23               # arg : nombre d'arguments
+RETURN_VALUE = 24
+TAIL_CALL = 27          # arg : nombre d'arguments ; réutilise le cadre courant, suivi de RETURN_VALUE
+
+# Objets
+MAKE_CLASS = 29         # arg : (nom, noms des méthodes) ; les fermetures des méthodes sont sur la pile
+LOAD_ATTR = 30          # arg : cache en ligne du site (pithon.evaluator.objects)
+STORE_ATTR = 31         # arg : cache en ligne du site ; dépile l'objet puis la valeur
+LOAD_METHOD = 32        # arg : cache en ligne du site ; remplace l'objet par la méthode et l'objet
+CALL_METHOD = 33        # arg : nombre d'arguments, objet compris ; suit LOAD_METHOD
+TAIL_CALL_METHOD = 34   # arg : comme CALL_METHOD, en position de 'return' (voir TAIL_CALL)
+
+# Erreurs différées à l'exécution
+RAISE = 25              # arg : classe d'exception à lever (valeur au sommet pour un 'return')
+UNSUPPORTED = 26        # arg : type du nœud non supporté
+
+OPNAMES = {
+    value: name for name, value in dict(globals()).items()
+    if name.isupper() and isinstance(value, int)
+}
+
+JUMP_OPS = {JUMP, POP_JUMP_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, FOR_ITER}
+
+
+@dataclass
+class CodeObject:
+    """Représente le code compilé d'un programme ou d'une fonction."""
+    name: str
+    instructions: list[tuple[int, Any]] = field(default_factory=list)
+    constants: list[Any] = field(default_factory=list)
+    # Noms des emplacements locaux : paramètres, paramètre variadique, locaux, temporaires.
+    varnames: list[str] = field(default_factory=list)
+    argcount: int = 0
+    has_vararg: bool = False
+    is_function: bool = False
+    slot_of: dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __str__(self) -> str:
+        return f"<code {self.name} at {id(self)}>"
@@ -0,0 +1,315 @@
+"""
+Compilateur des nœuds `pithon.syntax` vers le bytecode de la machine virtuelle.
+
+Chaque instruction Pithon produit une valeur (celle de la dernière instruction
+d'un bloc, comme dans l'évaluateur arborescent). Le compilateur ne la calcule
+que lorsqu'elle est utilisée : fin du programme, fin d'un corps de fonction, ou
+branche d'une expression conditionnelle.
+"""
+
+from pithon.evaluator.envvalue import VString, V_NONE, make_bool, make_number
+from pithon.evaluator.evaluator import BreakException, ContinueException, ReturnException
+from pithon.evaluator.objects import AttributeCache, AttributeStoreCache
+from pithon.evaluator.operators import bind_operator
+from pithon.evaluator.resolver import local_names
+from pithon.syntax import (
+    PiAssignment, PiBinaryOperation, PiNumber, PiBool, PiProgram, PiStatement, PiSubscript,
+    PiVariable, PiIfThenElse, PiNot, PiAnd, PiOr, PiWhile, PiNone, PiList, PiTuple, PiDict, PiSet, PiString,
+    PiFunctionDef, PiFunctionCall, PiFor, PiBreak, PiContinue, PiIn, PiReturn, PiClassDef, PiAttribute,
+    PiAttributeAssignment
+)
+from pithon.vm.bytecode import (
+    CodeObject, LOAD_CONST, POP_TOP, DUP_TOP, LOAD_FAST, STORE_FAST, LOAD_DEREF, LOAD_GLOBAL,
+    LOAD_NAME, STORE_NAME, BINARY_OP, BINARY_OP_NAME, NOT, CHECK_LOGIC, CONTAINS, SUBSCRIPT, BUILD_LIST,
+    BUILD_TUPLE, JUMP, POP_JUMP_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, GET_ITER,
+    FOR_ITER, MAKE_FUNCTION, CALL, TAIL_CALL, RETURN_VALUE, RAISE, UNSUPPORTED, MAKE_CLASS, LOAD_ATTR,
+    STORE_ATTR, LOAD_METHOD, CALL_METHOD, TAIL_CALL_METHOD, BUILD_DICT, BUILD_SET, FUEL
+)
+
+
+def compile_program(program: PiProgram, bind_operators: bool = True) -> CodeObject:
+    """Compile un programme en objet de code de niveau module."""
+    compiler = _Compiler(CodeObject(name="<module>"), parent=None, bind_operators=bind_operators)
+    compiler.compile_block(program, want_value=True)
+    compiler.emit(RETURN_VALUE)
+    return compiler.code
+
+def compile_function(funcdef: PiFunctionDef, parent: '_Compiler | None' = None) -> CodeObject:
+    """Compile le corps d'une fonction ; ses variables locales reçoivent un emplacement."""
+    code = CodeObject(name=funcdef.name, is_function=True)
+    code.varnames = list(local_names(funcdef))
+    code.argcount = len(funcdef.arg_names)
+    code.has_vararg = funcdef.vararg is not None
+    code.slot_of = {name: i for i, name in enumerate(code.varnames)}
+    compiler = _Compiler(code, parent, bind_operators=parent.bind_operators if parent else True)
+    if funcdef.fuel is not None:
+        compiler.emit(FUEL, funcdef.fuel)
+    compiler.compile_block(funcdef.body, want_value=True)
+    compiler.emit(RETURN_VALUE)
+    return code
+
+class _Loop:
+    """Cibles de saut de la boucle en cours de compilation."""
+    def __init__(self, continue_target: int):
+        self.continue_target = continue_target
+        self.break_jumps: list[int] = []
+
+
+class _Compiler:
+    """Compile les instructions d'un seul objet de code."""
+
+    def __init__(self, code: CodeObject, parent: '_Compiler | None', bind_operators: bool = True):
+        self.code = code
+        self.parent = parent
+        self.bind_operators = bind_operators
+        self.loops: list[_Loop] = []
+        self.constant_index: dict[tuple, int] = {}
+
+    # Émission
+
+    def emit(self, op: int, arg=None) -> int:
+        self.code.instructions.append((op, arg))
+        return len(self.code.instructions) - 1
+
+    def here(self) -> int:
+        return len(self.code.instructions)
+
+    def patch(self, position: int, target: int) -> None:
+        op, _ = self.code.instructions[position]
+        self.code.instructions[position] = (op, target)
+
+    def constant(self, value) -> int:
+        key = (type(value), repr(value))
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.code.constants)
+            self.code.constants.append(value)
+        return self.constant_index[key]
+
+    def temporary(self, prefix: str) -> int:
+        # Les noms temporaires ne sont pas des identifiants valides.
+        self.code.varnames.append(f".{prefix}{len(self.code.varnames)}")
+        return len(self.code.varnames) - 1
+
+    # Variables
+
+    def load(self, name: str) -> None:
+        if not self.code.is_function:
+            self.emit(LOAD_NAME, name)
+            return
+        if name in self.code.slot_of:
+            self.emit(LOAD_FAST, self.code.slot_of[name])
+            return
+        depth = 1
+        scope = self.parent
+        while scope is not None and scope.code.is_function:
+            if name in scope.code.slot_of:
+                self.emit(LOAD_DEREF, (depth, scope.code.slot_of[name]))
+                return
+            depth += 1
+            scope = scope.parent
+        self.emit(LOAD_GLOBAL, name)
+
+    def store(self, name: str) -> None:
+        if self.code.is_function:
+            self.emit(STORE_FAST, self.code.slot_of[name])
+        else:
+            self.emit(STORE_NAME, name)
+
+    # Blocs et instructions
+
+    def compile_block(self, stmts: list[PiStatement], want_value: bool) -> None:
+        if not stmts:
+            if want_value:
+                self.emit(LOAD_CONST, self.constant(V_NONE))
+            return
+        for stmt in stmts[:-1]:
+            self.compile(stmt, want_value=False)
+        self.compile(stmts[-1], want_value)
+
+    def compile(self, node: PiStatement, want_value: bool = True) -> None:
+        """Compile un nœud ; sa valeur reste sur la pile seulement si `want_value`."""
+        if isinstance(node, PiAssignment):
+            self.compile(node.value)
+            if want_value:
+                self.emit(DUP_TOP)
+            self.store(node.name)
+        elif isinstance(node, PiIfThenElse):
+            self.compile(node.condition)
+            jump_else = self.emit(POP_JUMP_IF_FALSE)
+            self.compile_block(node.then_branch, want_value)
+            jump_end = self.emit(JUMP)
+            self.patch(jump_else, self.here())
+            self.compile_block(node.else_branch, want_value)
+            self.patch(jump_end, self.here())
+        elif isinstance(node, PiWhile):
+            self.compile_while(node, want_value)
+        elif isinstance(node, PiFor):
+            self.compile_for(node, want_value)
+        elif isinstance(node, PiBreak):
+            if self.loops:
+                self.loops[-1].break_jumps.append(self.emit(JUMP))
+            else:
+                self.emit(RAISE, BreakException)
+        elif isinstance(node, PiContinue):
+            if self.loops:
+                self.emit(JUMP, self.loops[-1].continue_target)
+            else:
+                self.emit(RAISE, ContinueException)
+        elif isinstance(node, PiFunctionDef):
+            self.emit(MAKE_FUNCTION, (node, compile_function(node, self)))
+            self.store(node.name)
+            if want_value:
+                self.emit(LOAD_CONST, self.constant(V_NONE))
+        elif isinstance(node, PiClassDef):
+            for method in node.methods:
+                self.emit(MAKE_FUNCTION, (method, compile_function(method, self)))
+            self.emit(MAKE_CLASS, (node.name, tuple(method.name for method in node.methods)))
+            self.store(node.name)
+            if want_value:
+                self.emit(LOAD_CONST, self.constant(V_NONE))
+        elif isinstance(node, PiAttributeAssignment):
+            # Comme en Python, la valeur est évaluée avant l'objet.
+            self.compile(node.value)
+            if want_value:
+                self.emit(DUP_TOP)
+            self.compile(node.object)
+            self.emit(STORE_ATTR, AttributeStoreCache(node.attr))
+        elif isinstance(node, PiReturn):
+            if self.code.is_function and isinstance(node.value, PiFunctionCall):
+                # Appel terminal : le cadre de l'appelant est réutilisé.
+                self.compile_call(node.value, TAIL_CALL)
+                self.emit(RETURN_VALUE)
+                return
+            self.compile(node.value)
+            if self.code.is_function:
+                self.emit(RETURN_VALUE)
+            else:
+                self.emit(RAISE, ReturnException)
+        else:
+            self.compile_expression(node)
+            if not want_value:
+                self.emit(POP_TOP)
+
+    def compile_while(self, node: PiWhile, want_value: bool) -> None:
+        result = self.init_loop_value() if want_value else None
+        start = self.here()
+        self.compile(node.condition)
+        jump_end = self.emit(POP_JUMP_IF_FALSE)
+        loop = _Loop(continue_target=start)
+        self.compile_loop_body(node, loop, result)
+        self.emit(JUMP, start)
+        end = self.here()
+        self.patch(jump_end, end)
+        self.finish_loop(loop, end, result)
+
+    def compile_for(self, node: PiFor, want_value: bool) -> None:
+        result = self.init_loop_value() if want_value else None
+        self.compile(node.iterable)
+        self.emit(GET_ITER)
+        start = self.emit(FOR_ITER)
+        self.store(node.var)
+        loop = _Loop(continue_target=start)
+        self.compile_loop_body(node, loop, result)
+        self.emit(JUMP, start)
+        # Un 'break' doit retirer l'itérateur de la pile ; l'épuisement le fait déjà.
+        break_target = self.emit(POP_TOP)
+        self.patch(start, self.here())
+        self.finish_loop(loop, break_target, result)
+
+    def init_loop_value(self) -> int:
+        slot = self.temporary("loop")
+        self.emit(LOAD_CONST, self.constant(V_NONE))
+        self.emit(STORE_FAST, slot)
+        return slot
+
+    def compile_loop_body(self, node: PiWhile | PiFor, loop: _Loop, result: int | None) -> None:
+        self.loops.append(loop)
+        if node.fuel is not None:
+            self.emit(FUEL, node.fuel)
+        self.compile_block(node.body, want_value=result is not None)
+        if result is not None:
+            self.emit(STORE_FAST, result)
+        self.loops.pop()
+
+    def finish_loop(self, loop: _Loop, break_target: int, result: int | None) -> None:
+        for position in loop.break_jumps:
+            self.patch(position, break_target)
+        if result is not None:
+            self.emit(LOAD_FAST, result)
+
+    def compile_expression(self, node: PiStatement) -> None:
+        if isinstance(node, PiNumber):
+            self.emit(LOAD_CONST, self.constant(make_number(node.value)))
+        elif isinstance(node, PiBool):
+            self.emit(LOAD_CONST, self.constant(make_bool(node.value)))
+        elif isinstance(node, PiNone):
+            self.emit(LOAD_CONST, self.constant(V_NONE))
+        elif isinstance(node, PiString):
+            self.emit(LOAD_CONST, self.constant(VString(node.value)))
+        elif isinstance(node, PiVariable):
+            self.load(node.name)
+        elif isinstance(node, PiBinaryOperation):
+            self.compile(node.left)
+            self.compile(node.right)
+            site = node.site or (bind_operator(node.operator) if self.bind_operators else None)
+            if site is not None:
+                self.emit(BINARY_OP, site)
+            else:
+                self.emit(BINARY_OP_NAME, node.operator)
+        elif isinstance(node, PiList):
+            for element in node.elements:
+                self.compile(element)
+            self.emit(BUILD_LIST, len(node.elements))
+        elif isinstance(node, PiTuple):
+            for element in node.elements:
+                self.compile(element)
+            self.emit(BUILD_TUPLE, len(node.elements))
+        elif isinstance(node, PiDict):
+            for key, value in zip(node.keys, node.values):
+                self.compile(key)
+                self.compile(value)
+            self.emit(BUILD_DICT, len(node.keys))
+        elif isinstance(node, PiSet):
+            for element in node.elements:
+                self.compile(element)
+            self.emit(BUILD_SET, len(node.elements))
+        elif isinstance(node, PiNot):
+            self.compile(node.operand)
+            self.emit(NOT)
+        elif isinstance(node, (PiAnd, PiOr)):
+            self.compile(node.left)
+            self.emit(CHECK_LOGIC)
+            jump = self.emit(JUMP_IF_FALSE_OR_POP if isinstance(node, PiAnd) else JUMP_IF_TRUE_OR_POP)
+            self.compile(node.right)
+            self.emit(CHECK_LOGIC)
+            self.patch(jump, self.here())
+        elif isinstance(node, PiFunctionCall):
+            self.compile_call(node, CALL)
+        elif isinstance(node, PiIn):
+            self.compile(node.container)
+            self.compile(node.element)
+            self.emit(CONTAINS)
+        elif isinstance(node, PiSubscript):
+            self.compile(node.collection)
+            self.compile(node.index)
+            self.emit(SUBSCRIPT)
+        elif isinstance(node, PiAttribute):
+            self.compile(node.object)
+            self.emit(LOAD_ATTR, AttributeCache(node.attr))
+        else:
+            self.emit(UNSUPPORTED, type(node))
+
+    def compile_call(self, node: PiFunctionCall, op: int) -> None:
+        function = node.function
+        if isinstance(function, PiAttribute):
+            # Appel de méthode : l'objet est passé en premier argument, sans méthode liée.
+            self.compile(function.object)
+            self.emit(LOAD_METHOD, AttributeCache(function.attr))
+            for arg in node.args:
+                self.compile(arg)
+            self.emit(CALL_METHOD if op == CALL else TAIL_CALL_METHOD, len(node.args) + 1)
+            return
+        self.compile(function)
+        for arg in node.args:
+            self.compile(arg)
+        self.emit(op, len(node.args))
@@ -0,0 +1,61 @@
+"""
+Désassembleur du bytecode Pithon (`pithon --dis fichier.py`).
+"""
+
+from pithon.vm.bytecode import (
+    CodeObject, OPNAMES, JUMP_OPS, LOAD_CONST, LOAD_FAST, STORE_FAST, LOAD_DEREF, MAKE_FUNCTION,
+    BINARY_OP, MAKE_CLASS, LOAD_ATTR, STORE_ATTR, LOAD_METHOD, FUEL
+)
+
+
+def disassemble(code: CodeObject) -> str:
+    """Retourne le listing lisible d'un objet de code et des fonctions qu'il définit."""
+    lines = []
+    _disassemble_into(code, lines)
+    return "\n".join(lines)
+
+def _disassemble_into(code: CodeObject, lines: list[str]) -> None:
+    header = f"Désassemblage de {code.name}"
+    if code.is_function:
+        header += f" (arguments : {code.argcount}, variadique : {'oui' if code.has_vararg else 'non'})"
+    lines.append(header + " :")
+    if code.varnames:
+        lines.append("  locaux : " + ", ".join(f"{i}={name}" for i, name in enumerate(code.varnames)))
+    nested = []
+    targets = {arg for op, arg in code.instructions if op in JUMP_OPS}
+    for position, (op, arg) in enumerate(code.instructions):
+        marker = ">>" if position in targets else "  "
+        line = f"  {marker} {position:4d} {OPNAMES[op]:<22}"
+        if arg is not None:
+            line += f"{_format_arg(code, op, arg)}"
+        lines.append(line.rstrip())
+        if op == MAKE_FUNCTION:
+            nested.append(arg[1])
+    for function_code in nested:
+        lines.append("")
+        _disassemble_into(function_code, lines)
+
+def _format_arg(code: CodeObject, op: int, arg) -> str:
+    if op == LOAD_CONST:
+        return f"{arg} ({code.constants[arg]!r})"
+    if op in (LOAD_FAST, STORE_FAST):
+        return f"{arg} ({code.varnames[arg]})"
+    if op == LOAD_DEREF:
+        depth, slot = arg
+        return f"{depth}, {slot}"
+    if op == MAKE_FUNCTION:
+        return f"(<code {arg[1].name}>)"
+    if op == BINARY_OP:
+        return repr(arg.operator)
+    if op == FUEL:
+        return ""
+    if op in (LOAD_ATTR, STORE_ATTR, LOAD_METHOD):
+        return repr(arg.name)
+    if op == MAKE_CLASS:
+        name, methods = arg
+        return f"{name} ({', '.join(methods)})"
+    if op in JUMP_OPS:
+        return f"vers {arg}"
+    if isinstance(arg, type):
+        return arg.__name__
+    return repr(arg) if isinstance(arg, str) else str(arg)
@@ -0,0 +1,370 @@
+"""
+Machine virtuelle à pile exécutant le bytecode produit par `pithon.vm.compiler`.
+
+Les appels entre fonctions compilées en bytecode ne consomment pas de cadre
+Python : la machine gère sa propre pile d'appels, bornée par `max_depth`. Un
+appel en position de 'return' (TAIL_CALL) remplace le cadre courant, si bien
+qu'une récursion terminale s'exécute en mémoire constante. L'appel d'une
+méthode ou d'une classe dont `__init__` est compilée est traité de la même
+façon, l'instance étant ajoutée en tête des arguments ; un appel `obj.m(...)`
+(LOAD_METHOD, CALL_METHOD) place directement la méthode et l'objet sur la
+pile, sans créer de méthode liée.
+
+La boucle de dispatch est un générateur : elle compte les pas (sauts et appels
+de fonctions compilées, donc chaque itération de boucle et chaque appel) et
+s'interrompt par un `yield` quand le nombre de pas demandé est atteint ;
+l'appelant la relance avec `send(n)` pour `n` pas de plus. Une exécution
+ordinaire ne fixe aucune limite et le générateur ne s'interrompt jamais.
+"""
+
+from pithon.evaluator.envframe import UNBOUND, EnvFrame, SlotFrame
+from pithon.evaluator.envvalue import (
+    EnvValue, VClassDef, VFunctionClosure, VList, VMethodClosure, VObject, VTuple, VBool, V_FALSE, V_TRUE,
+    make_dict, make_list, make_set
+)
+from pithon.evaluator.evaluator import (
+    ReturnException, _check_valid_piandor_type, call_function, contains_value, iterate_value,
+    subscript_value
+)
+from pithon.evaluator.objects import call_object
+from pithon.evaluator.primitive import check_type
+from pithon.syntax import PiProgram
+from pithon.vm.bytecode import (
+    CodeObject, LOAD_CONST, POP_TOP, DUP_TOP, LOAD_FAST, STORE_FAST, LOAD_DEREF, LOAD_GLOBAL,
+    LOAD_NAME, STORE_NAME, BINARY_OP, BINARY_OP_NAME, NOT, CHECK_LOGIC, CONTAINS, SUBSCRIPT, BUILD_LIST,
+    BUILD_TUPLE, JUMP, POP_JUMP_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, GET_ITER,
+    FOR_ITER, MAKE_FUNCTION, CALL, TAIL_CALL, RETURN_VALUE, RAISE, UNSUPPORTED, MAKE_CLASS, LOAD_ATTR,
+    STORE_ATTR, LOAD_METHOD, CALL_METHOD, TAIL_CALL_METHOD, BUILD_DICT, BUILD_SET, FUEL
+)
+from pithon.vm.compiler import compile_program
+
+# Nombre maximal d'appels de fonctions Pithon imbriqués (hors appels terminaux).
+DEFAULT_MAX_DEPTH = 10_000
+
+# Cadre intercalé entre l'appelant d'une classe et `__init__` : il écarte la
+# valeur de `__init__` et retourne l'instance, placée seule sur sa pile.
+_CONSTRUCTOR = CodeObject(name="<constructeur>", instructions=[(POP_TOP, None), (RETURN_VALUE, None)])
+
+# Placé par LOAD_METHOD à la place de l'objet quand l'attribut appelé n'est
+# pas une méthode : CALL_METHOD l'écarte des arguments.
+_NO_RECEIVER = object()
+
+
+class Frame(SlotFrame):
+    """
+    Cadre d'exécution d'un objet de code : emplacements locaux indexés, lien
+    vers l'environnement englobant (cadre de la fonction de définition ou
+    EnvFrame) et environnement global du module.
+    """
+    __slots__ = ("code", "globals")
+
+    def __init__(self, code: CodeObject, values: list, parent, globals: EnvFrame):
+        super().__init__(code.varnames, values, parent)
+        self.code = code
+        self.globals = globals
+
+
+def evaluate_bytecode(program: PiProgram, env: EnvFrame, max_depth: int = DEFAULT_MAX_DEPTH,
+                      bind_operators: bool = True) -> EnvValue:
+    """Compile un programme en bytecode puis l'exécute dans l'environnement donné."""
+    return run_code(compile_program(program, bind_operators), env, max_depth)
+
+def run_code(code: CodeObject, env: EnvFrame, max_depth: int = DEFAULT_MAX_DEPTH) -> EnvValue:
+    """Exécute un objet de code de niveau module dans l'environnement donné."""
+    return run_steps(module_steps(code, env, max_depth))
+
+def module_steps(code: CodeObject, env: EnvFrame, max_depth: int = DEFAULT_MAX_DEPTH, steps: int = -1):
+    """
+    Générateur exécutant un objet de code de niveau module, interrompu après
+    `steps` pas puis après chaque nombre de pas envoyé par `send` ; sa valeur
+    de retour (StopIteration.value) est celle du programme.
+    """
+    return _execute(Frame(code, [UNBOUND] * len(code.varnames), env, env), max_depth, steps)
+
+def run_steps(execution) -> EnvValue:
+    """Mène à son terme une exécution qui ne s'interrompt pas."""
+    try:
+        next(execution)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("Exécution interrompue par une limite de pas.")
+
+def _is_bytecode_closure(func_val) -> bool:
+    return type(func_val) is VFunctionClosure and type(func_val.code) is CodeObject
+
+def _call_value(func_val, args: list[EnvValue]) -> EnvValue:
+    """Appelle une valeur hors de la boucle de dispatch (fonction compilée : boucle imbriquée)."""
+    if _is_bytecode_closure(func_val):
+        return run_steps(_execute(_call_frame(func_val, args)))
+    if callable(func_val):
+        return func_val(args)
+    if isinstance(func_val, VFunctionClosure):
+        return call_function(func_val, args)
+    return call_object(func_val, args, _call_value)
+
+def _call_frame(func_val: VFunctionClosure, args: list[EnvValue]) -> Frame:
+    """Crée le cadre d'appel d'une fonction compilée en bytecode."""
+    code = func_val.code
+    argcount = code.argcount
+    if len(args) < argcount:
+        raise TypeError("Argument manquant pour la fonction.")
+    values = args[:argcount]
+    if code.has_vararg:
+        values.append(VList(args[argcount:]))
+    elif len(args) > argcount:
+        raise TypeError("Trop d'arguments pour la fonction.")
+    values.extend([UNBOUND] * (len(code.varnames) - len(values)))
+    parent = func_val.closure_env
+    globals = parent.globals if type(parent) is Frame else parent
+    return Frame(code, values, parent, globals)
+
+def _execute(frame: Frame, max_depth: int = DEFAULT_MAX_DEPTH, steps: int = -1):
+    """
+    Boucle de dispatch : exécute les instructions du cadre jusqu'à son
+    RETURN_VALUE, y compris les appels de fonctions compilées en bytecode.
+    Générateur interrompu tous les `steps` pas (jamais si `steps` est négatif).
+    """
+    # Appelants suspendus : (cadre, pc de retour, pile d'évaluation).
+    calls = []
+    code = frame.code
+    instructions = code.instructions
+    constants = code.constants
+    locals = frame.values
+    globals = frame.globals
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    pc = 0
+    while True:
+        op, arg = instructions[pc]
+        pc += 1
+        if op == LOAD_FAST:
+            value = locals[arg]
+            if value is UNBOUND:
+                value = frame.parent.lookup(code.varnames[arg])
+            push(value)
+        elif op == LOAD_CONST:
+            push(constants[arg])
+        elif op == BINARY_OP:
+            right = pop()
+            stack[-1] = arg(stack[-1], right)
+        elif op == STORE_FAST:
+            locals[arg] = pop()
+        elif op == POP_JUMP_IF_FALSE:
+            cond = pop()
+            if not isinstance(cond, VBool):
+                check_type(cond, VBool)
+            if not cond.value:
+                pc = arg
+        elif op == JUMP:
+            pc = arg
+            steps -= 1
+            if not steps:
+                steps = yield
+        elif op == LOAD_NAME:
+            push(frame.parent.lookup(arg))
+        elif op == STORE_NAME:
+            frame.parent.vars[arg] = pop()
+        elif op == LOAD_GLOBAL:
+            push(globals.lookup(arg))
+        elif op == CALL or op == CALL_METHOD:
+            if arg:
+                args = stack[-arg:]
+                del stack[-arg:]
+            else:
+                args = []
+            if op == CALL_METHOD and args[0] is _NO_RECEIVER:
+                del args[0]
+            func_val = stack[-1]
+            if callable(func_val):
+                stack[-1] = func_val(args)
+            else:
+                instance = None
+                if type(func_val) is VMethodClosure:
+                    args.insert(0, func_val.instance)
+                    func_val = func_val.function
+                elif type(func_val) is VClassDef and _is_bytecode_closure(func_val.methods.get("__init__")):
+                    instance = VObject(func_val.shape, [])
+                    args.insert(0, instance)
+                    func_val = func_val.methods["__init__"]
+                if _is_bytecode_closure(func_val):
+                    pop()
+                    steps -= 1
+                    if not steps:
+                        steps = yield
+                    if len(calls) >= max_depth:
+                        raise RecursionError(f"Profondeur d'appel maximale dépassée ({max_depth}).")
+                    calls.append((frame, pc, stack))
+                    if instance is not None:
+                        calls.append((Frame(_CONSTRUCTOR, [], frame, globals), 0, [instance]))
+                    frame = _call_frame(func_val, args)
+                    code = frame.code
+                    instructions = code.instructions
+                    constants = code.constants
+                    locals = frame.values
+                    globals = frame.globals
+                    stack = []
+                    push = stack.append
+                    pop = stack.pop
+                    pc = 0
+                else:
+                    stack[-1] = _call_value(func_val, args)
+        elif op == LOAD_METHOD:
+            value = stack[-1]
+            if type(value) is VObject and value.shape is arg.method_shape:
+                stack[-1] = arg.method
+                push(value)
+            else:
+                method = arg.lookup_method(value)
+                if method is None:
+                    stack[-1] = arg.load(value)
+                    push(_NO_RECEIVER)
+                else:
+                    stack[-1] = method
+                    push(value)
+        elif op == RETURN_VALUE:
+            value = pop()
+            if not calls:
+                return value
+            frame, pc, stack = calls.pop()
+            code = frame.code
+            instructions = code.instructions
+            constants = code.constants
+            locals = frame.values
+            globals = frame.globals
+            push = stack.append
+            pop = stack.pop
+            push(value)
+        elif op == FOR_ITER:
+            item = next(stack[-1], UNBOUND)
+            if item is UNBOUND:
+                pop()
+                pc = arg
+            else:
+                push(item)
+        elif op == FUEL:
+            arg()
+        elif op == GET_ITER:
+            stack[-1] = iterate_value(stack[-1])
+        elif op == LOAD_DEREF:
+            depth, slot = arg
+            scope = frame
+            for _ in range(depth):
+                scope = scope.parent
+            value = scope.values[slot]
+            if value is UNBOUND:
+                value = scope.parent.lookup(scope.code.varnames[slot])
+            push(value)
+        elif op == POP_TOP:
+            pop()
+        elif op == DUP_TOP:
+            push(stack[-1])
+        elif op == CHECK_LOGIC:
+            _check_valid_piandor_type(stack[-1])
+        elif op == JUMP_IF_FALSE_OR_POP:
+            if stack[-1].value:
+                pop()
+            else:
+                pc = arg
+        elif op == JUMP_IF_TRUE_OR_POP:
+            if stack[-1].value:
+                pc = arg
+            else:
+                pop()
+        elif op == NOT:
+            value = stack[-1]
+            _check_valid_piandor_type(value)
+            stack[-1] = V_FALSE if value.value else V_TRUE
+        elif op == CONTAINS:
+            element = pop()
+            stack[-1] = contains_value(stack[-1], element)
+        elif op == SUBSCRIPT:
+            index = pop()
+            stack[-1] = subscript_value(stack[-1], index)
+        elif op == BUILD_LIST:
+            elements = stack[len(stack) - arg:]
+            del stack[len(stack) - arg:]
+            push(make_list(elements))
+        elif op == BUILD_TUPLE:
+            elements = tuple(stack[len(stack) - arg:])
+            del stack[len(stack) - arg:]
+            push(VTuple(elements))
+        elif op == BUILD_DICT:
+            elements = stack[len(stack) - 2 * arg:]
+            del stack[len(stack) - 2 * arg:]
+            push(make_dict(list(zip(elements[::2], elements[1::2]))))
+        elif op == BUILD_SET:
+            elements = stack[len(stack) - arg:]
+            del stack[len(stack) - arg:]
+            push(make_set(elements))
+        elif op == BINARY_OP_NAME:
+            right = pop()
+            stack[-1] = call_function(globals.lookup(arg), [stack[-1], right])
+        elif op == TAIL_CALL or op == TAIL_CALL_METHOD:
+            args = stack[len(stack) - arg:]
+            del stack[len(stack) - arg:]
+            if op == TAIL_CALL_METHOD and args[0] is _NO_RECEIVER:
+                del args[0]
+            func_val = stack[-1]
+            instance = None
+            if type(func_val) is VMethodClosure:
+                args.insert(0, func_val.instance)
+                func_val = func_val.function
+            elif type(func_val) is VClassDef and _is_bytecode_closure(func_val.methods.get("__init__")):
+                instance = VObject(func_val.shape, [])
+                args.insert(0, instance)
+                func_val = func_val.methods["__init__"]
+            if _is_bytecode_closure(func_val):
+                steps -= 1
+                if not steps:
+                    steps = yield
+                if instance is not None:
+                    if len(calls) >= max_depth:
+                        raise RecursionError(f"Profondeur d'appel maximale dépassée ({max_depth}).")
+                    calls.append((Frame(_CONSTRUCTOR, [], frame, globals), 0, [instance]))
+                # Le cadre courant est abandonné ; le RETURN_VALUE suivant n'est pas atteint.
+                frame = _call_frame(func_val, args)
+                code = frame.code
+                instructions = code.instructions
+                constants = code.constants
+                locals = frame.values
+                globals = frame.globals
+                stack = []
+                push = stack.append
+                pop = stack.pop
+                pc = 0
+            else:
+                stack[-1] = _call_value(func_val, args)
+        elif op == MAKE_FUNCTION:
+            funcdef, function_code = arg
+            closure_env = frame if code.is_function else frame.parent
+            closure = VFunctionClosure(funcdef, closure_env, code=function_code)
+            if funcdef.wrapper is not None:
+                # Une fonction enveloppée est appelée comme une primitive, par une boucle imbriquée.
+                closure = funcdef.wrapper.wrap(
+                    closure, lambda func_val, args: run_steps(_execute(_call_frame(func_val, args), max_depth)))
+            push(closure)
+        elif op == LOAD_ATTR:
+            # Cas monomorphe du cache en ligne, testé sur place.
+            value = stack[-1]
+            if type(value) is VObject and value.shape is arg.shape:
+                stack[-1] = value.values[arg.slot]
+            else:
+                stack[-1] = arg.load(value)
+        elif op == STORE_ATTR:
+            obj = pop()
+            if type(obj) is VObject and obj.shape is arg.shape:
+                obj.values[arg.slot] = pop()
+            else:
+                arg.store(obj, pop())
+        elif op == MAKE_CLASS:
+            name, method_names = arg
+            closures = stack[len(stack) - len(method_names):]
+            del stack[len(stack) - len(method_names):]
+            push(VClassDef(name, dict(zip(method_names, closures))))
+        elif op == RAISE:
+            raise arg(pop()) if arg is ReturnException else arg()
+        elif op == UNSUPPORTED:
+            raise TypeError(f"Type de nœud non supporté : {arg}")
+        else:
+            raise RuntimeError(f"Opcode inconnu : {op}")
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_directory(tmp_path_factory, monkeypatch):
+    """Chaque test utilise son propre cache d'AST, jamais celui de l'utilisateur."""
+    directory = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("PITHON_CACHE_DIR", str(directory))
+    return directory
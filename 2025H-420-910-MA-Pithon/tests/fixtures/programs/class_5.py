@@ -0,0 +1,91 @@
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def norm2(self):
+        return self.x * self.x + self.y * self.y
+
+    def moved(self, dx):
+        return Point(self.x + dx, self.y)
+
+class Empty:
+    def get(self):
+        return 7
+
+def make(i):
+    e = Empty()
+    if i % 5 == 0:
+        e.a = i
+    if i % 5 == 1:
+        e.b = i
+        e.a = i
+    if i % 5 == 2:
+        e.c = 1
+        e.b = 2
+        e.a = i
+    if i % 5 == 3:
+        e.d = 1
+        e.c = 1
+        e.b = 2
+        e.a = i
+    if i % 5 == 4:
+        e.e = 1
+        e.d = 1
+        e.c = 1
+        e.b = 2
+        e.a = i
+    return e
+
+total = 0
+for i in range(20):
+    total = total + make(i).a
+print(total)
+p = Point(3, 4)
+print(p.norm2())
+q = p.moved(2)
+print(q.x)
+print(p.x)
+m = p.norm2
+print(m())
+p.norm2 = 5
+print(p.norm2)
+print(Empty().get())
+g = Empty.get
+print(g(p))
+def f(n):
+    class Local:
+        def __init__(self, v):
+            self.v = v + n
+        def val(self):
+            return self.v
+    return Local(1)
+print(f(10).val())
+def counter():
+    class C:
+        def __init__(self):
+            self.n = 0
+        def inc(self):
+            self.n = self.n + 1
+            return self
+    c = C()
+    for i in range(100):
+        c.inc()
+    return c.n
+print(counter())
+class Node:
+    def __init__(self, v, nxt):
+        self.v = v
+        self.nxt = nxt
+    def total(self):
+        if self.nxt == None:
+            return self.v
+        return self.v + self.nxt.total()
+n = None
+for i in range(50):
+    n = Node(i, n)
+print(n.total())
+p.y = 9
+x = p.y
+print(x)
+print(p.y)
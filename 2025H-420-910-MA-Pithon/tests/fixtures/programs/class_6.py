@@ -0,0 +1,27 @@
+def double(x):
+    return x * 2
+
+class Counter:
+    def __init__(self, start):
+        self.n = start
+        self.f = double
+    def inc(self, k):
+        self.n = self.n + k
+        return self
+    def get(self):
+        return self.n
+    def count_down(self, k):
+        if k == 0:
+            return self.n
+        self.n = self.n + 1
+        return self.count_down(k - 1)
+
+c = Counter(1)
+print(c.inc(2).inc(3).get())
+print(c.f(21))
+print(Counter.get(c))
+m = c.get
+print(m())
+print(c.count_down(50))
+c.get = double
+print(c.get(4))
@@ -0,0 +1,37 @@
+ages = {"alice": 31, "bob": 27, "carol": 45}
+print(ages)
+print(ages["bob"])
+print("alice" in ages)
+print("dave" in ages)
+for name in ages:
+    print(name + " " + str(ages[name]))
+points = {(0, 0): "origine", (1, 2): "a"}
+print(points[(1, 2)])
+print((0, 0) in points)
+print((2, 1) in points)
+premiers = {2, 3, 5, 7, 11, 13}
+print(premiers)
+total = 0
+for n in range(20):
+    if n in premiers:
+        total = total + n
+print(total)
+print(1.0 in premiers)
+print(2.0 in {2: "deux"})
+print({1: "a", 1: "b"})
+print({"x": [1, 2]}["x"])
+print(str({1, 2}))
+print({1: 2} == {1: 2})
+print({1, 2} == {2, 1})
+vide = {}
+print(vide)
+paires = [(1, "un"), (2, "deux"), [3, "trois"]]
+noms = dict(paires)
+print(noms)
+print(noms[3])
+print(set([3, 1, 2, 1]))
+print(set(["poire", "pomme", "abricot", "poire"]))
+print(set())
+print(dict())
+print(set("aa"))
+print(2 in set(range(5)))
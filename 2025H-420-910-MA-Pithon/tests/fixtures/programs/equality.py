@@ -0,0 +1,21 @@
+# Égalité structurelle : listes, tableaux de nombres, tuples, dictionnaires
+a = [1, 2, 3]
+b = vadd([0, 1, 2], [1, 1, 1])
+print(a == b)
+print(a == [1, 2, 3, 4])
+print([a, "x"] == [b, "x"])
+print((1, [2, 3]) == (1, [2, 3]))
+print({"a": [1, 2], "b": 3} == {"b": 3, "a": [1, 2]})
+print({"a": 1} != {"a": 2})
+print([[1, "x"], [2, "y"]] == [[1, "x"], [2, "z"]])
+print([2, "y"] in [[1, "x"], [2, "y"]])
+# Structures plus profondes que la pile Python
+x = []
+y = []
+i = 0
+while i < 5000:
+    x = [i, x]
+    y = [i, y]
+    i = i + 1
+print(x == y)
+print(x == [4999, [4998, []]])
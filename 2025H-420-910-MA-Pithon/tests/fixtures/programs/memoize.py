@@ -0,0 +1,22 @@
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+def count(n):
+    print("appel " + str(n))
+    return n
+
+def scale(xs, k):
+    return vmul(xs, [k, k, k])
+
+def first(pair):
+    return pair[0]
+
+print(fib(20))
+print(fib(20))
+print(count(1))
+print(count(1))
+print(scale([1, 2, 3], 2))
+print(first((1, "a")))
+print(first((1.0, "a")))
@@ -0,0 +1,33 @@
+a = [1, 2, 3]
+b = [0.5, 1.5, 2.5]
+print(a)
+print(b)
+print(str(a))
+print(a == [1, 2, 3])
+print(a == [1.0, 2.0, 3.0])
+print(a + [4, 5])
+print(a + b)
+print(a + ["x"])
+print([0] * 4)
+print(2 * b)
+print(a[1])
+print(b[2])
+print(2 in a)
+print(2.0 in a)
+print("2" in a)
+print(sum(a))
+print(sum(b))
+print(sum(range(5)))
+print(sum([]))
+print(min(b))
+print(max(a))
+print(dot(a, b))
+print(vadd(a, a))
+print(vadd(a, b))
+print(vmul(a, (2, 2, 2)))
+print(vmul(range(3), range(3)))
+total = 0
+for x in a:
+    total = total + x
+print(total)
+print([1, 2.5, True])
@@ -0,0 +1,27 @@
+x = 2 * 3 + 1
+s = "ab" * 3
+if True:
+    print(x)
+else:
+    print("non")
+def f(a, b):
+    c = (a * b + 1) * (a * b + 1) - (a * b)
+    return c
+    print("jamais")
+print(f(2, 3))
+y = 1 / 0 if False else 4
+print(y)
+print(not True or 5 and "z")
+while False:
+    print(1)
+def g(n):
+    i = 0
+    while i < n:
+        i = i + 1
+        if False:
+            print("mort")
+    return i
+print(g(3))
+z = 3
+ok = z != 0 and (10 / z) + (10 / z)
+print(ok)
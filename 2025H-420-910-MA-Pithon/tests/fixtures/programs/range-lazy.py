@@ -0,0 +1,26 @@
+r = range(2, 10)
+print(r)
+print(str(r))
+print(r[3])
+print(5 in r)
+print(5.5 in r)
+print(10 in r)
+print(r == range(2, 10))
+for c in "abc":
+    print(c)
+total = 0
+for i in range(1000):
+    total = total + i
+print(total)
+print(not range(0))
+print(range(0) or 5)
+x = 7
+print(range(3) and x)
+print(range(3) + [3])
+print(range(2) * 2)
+print(3 * range(1, 3))
+print(range(3) == [0, 1, 2])
+print([0, 1, 2] == range(3))
+print(range(3) != [0, 1])
+print(range(2, 2) == range(5, 5))
+print([range(2), "a"] == [[0, 1], "a"])
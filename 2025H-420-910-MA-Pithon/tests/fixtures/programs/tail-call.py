@@ -0,0 +1,18 @@
+def somme(n, acc):
+    if n == 0:
+        return acc
+    return somme(n - 1, acc + n)
+
+def pair(n):
+    if n == 0:
+        return True
+    return impair(n - 1)
+
+def impair(n):
+    if n == 0:
+        return False
+    return pair(n - 1)
+
+print(somme(100, 0))
+print(pair(40))
+print(impair(7))
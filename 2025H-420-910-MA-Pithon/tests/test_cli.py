@@ -1,8 +1,17 @@
+import asyncio
+import io
+import json
 import pytest
 from pathlib import Path
 
 # Importation de la fonction à tester
-from pithon.cli import run_file
+import pithon
+from pithon.cli import ENGINES, run_bench, run_file, run_tests
+from pithon.evaluator.limits import FuelExhausted, MemoryLimitExceeded
+from pithon.evaluator.output import CaptureSink, RingBufferSink
+from pithon.parser import cache
+from pithon.parser.simpleparser import SimpleParser
+from pithon.server import WorkerPool, serve_stdio
 
 def collect_test_cases():
     """
@@ -23,17 +32,20 @@ def collect_test_cases():
 # Paramétrage du test pour chaque couple (source, attendu)
 test_cases = collect_test_cases()
 id_list = [x[0].name for x in test_cases]
+@pytest.mark.parametrize("engine", list(ENGINES))
 @pytest.mark.parametrize("source_path, expected_path",
                          test_cases,
                          ids=id_list)
 def test_file_outputs_match(source_path: Path,
                             expected_path: Path,
+                            engine: str,
                             capfd):
     """
-    Pour chaque fichier .py (mini-Python), exécute run_file(...) sur son contenu,
-    capture la sortie standard, et compare avec le contenu du fichier .out correspondant.
+    Pour chaque fichier .py (mini-Python) et chaque moteur d'exécution, exécute
+    run_file(...) sur son contenu, capture la sortie standard, et compare avec
+    le contenu du fichier .out correspondant.
     """
-    run_file(source_path)
+    run_file(source_path, engine=engine)
 
     # capfd est un fixture pytest qui permet de capturer stdout/stderr pendant le test
     # On récupère la sortie capturée
@@ -49,3 +61,222 @@ def test_file_outputs_match(source_path: Path,
         f"--- obtenu ---\n{actual_stdout!r}\n"
         f"--- attendu ---\n{expected_stdout!r}\n"
     )
+
+
+@pytest.mark.parametrize("fuel", [None, 10**6])
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_memoize_keeps_outputs(engine: str, fuel, capfd):
+    """
+    Avec la mémoïsation, la sortie standard est inchangée (les fonctions qui
+    affichent ne sont pas mémoïsées) et les statistiques sont écrites sur la
+    sortie d'erreur. Le décompte du carburant ne rend pas les fonctions impures.
+    """
+    source_path = Path(__file__).parent / "fixtures" / "programs" / "memoize.py"
+    run_file(source_path, engine=engine, memoize=True, fuel=fuel)
+
+    captured = capfd.readouterr()
+    assert captured.out == source_path.with_suffix(".out").read_text(encoding="utf-8")
+    assert "fib : 19 succès, 21 échecs, 0 évictions" in captured.err
+    assert "count" not in captured.err
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_profile_keeps_outputs(engine: str, capfd, tmp_path: Path):
+    """
+    Le profilage ne change pas la sortie standard ; le rapport (appels et
+    passages par ligne) va sur la sortie d'erreur et les piles repliées dans
+    le fichier demandé.
+    """
+    source_path = Path(__file__).parent / "fixtures" / "programs" / "recursion.py"
+    stacks_path = tmp_path / "stacks.txt"
+    run_file(source_path, engine=engine, profile=True, profile_output=stacks_path)
+
+    captured = capfd.readouterr()
+    assert captured.out == source_path.with_suffix(".out").read_text(encoding="utf-8")
+    assert any(line.split()[0] == "50" and line.endswith("factorial") for line in captured.err.splitlines())
+    assert any(line.split()[:2] == ["4", "50"] for line in captured.err.splitlines())
+    for line in stacks_path.read_text(encoding="utf-8").splitlines():
+        stack, elapsed = line.rsplit(" ", 1)
+        assert stack.startswith("<module>") and int(elapsed) > 0
+
+
+def test_bench_writes_results_and_detects_regressions(capfd, tmp_path: Path):
+    """
+    --bench écrit ses mesures en JSON ; comparées à une référence dont le
+    débit est bien plus élevé, elles sont signalées comme une régression.
+    """
+    program = tmp_path / "loop.py"
+    program.write_text("# ops: 100\nfor i in range(100):\n    x = i * 2\nprint(x)\n", encoding="utf-8")
+    output = tmp_path / "results.json"
+    assert run_bench([program], warmup=0, repeat=2, output=output) == 0
+    results = json.loads(output.read_text(encoding="utf-8"))
+    assert results["benchmarks"]["loop"]["ops"] == 100
+    assert results["benchmarks"]["loop"]["ops_per_sec"] > 0
+
+    results["benchmarks"]["loop"]["ops_per_sec"] *= 1000
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(results), encoding="utf-8")
+    assert run_bench([program], warmup=0, repeat=1, baseline=baseline) == 1
+    assert "RÉGRESSION" in capfd.readouterr().out
+
+def test_tests_runner_reports_each_program(capfd, tmp_path: Path):
+    """
+    --test exécute chaque programme dans son processus : un programme trop long
+    est interrompu sans bloquer les autres, et chaque statut est rapporté.
+    """
+    (tmp_path / "ok.py").write_text('print("ok")\n', encoding="utf-8")
+    (tmp_path / "ok.out").write_text("ok\n", encoding="utf-8")
+    (tmp_path / "diff.py").write_text('print("obtenu")\n', encoding="utf-8")
+    (tmp_path / "diff.out").write_text("attendu\n", encoding="utf-8")
+    (tmp_path / "erreur.py").write_text("print(inconnue)\n", encoding="utf-8")
+    (tmp_path / "boucle.py").write_text("while True:\n    x = 1\n", encoding="utf-8")
+    output = tmp_path / "results.json"
+    junit = tmp_path / "results.xml"
+    assert run_tests([tmp_path], jobs=2, timeout=1, json_output=output, junit_output=junit) == 1
+    results = json.loads(output.read_text(encoding="utf-8"))
+    statuses = {result["name"]: result["status"] for result in results["results"]}
+    assert statuses == {"boucle.py": "timeout", "diff.py": "failed", "erreur.py": "error", "ok.py": "passed"}
+    assert "+obtenu" in capfd.readouterr().out
+    assert '<testsuite name="pithon" tests="4" failures="1" errors="2"' in junit.read_text(encoding="utf-8")
+
+def test_server_answers_json_requests():
+    """
+    --serve répond à chaque ligne JSON ; un processus qui dépasse son délai est
+    remplacé et le suivant exécute les requêtes restantes.
+    """
+    requests = [
+        {"id": 1, "source": 'print("bonjour")\n2 + 3', "engine": "vm"},
+        {"id": 2, "source": "while True:\n    x = 1\n", "timeout": 0.5},
+        {"id": 3, "source": "print(inconnue)"},
+    ]
+    output = io.StringIO()
+    pool = WorkerPool(1, max_jobs=1)
+    try:
+        serve_stdio(pool, io.StringIO("".join(json.dumps(r) + "\n" for r in requests) + "pas du json\n"), output)
+    finally:
+        pool.close()
+    responses = {r["id"]: r for r in map(json.loads, output.getvalue().splitlines())}
+    assert (responses[1]["status"], responses[1]["stdout"], responses[1]["result"]) == ("ok", "bonjour\n", "5")
+    assert responses[2]["status"] == "timeout"
+    assert responses[3]["status"] == "error" and "inconnue" in responses[3]["error"]
+    assert responses[None]["status"] == "error"
+
+def test_run_async_interleaves_programs():
+    """
+    run_async rend la main pendant les boucles : une boucle infinie n'empêche
+    pas les autres programmes de se terminer, puis elle est annulée ; un
+    nombre maximal de pas l'interrompt aussi.
+    """
+    loop_source = "i = 0\nwhile True:\n    i = i + 1\n"
+
+    async def scenario():
+        endless = asyncio.create_task(pithon.run_async(loop_source, interval=10))
+        outputs = [CaptureSink() for _ in range(3)]
+        results = await asyncio.gather(*(pithon.run_async(f"print({n})\n{n} * 2", output=output)
+                                         for n, output in enumerate(outputs)))
+        assert [r.value for r in results] == [0, 2, 4]
+        assert [o.getvalue() for o in outputs] == ["0\n", "1\n", "2\n"]
+        assert not endless.done()
+        endless.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await endless
+        with pytest.raises(pithon.StepBudgetExceeded):
+            await pithon.run_async(loop_source, max_steps=250, interval=100)
+
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_resource_limits_stop_runaway_programs(engine, tmp_path: Path):
+    """
+    --fuel interrompt une boucle infinie ou une primitive qui parcourt un long
+    intervalle, et --memory-limit refuse une répétition ou un ensemble
+    démesuré avant de le créer ; sous ces limites, un programme ordinaire
+    s'exécute normalement.
+    """
+    endless = tmp_path / "endless.py"
+    endless.write_text("i = 0\nwhile True:\n    i = i + 1\n", encoding="utf-8")
+    with pytest.raises(FuelExhausted):
+        run_file(str(endless), engine=engine, fuel=1000)
+    huge = tmp_path / "huge.py"
+    huge.write_text("l = [1, 2, 3]\nx = l * 1000000000\n", encoding="utf-8")
+    with pytest.raises(MemoryLimitExceeded):
+        run_file(str(huge), engine=engine, memory_limit=10**6)
+    huge.write_text("s = set(range(300000000))\n", encoding="utf-8")
+    with pytest.raises(MemoryLimitExceeded):
+        run_file(str(huge), engine=engine, fuel=1000, memory_limit=10**5)
+    lazy = tmp_path / "lazy.py"
+    lazy.write_text("print(sum(range(1000000000000)))\n", encoding="utf-8")
+    with pytest.raises(FuelExhausted):
+        run_file(str(lazy), engine=engine, fuel=1000)
+    source = Path(__file__).parent / "fixtures" / "programs" / "recursion.py"
+    run_file(str(source), engine=engine, fuel=10**6, memory_limit=10**6)
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_fuel_counts_iterations_and_calls(engine, tmp_path: Path):
+    """Chaque moteur compte les mêmes pas : un par itération de boucle et un par appel."""
+    source = tmp_path / "steps.py"
+    source.write_text("def f(n):\n    return n + 1\ntotal = 0\nfor i in range(3):\n    j = 0\n"
+                      "    while j < 2:\n        total = f(total)\n        j = j + 1\nprint(total)\n",
+                      encoding="utf-8")
+    assert run_file(str(source), engine=engine, capture=True, fuel=15) == "6\n"
+    with pytest.raises(FuelExhausted):
+        run_file(str(source), engine=engine, capture=True, fuel=14)
+
+def test_output_sinks(tmp_path: Path):
+    """
+    run_file retourne la sortie capturée sur demande ; un RingBufferSink ne
+    garde que les dernières lignes.
+    """
+    program = tmp_path / "lignes.py"
+    program.write_text("for i in range(100):\n    print(i)\n", encoding="utf-8")
+    assert run_file(str(program), capture=True) == "".join(f"{i}\n" for i in range(100))
+    ring = RingBufferSink(max_chars=9)
+    run_file(str(program), output=ring, engine="vm")
+    assert (ring.getvalue(), ring.dropped) == ("97\n98\n99\n", 97)
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_common_subexpressions_keep_evaluation_order(engine, tmp_path: Path):
+    """
+    Au niveau 2, une sous-expression répétée est calculée une fois, sans être
+    évaluée avant les opérandes qui la précèdent : la première erreur levée
+    reste la même.
+    """
+    program = tmp_path / "cse.py"
+    program.write_text("c = 3\nb = 4\nx = c + b * c + b * c\nprint(x)\n", encoding="utf-8")
+    assert run_file(str(program), engine=engine, opt_level=2, capture=True) == "27\n"
+    program.write_text('a = "x"\ny = 1 / 0 + a * a + a * a\n', encoding="utf-8")
+    with pytest.raises(ZeroDivisionError):
+        run_file(str(program), engine=engine, opt_level=2)
+
+def test_parse_cache(cache_directory: Path, tmp_path: Path, monkeypatch):
+    """
+    Un source déjà analysé est relu depuis le cache ; une entrée tronquée est
+    réanalysée et réécrite, un changement de version de l'interpréteur ignore
+    les anciennes entrées et --no-cache n'écrit rien.
+    """
+    parses = []
+
+    class CountingParser(SimpleParser):
+        def parse(self, source):
+            parses.append(source)
+            return super().parse(source)
+
+    source = "x = 1\nprint(x + 1)\n"
+    program = cache.parse_cached(source, CountingParser())
+    assert cache.parse_cached(source, CountingParser()) == program and len(parses) == 1
+
+    path = cache.cache_path(source)
+    assert path.parent == cache_directory
+    path.write_bytes(path.read_bytes()[:10])
+    assert cache.parse_cached(source, CountingParser()) == program and len(parses) == 2
+    assert cache.load_program(path) == program
+
+    monkeypatch.setattr(cache, "INTERPRETER_TAG", b"autre version")
+    assert cache.parse_cached(source, CountingParser()) == program and len(parses) == 3
+    assert cache.cache_path(source) != path
+
+    entries = set(cache_directory.iterdir())
+    uncached = tmp_path / "sans_cache.py"
+    uncached.write_text("print(42)\n", encoding="utf-8")
+    assert run_file(str(uncached), use_cache=False, capture=True) == "42\n"
+    assert set(cache_directory.iterdir()) == entries